@@ -2,11 +2,17 @@ from __future__ import annotations
 
 import argparse
 import json
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
 
+from pattern_engine import base_model_signature, base_model_source_name, normalize_base_payload
 from train import (
     ACTIONS,
+    ContributionCache,
+    PreferenceAccumulator,
     aggregate_components,
     load_model_json,
     normalize_action_counts,
@@ -18,6 +24,9 @@ from train import (
 )
 
 
+MERGE_CHUNK_FILES = 64
+
+
 def choose_base_model(base_dir: Path, explicit_base: Optional[str]) -> Optional[Path]:
     if explicit_base:
         candidate = resolve_local_path(explicit_base)
@@ -40,57 +49,206 @@ def choose_base_model(base_dir: Path, explicit_base: Optional[str]) -> Optional[
     return candidates[-1][3]
 
 
+def load_preference_component(path: Path) -> Optional[Dict[str, Any]]:
+    payload = load_model_json(path)
+    if not payload:
+        return None
+    snapshot = normalize_snapshot(payload, path)
+    if not snapshot:
+        return None
+    if snapshot.get('model_role') == 'base_model':
+        return None
+    return snapshot
+
+
 def load_preference_components(data_dir: Path) -> List[Dict[str, Any]]:
     components: List[Dict[str, Any]] = []
     for path in sorted(data_dir.rglob('*.json')):
-        payload = load_model_json(path)
-        if not payload:
-            continue
-        snapshot = normalize_snapshot(payload, path)
-        if not snapshot:
-            continue
-        if snapshot.get('model_role') == 'base_model':
-            continue
-        components.append(snapshot)
+        snapshot = load_preference_component(path)
+        if snapshot:
+            components.append(snapshot)
     return components
 
 
-def base_identity(payload: Dict[str, Any], path: Path) -> Tuple[str, str, str]:
+def parse_preference_components(
+    paths: List[Path],
+    workers: int,
+    max_pending: int,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Iterator[Optional[Dict[str, Any]]]:
+    if workers <= 1:
+        for done, path in enumerate(paths, start=1):
+            snapshot = load_preference_component(path)
+            if progress:
+                progress(done, len(paths))
+            yield snapshot
+        return
+
+    pending: Deque[Future] = deque()
+    remaining = iter(paths)
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path in remaining:
+            pending.append(pool.submit(load_preference_component, path))
+            if len(pending) >= max_pending:
+                break
+        while pending:
+            snapshot = pending.popleft().result()
+            done += 1
+            for path in remaining:
+                pending.append(pool.submit(load_preference_component, path))
+                break
+            if progress:
+                progress(done, len(paths))
+            yield snapshot
+
+
+def cached_preference_components(
+    paths: List[Path],
+    cache: ContributionCache,
+    workers: int,
+    max_pending: int,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Iterator[Dict[str, Any]]:
+    keyed = [(path, cache.digest(path)) for path in paths if not cache.contains(path)]
+    changed: Dict[str, Path] = {}
+    for path, digest in keyed:
+        if digest is not None and digest not in changed and not cache.has(digest):
+            changed[digest] = path
+    for digest, snapshot in zip(changed, parse_preference_components(list(changed.values()), workers, max_pending, progress)):
+        cache.store(digest, snapshot)
+    cache.save(path for path, digest in keyed if digest is not None)
+
+    for path, digest in keyed:
+        entry = cache.load(digest) if digest is not None else None
+        snapshot = entry['component'] if entry is not None else load_preference_component(path)
+        if snapshot:
+            yield snapshot
+
+
+def base_identity(payload: Dict[str, Any], path: Optional[Path]) -> Tuple[str, str, str]:
     version = str(payload.get('model_version') or '').strip()
-    source = path.name
-    signature = str(payload.get('model_signature') or '').strip()
+    source = base_model_source_name(path) if path else ''
+    signature = base_model_signature(normalize_base_payload(path or Path(source), payload), source)
     return version, source, signature
 
 
+def base_context(base_payload: Optional[Dict[str, Any]], base_path: Optional[Path]) -> Tuple[Dict[str, Dict[str, float]], Dict[str, int], Tuple[str, str, str]]:
+    if base_payload:
+        base_weights = sanitize_action_weight_maps(base_payload.get('action_weights'))
+        base_counts = normalize_action_counts(base_payload.get('action_counts'))
+        return base_weights, base_counts, base_identity(base_payload, base_path)
+    return {action: {} for action in ACTIONS}, {action: 0 for action in ACTIONS}, ('', '', '')
+
+
+def adjust_component(component: Dict[str, Any], identity: Tuple[str, str, str], has_base: bool) -> Dict[str, Any]:
+    base_version, base_source, base_signature = identity
+    adjusted = dict(component)
+    weight = adjusted.get('weight')
+    weight = 1.0 if weight is None else float(weight)
+    same_signature = base_signature and adjusted.get('base_model_signature') == base_signature
+    same_version = base_version and adjusted.get('base_model_version') == base_version
+    same_source = base_source and adjusted.get('base_model_source') == base_source
+    if same_signature or same_version or same_source:
+        adjusted['weight'] = weight * 1.12
+    elif has_base:
+        adjusted['weight'] = weight * 0.78
+    return adjusted
+
+
 def apply_preference_delta(
     base_payload: Optional[Dict[str, Any]],
     base_path: Optional[Path],
     preference_components: List[Dict[str, Any]],
     alpha: float,
 ) -> Dict[str, Any]:
-    if base_payload:
-        base_weights = sanitize_action_weight_maps(base_payload.get('action_weights'))
-        base_counts = normalize_action_counts(base_payload.get('action_counts'))
-        base_version, base_source, base_signature = base_identity(base_payload, base_path or Path('trained_model.json'))
+    base_weights, base_counts, identity = base_context(base_payload, base_path)
+    adjusted_components = [adjust_component(component, identity, bool(base_payload)) for component in preference_components]
+    merged_preferences = aggregate_components(adjusted_components)
+    return finish_preference_delta(base_payload, base_weights, base_counts, identity, merged_preferences, len(preference_components), alpha)
+
+
+def stream_preference_delta(
+    base_payload: Optional[Dict[str, Any]],
+    base_path: Optional[Path],
+    paths: List[Path],
+    alpha: float,
+    workers: int = 1,
+    max_pending: int = 0,
+    progress: Optional[Callable[[int, int], None]] = None,
+    cache: Optional[ContributionCache] = None,
+) -> Dict[str, Any]:
+    base_weights, base_counts, identity = base_context(base_payload, base_path)
+    has_base = bool(base_payload)
+    max_pending = max(1, max_pending or workers * 4)
+    if cache is not None:
+        accumulator = PreferenceAccumulator()
+        for component in cached_preference_components(paths, cache, workers, max_pending, progress):
+            accumulator.add(adjust_component(component, identity, has_base))
     else:
-        base_weights = {action: {} for action in ACTIONS}
-        base_counts = {action: 0 for action in ACTIONS}
-        base_version, base_source, base_signature = '', '', ''
-
-    adjusted_components: List[Dict[str, Any]] = []
-    for component in preference_components:
-        adjusted = dict(component)
-        weight = float(adjusted.get('weight', 1.0) or 1.0)
-        same_signature = base_signature and adjusted.get('base_model_signature') == base_signature
-        same_version = base_version and adjusted.get('base_model_version') == base_version
-        same_source = base_source and adjusted.get('base_model_source') == base_source
-        if same_signature or same_version or same_source:
-            adjusted['weight'] = weight * 1.12
-        elif base_payload:
-            adjusted['weight'] = weight * 0.78
-        adjusted_components.append(adjusted)
+        accumulator = reduce_preference_components(paths, identity, has_base, workers, max_pending, progress)
+    return finish_preference_delta(base_payload, base_weights, base_counts, identity, accumulator.result(), accumulator.seen, alpha)
 
-    merged_preferences = aggregate_components(adjusted_components)
+
+def reduce_preference_chunk(paths: List[Path], identity: Tuple[str, str, str], has_base: bool) -> Dict[str, Any]:
+    accumulator = PreferenceAccumulator()
+    for path in paths:
+        component = load_preference_component(path)
+        if component:
+            accumulator.add(adjust_component(component, identity, has_base))
+    return accumulator.partial()
+
+
+def reduce_preference_components(
+    paths: List[Path],
+    identity: Tuple[str, str, str],
+    has_base: bool,
+    workers: int,
+    max_pending: int,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> PreferenceAccumulator:
+    accumulator = PreferenceAccumulator()
+    if workers <= 1 or len(paths) < MERGE_CHUNK_FILES * 2:
+        for done, path in enumerate(paths, start=1):
+            component = load_preference_component(path)
+            if component:
+                accumulator.add(adjust_component(component, identity, has_base))
+            if progress:
+                progress(done, len(paths))
+        return accumulator
+
+    # Workers fold whole chunks into partial sums, so only one sparse map per chunk
+    # crosses the process boundary instead of every normalized snapshot.
+    chunks = iter([paths[start:start + MERGE_CHUNK_FILES] for start in range(0, len(paths), MERGE_CHUNK_FILES)])
+    pending: Deque[Tuple[int, Future]] = deque()
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunks:
+            pending.append((len(chunk), pool.submit(reduce_preference_chunk, chunk, identity, has_base)))
+            if len(pending) >= max_pending:
+                break
+        while pending:
+            size, future = pending.popleft()
+            accumulator.merge(future.result())
+            done += size
+            for chunk in chunks:
+                pending.append((len(chunk), pool.submit(reduce_preference_chunk, chunk, identity, has_base)))
+                break
+            if progress:
+                progress(done, len(paths))
+    return accumulator
+
+
+def finish_preference_delta(
+    base_payload: Optional[Dict[str, Any]],
+    base_weights: Dict[str, Dict[str, float]],
+    base_counts: Dict[str, int],
+    identity: Tuple[str, str, str],
+    merged_preferences: Optional[Dict[str, Any]],
+    component_count: int,
+    alpha: float,
+) -> Dict[str, Any]:
+    base_version, base_source, _ = identity
     if not merged_preferences:
         return {
             'model_role': 'merged_model',
@@ -112,7 +270,7 @@ def apply_preference_delta(
         'merge_strategy': 'base_plus_user_preference_delta_v1',
         'base_model_version': base_version or None,
         'base_model_source': base_source or None,
-        'merged_preference_models': len(preference_components),
+        'merged_preference_models': component_count,
         'action_weights': prune_action_weights(merged_weights, max_size=25000),
         'action_counts': normalize_action_counts(merged_counts, sum(merged_counts.values())),
     }
@@ -127,6 +285,10 @@ def main() -> int:
     parser.add_argument('--base', default=None, help='Optional base model JSON file. Defaults to the newest base model in the current folder.')
     parser.add_argument('--output', default='MergedModel.json', help='Where to write the merged JSON model.')
     parser.add_argument('--alpha', type=float, default=1.0, help='How strongly to apply user preference deltas to the base model.')
+    parser.add_argument('--workers', type=int, default=1, help=f'Processes used to parse snapshots. 1, or fewer than {MERGE_CHUNK_FILES * 2} files, parses in this process.')
+    parser.add_argument('--max-pending', type=int, default=0, help='Most chunks of snapshots parsed but not yet merged at once. Defaults to four per worker.')
+    parser.add_argument('--incremental', action='store_true', help='Reuse cached normalized snapshots and only parse new or changed files.')
+    parser.add_argument('--cache-dir', default='.merge_cache', help='Folder for the --incremental contribution cache.')
     args = parser.parse_args()
 
     if not (0.0 <= args.alpha <= 2.0):
@@ -140,12 +302,27 @@ def main() -> int:
 
     base_path = choose_base_model(Path('.'), args.base)
     base_payload = load_model_json(base_path) if base_path else None
-    preference_components = load_preference_components(data_dir)
-    if not preference_components:
+    paths = sorted(data_dir.rglob('*.json'))
+    workers = max(1, args.workers)
+    started = time.perf_counter()
+    last_report = [started]
+
+    def report(done: int, total: int) -> None:
+        now = time.perf_counter()
+        if done != total and now - last_report[0] < 1.0:
+            return
+        last_report[0] = now
+        rate = done / max(now - started, 1e-9)
+        print(f'[merge] parsed {done}/{total} files ({rate:.1f} files/s)')
+
+    cache = ContributionCache(resolve_local_path(args.cache_dir)) if args.incremental else None
+    merged = stream_preference_delta(base_payload, base_path, paths, args.alpha, workers, args.max_pending, report, cache)
+    if cache is not None:
+        stats = cache.stats()
+        print(f'[merge] contribution cache: {stats["hits"]} reused, {stats["misses"]} parsed, {stats["hashed"]} hashed')
+    if not merged['merged_preference_models']:
         print(f'[merge] No usable preference model snapshots found under {data_dir}')
         return 1
-
-    merged = apply_preference_delta(base_payload, base_path, preference_components, args.alpha)
     output_path = resolve_local_path(args.output)
     if output_path.suffix.lower() != '.json':
         output_path = output_path.with_suffix('.json')
@@ -156,7 +333,7 @@ def main() -> int:
     print(f'[merge] wrote {output_path} with {feature_count} action features')
     if base_path:
         print(f'[merge] base model: {base_path.name}')
-    print(f'[merge] merged preference snapshots: {len(preference_components)}')
+    print(f'[merge] merged preference snapshots: {merged["merged_preference_models"]}')
     return 0
 
 
@@ -1,17 +1,53 @@
-﻿from typing import List, Optional
+﻿from contextlib import asynccontextmanager, suppress
+from typing import Iterator, List, Optional
+import asyncio
+import os
 import webbrowser
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field, field_validator
 import uvicorn
 
-from data_logger import DataLogger
-from model import ShortsAIModel
+from metrics import CONTENT_TYPE, REGISTRY, RequestMetricsMiddleware, stage_timer
+from model_worker import ModelWorker
+from pattern_engine import feature_id_cache_stats
+from profiles import Profile, ProfileRegistry
+from profiling import PROFILE_ENV, ProfilingMiddleware, parse_profile_spec, profiler_from_env
 
 GITHUB_ISSUE_URL = "https://github.com/Owexiii13/YouTube-Shorts-Algorithm-scroller/issues/new?template=data-contribution.md"
-
-app = FastAPI(title="YouTube Shorts AI Personalizer", version="5.0.0")
+MAX_BATCH_SIZE = 50
+MAX_EVENT_BATCH_SIZE = 500
+EXPORT_TIMER = stage_timer("log_video", "export")
+IDLE_SWEEP_SECONDS = 60.0
+
+
+async def sweep_idle_profiles():
+    while True:
+        await asyncio.sleep(IDLE_SWEEP_SECONDS)
+        try:
+            await asyncio.to_thread(profiles.evict_idle)
+        except Exception as exc:
+            print(f"[profiles] idle sweep failed: {exc}")
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    startup_profile = parse_profile_spec(os.environ.get(PROFILE_ENV))
+    if startup_profile is not None:
+        profiler.start(**startup_profile)
+    sweeper = asyncio.create_task(sweep_idle_profiles())
+    yield
+    sweeper.cancel()
+    with suppress(asyncio.CancelledError):
+        await sweeper
+    worker.shutdown()
+    await asyncio.to_thread(profiler.stop)
+    profiles.close()
+
+
+app = FastAPI(title="YouTube Shorts AI Personalizer", version="5.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,9 +56,23 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestMetricsMiddleware)
+
+profiles = ProfileRegistry(".")
+profiler = profiler_from_env()
+worker = ModelWorker(profiler=profiler)
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
 
-model = ShortsAIModel()
-logger = DataLogger(".")
+def current_profile(x_profile_id: Optional[str] = Header(default=None)) -> Iterator[Profile]:
+    try:
+        profile = profiles.acquire(x_profile_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    try:
+        yield profile
+    finally:
+        profiles.release(profile)
 
 
 class EventRequest(BaseModel):
@@ -49,6 +99,15 @@ class PredictionRequest(BaseModel):
     mood: str = "Neutral"
 
 
+class EventBatchRequest(BaseModel):
+    events: List[EventRequest] = Field(default_factory=list, max_length=MAX_EVENT_BATCH_SIZE)
+
+
+class PredictionBatchRequest(BaseModel):
+    videos: List[PredictionRequest] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
+    mood: Optional[str] = None
+
+
 class LogVideoRequest(BaseModel):
     watch_percentage: float = Field(default=0.0, ge=0.0, le=1.0)
     user_action: str = "neutral"
@@ -77,18 +136,52 @@ class SubmitChunkRequest(BaseModel):
 
 
 @app.get("/")
-async def root():
+async def root(profile: Profile = Depends(current_profile)):
     return {
         "message": "YouTube Shorts AI Personalizer API",
         "status": "running",
-        "shared_model_records": model.base_model.get("record_count", 0),
+        "shared_model_records": profile.model.base_model.get("record_count", 0),
+        "profiles": profiles.stats(),
+        "base_model_cache": profile.model.get_base_model_cache_stats(),
+        "pattern_cache": profile.model.get_pattern_cache_stats(),
+        "session_cache": profile.model.get_session_cache_stats(),
+        "feature_id_cache": feature_id_cache_stats(),
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/profiling")
+async def profiling_status():
+    return profiler.status()
+
+
+@app.post("/profiling/start")
+async def start_profiling(seconds: Optional[float] = None, requests: Optional[int] = None, mode: str = "sample"):
+    try:
+        return profiler.start(seconds=seconds, requests=requests, mode=mode)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+
+@app.post("/profiling/stop")
+async def stop_profiling():
+    try:
+        return await asyncio.to_thread(profiler.stop)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
 @app.post("/event")
-async def process_event(request: EventRequest):
+async def process_event(request: EventRequest, profile: Profile = Depends(current_profile)):
     try:
-        result = model.process_event(
+        result = await worker.write(
+            profile.model.process_event,
             video_id=request.video_id,
             channel_id=request.channel_id,
             event_type=request.event_type,
@@ -105,10 +198,22 @@ async def process_event(request: EventRequest):
         raise HTTPException(status_code=500, detail=str(exc))
 
 
+@app.post("/events/batch")
+async def process_events(request: EventBatchRequest, profile: Profile = Depends(current_profile)):
+    try:
+        summary = await worker.write(profile.model.process_events, [event.model_dump() for event in request.events])
+        for result in summary["results"]:
+            result["video_id"] = request.events[result["index"]].video_id
+        return {"status": "success" if not summary["failed"] else "partial", **summary}
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
 @app.post("/next")
-async def get_prediction(request: PredictionRequest):
+async def get_prediction(request: PredictionRequest, profile: Profile = Depends(current_profile)):
     try:
-        return model.predict_action(
+        return await worker.read(
+            profile.model.predict_action,
             video_id=request.video_id,
             channel_id=request.channel_id,
             title=request.title,
@@ -122,35 +227,57 @@ async def get_prediction(request: PredictionRequest):
         raise HTTPException(status_code=500, detail=str(exc))
 
 
+@app.post("/next/batch")
+async def get_predictions(request: PredictionBatchRequest, profile: Profile = Depends(current_profile)):
+    try:
+        mood = request.mood or (request.videos[0].mood if request.videos else "Neutral")
+        videos = [video.model_dump(exclude={"mood"}) for video in request.videos]
+        decisions = await worker.read(profile.model.predict_actions, videos, mood)
+        return {
+            "predictions": [
+                {"video_id": video["video_id"], **decision}
+                for video, decision in zip(videos, decisions)
+            ]
+        }
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+def log_and_export(profile: Profile, payload: dict):
+    result = profile.logger.log_video(payload)
+    with EXPORT_TIMER.time():
+        profile.model.export_contribution_model(profile.logger.export_path(), profile.logger.watch_count)
+    return result
+
+
 @app.post("/log_video")
-async def log_video(request: LogVideoRequest):
+async def log_video(request: LogVideoRequest, profile: Profile = Depends(current_profile)):
     try:
-        result = logger.log_video(request.model_dump())
-        model.export_contribution_model(logger.export_path(), logger.watch_count)
+        result = await worker.write(log_and_export, profile, request.model_dump())
         return {
             "status": "success",
             "chunk_file": result.chunk_file,
             "chunk_count": result.chunk_count,
             "completed_chunk": result.completed_chunk,
-            "privacy_notice": logger.chunk_status().get("privacy_notice"),
+            "privacy_notice": profile.logger.chunk_status().get("privacy_notice"),
         }
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
 
 @app.get("/chunk_status")
-async def chunk_status():
+async def chunk_status(profile: Profile = Depends(current_profile)):
     try:
-        return logger.chunk_status()
+        return await worker.write(profile.logger.chunk_status)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
 
 @app.post("/submit_chunk")
-async def submit_chunk(request: SubmitChunkRequest):
+async def submit_chunk(request: SubmitChunkRequest, profile: Profile = Depends(current_profile)):
     try:
-        mark_result = logger.mark_uploaded(request.chunk_file)
-        webbrowser.open(GITHUB_ISSUE_URL)
+        mark_result = await worker.write(profile.logger.mark_uploaded, request.chunk_file)
+        await worker.read(webbrowser.open, GITHUB_ISSUE_URL)
         return {"status": "success", **mark_result, "issue_url": GITHUB_ISSUE_URL}
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Contribution model file not found")
@@ -161,42 +288,42 @@ async def submit_chunk(request: SubmitChunkRequest):
 
 
 @app.get("/channel_status")
-async def get_channel_status(channel_id: str):
+async def get_channel_status(channel_id: str, profile: Profile = Depends(current_profile)):
     try:
-        return model.get_channel_status(channel_id)
+        return profile.model.get_channel_status(channel_id)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
 
 @app.get("/buffer_size")
-async def get_buffer_size():
+async def get_buffer_size(profile: Profile = Depends(current_profile)):
     try:
-        return {"buffer_size": model.get_buffer_size()}
+        return {"buffer_size": profile.model.get_buffer_size()}
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
 
 @app.get("/mood")
-async def get_current_mood():
+async def get_current_mood(profile: Profile = Depends(current_profile)):
     try:
-        return {"current_mood": model.get_current_mood()}
+        return {"current_mood": await worker.write(profile.model.get_current_mood)}
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
 
 @app.post("/mood")
-async def set_mood(mood: str):
+async def set_mood(mood: str, profile: Profile = Depends(current_profile)):
     try:
-        model.set_mood(mood)
-        return {"status": "success", "current_mood": model.get_current_mood()}
+        await worker.write(profile.model.set_mood, mood)
+        return {"status": "success", "current_mood": await worker.write(profile.model.get_current_mood)}
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
 
 @app.get("/mood/suggest")
-async def suggest_mood():
+async def suggest_mood(profile: Profile = Depends(current_profile)):
     try:
-        return {"suggested_mood": model.suggest_mood_change()}
+        return {"suggested_mood": await worker.read(profile.model.suggest_mood_change)}
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.model_format_bench import measure, synthetic_model
+from model import ShortsAIModel
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time contribution export with and without the cached base model signature.")
+    parser.add_argument("--features", type=int, default=24000, help="Total action features in the synthetic base model.")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs per case.")
+    args = parser.parse_args()
+
+    previous = Path.cwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            Path("trained_model.json").write_text(json.dumps(synthetic_model(args.features)), encoding="utf-8")
+            model = ShortsAIModel(persist_interval=3600, snapshot_interval=3600)
+            cache = model.base_model_cache
+
+            def uncached_export() -> None:
+                cache.invalidate()
+                model._export_payload()
+
+            results = [
+                measure("export, signature recomputed", args.repeats, uncached_export),
+                measure("export, signature cached", args.repeats, model._export_payload),
+            ]
+            model.close()
+        finally:
+            os.chdir(previous)
+
+    for row in results:
+        print(f"{row['case']:<30} median {row['median_ms']:8.3f} ms   min {row['min_ms']:8.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from MergeModels import apply_preference_delta, load_preference_components, stream_preference_delta
+from pattern_engine import ACTIONS, PRUNE_MIN_ABS, feature_id, prune_action_weights
+from train import PreferenceAccumulator
+
+SAME_BASE_BOOST = 1.12
+
+
+def synthetic_contribution(rng: random.Random, vocabulary: list, features: int) -> Dict[str, Any]:
+    return {
+        "model_role": "user_preference_delta",
+        "base_model_version": "1.0.0",
+        "base_model_source": "trained_model.json",
+        "action_weights": {action: {key: rng.uniform(-1.5, 1.5) for key in rng.sample(vocabulary, features)} for action in ACTIONS},
+        "action_counts": {"like": rng.randint(0, 400), "skip": rng.randint(0, 600)},
+    }
+
+
+def reference_merge(base_payload: Dict[str, Any], payloads: List[Dict[str, Any]], alpha: float) -> Dict[str, Any]:
+    sums: Dict[str, Dict[str, float]] = {action: {} for action in ACTIONS}
+    total_weight = 0.0
+    counts = dict(base_payload["action_counts"])
+    for payload in payloads:
+        watch_count = sum(payload["action_counts"].values())
+        weight = math.log1p(watch_count) / math.log1p(200) if watch_count > 0 else 0.1
+        weight = min(max(weight, 0.1), 2.0) * SAME_BASE_BOOST
+        for action in ACTIONS:
+            for key, value in payload["action_weights"][action].items():
+                if abs(value) >= PRUNE_MIN_ABS:
+                    sums[action][key] = sums[action].get(key, 0.0) + value * weight
+            counts[action] = counts.get(action, 0) + payload["action_counts"].get(action, 0)
+        total_weight += weight
+    merged = {action: dict(base_payload["action_weights"][action]) for action in ACTIONS}
+    for action in ACTIONS:
+        for key, value in sums[action].items():
+            merged[action][key] = merged[action].get(key, 0.0) + (value / total_weight) * alpha
+    return {"action_weights": prune_action_weights(merged, max_size=25000), "action_counts": counts}
+
+
+def mismatch(merged: Dict[str, Any], reference: Dict[str, Any], tolerance: float = 1e-9) -> Optional[str]:
+    if merged["action_counts"] != reference["action_counts"]:
+        return "action counts differ"
+    for action in ACTIONS:
+        actual = merged["action_weights"][action]
+        expected = reference["action_weights"][action]
+        if actual.keys() != expected.keys():
+            return f"{action}: {len(actual.keys() ^ expected.keys())} feature keys differ"
+        worst = max((abs(actual[key] - value) for key, value in expected.items()), default=0.0)
+        if worst > tolerance:
+            return f"{action}: max weight error {worst:.3g}"
+    return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time serial and streaming MergeModels aggregation over synthetic contributions.")
+    parser.add_argument("--files", type=int, default=400, help="Number of synthetic Model.json contributions.")
+    parser.add_argument("--features", type=int, default=1500, help="Features per action in each contribution.")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes for the streaming merge.")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    vocabulary = [feature_id(f"merge:{index}") for index in range(args.features * 8)]
+    base_payload = {
+        "model_role": "base_model",
+        "model_version": "1.0.0",
+        "action_weights": {action: {key: rng.uniform(-1.0, 1.0) for key in rng.sample(vocabulary, args.features)} for action in ACTIONS},
+        "action_counts": {"like": 5000, "skip": 7000},
+    }
+    base_path = Path("trained_model.json")
+
+    with tempfile.TemporaryDirectory() as folder:
+        data_dir = Path(folder)
+        payloads = []
+        for index in range(args.files):
+            payload = synthetic_contribution(rng, vocabulary, args.features)
+            payloads.append(payload)
+            (data_dir / f"user_{index:05d}").mkdir()
+            (data_dir / f"user_{index:05d}" / "Model.json").write_text(json.dumps(payload), encoding="utf-8")
+        paths = sorted(data_dir.rglob("*.json"))
+
+        started = time.perf_counter()
+        components = load_preference_components(data_dir)
+        serial = apply_preference_delta(base_payload, base_path, components, 1.0)
+        serial_seconds = time.perf_counter() - started
+
+        problem = mismatch(serial, reference_merge(base_payload, payloads, 1.0))
+        if problem:
+            print(f"[bench] serial merge does not match the reference merge: {problem}")
+            return 1
+
+        timings = {"serial": serial_seconds}
+        results = {}
+        for vectorized in (False, True):
+            accumulator = PreferenceAccumulator(vectorized)
+            started = time.perf_counter()
+            for component in components:
+                accumulator.add(component)
+            results[accumulator.vectorized] = accumulator.result()
+            timings["accumulate, numpy" if accumulator.vectorized else "accumulate, dicts"] = time.perf_counter() - started
+        if len(set(map(json.dumps, results.values()))) > 1:
+            print("[bench] numpy and dict accumulators disagree")
+            return 1
+        for workers in sorted({1, args.workers}):
+            started = time.perf_counter()
+            streamed = stream_preference_delta(base_payload, base_path, paths, 1.0, workers)
+            timings[f"streaming x{workers}"] = time.perf_counter() - started
+            if mismatch(streamed, serial):
+                print(f"[bench] streaming merge with {workers} workers does not match the serial result")
+                return 1
+
+    for label, seconds in timings.items():
+        print(f"{label:<18} {seconds * 1000:9.1f} ms   {args.files / seconds:8.1f} files/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
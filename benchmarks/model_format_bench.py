@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model_format import MAPPED_MODEL_SUFFIX, mapped_model_to_json, read_mapped_model, write_mapped_model
+from pattern_engine import ACTIONS, build_base_model, feature_id, read_json_file
+from persistence import atomic_write_text
+
+
+def synthetic_model(feature_count: int, seed: int = 7) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    keys = [feature_id(f"bench:{index}") for index in range(feature_count)]
+    per_action = max(1, feature_count // len(ACTIONS))
+    return {
+        "model_role": "base_model",
+        "model_version": "9.9.9",
+        "trained_at": "2024-01-01T00:00:00+00:00",
+        "action_weights": {action: {key: rng.uniform(-2.0, 2.0) for key in rng.sample(keys, per_action)} for action in ACTIONS},
+        "action_counts": {"like": 1800, "skip": 2600},
+    }
+
+
+def measure(label: str, repeats: int, func: Callable[[], Any]) -> Dict[str, Any]:
+    samples: List[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return {"case": label, "median_ms": statistics.median(samples), "min_ms": min(samples)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare JSON and mapped binary model load/save times.")
+    parser.add_argument("--features", type=int, default=25000, help="Total action features in the synthetic merged model.")
+    parser.add_argument("--repeats", type=int, default=7, help="Timed runs per case.")
+    args = parser.parse_args()
+
+    model = synthetic_model(args.features)
+    with tempfile.TemporaryDirectory() as folder:
+        json_path = Path(folder) / "merged.json"
+        mapped_path = json_path.with_suffix(MAPPED_MODEL_SUFFIX)
+        results = [
+            measure("json save", args.repeats, lambda: atomic_write_text(json_path, json.dumps(model, indent=2))),
+            measure("mapped save", args.repeats, lambda: write_mapped_model(mapped_path, model, ACTIONS)),
+            measure("json load", args.repeats, lambda: build_base_model(json_path, json_path, read_json_file(json_path))),
+            measure("mapped load", args.repeats, lambda: build_base_model(mapped_path, mapped_path, read_mapped_model(mapped_path))),
+            measure("mapped -> json", args.repeats, lambda: mapped_model_to_json(read_mapped_model(mapped_path))),
+        ]
+        sizes = {"json_bytes": json_path.stat().st_size, "mapped_bytes": mapped_path.stat().st_size}
+
+    for row in results:
+        print(f"{row['case']:<16} median {row['median_ms']:8.2f} ms   min {row['min_ms']:8.2f} ms")
+    print(f"file size: json {sizes['json_bytes']} bytes, mapped {sizes['mapped_bytes']} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
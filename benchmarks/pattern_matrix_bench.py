@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.model_format_bench import measure
+from benchmarks.suite import synthetic_action_model, synthetic_video
+from pattern_engine import ActionWeightIndex, FusedActionScorer, extract_patterns, sanitize_action_weight_maps
+from pattern_matrix import FeatureTable, MatrixScorer, extract_pattern_matrix
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare per-record pattern dicts with the batch CSR pipeline.")
+    parser.add_argument("--records", type=int, default=5000, help="Synthetic records per batch.")
+    parser.add_argument("--features", type=int, default=24000, help="Total action features in the synthetic base model.")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per case.")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    records = [synthetic_video(rng, index) for index in range(args.records)]
+    base = sanitize_action_weight_maps(synthetic_action_model(rng, records, args.features, "base_model")["action_weights"])
+    user = sanitize_action_weight_maps(synthetic_action_model(rng, records[::4], args.features // 4, "user_preference_delta")["action_weights"])
+    scorer = FusedActionScorer(ActionWeightIndex(base), user, 0.94, 1.42)
+
+    patterns = [extract_patterns(record, "Neutral") for record in records]
+    table = FeatureTable()
+    matrix = extract_pattern_matrix(records, "Neutral", table)
+    matrix_scorer = MatrixScorer(scorer, table)
+    matrix_scorer.score(matrix)
+
+    results = [
+        measure("extract, per-record dicts", args.repeats, lambda: [extract_patterns(record, "Neutral") for record in records]),
+        measure("extract, batch CSR", args.repeats, lambda: extract_pattern_matrix(records, "Neutral", table)),
+        measure("score, per-record dicts", args.repeats, lambda: [scorer.score(row) for row in patterns]),
+        measure("score, sparse mat-vec", args.repeats, lambda: matrix_scorer.score(matrix)),
+    ]
+    print(f"{len(matrix)} records, {matrix.nnz} non-zeros, {len(table)} feature columns")
+    for row in results:
+        print(f"{row['case']:<28} median {row['median_ms']:9.3f} ms   min {row['min_ms']:9.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
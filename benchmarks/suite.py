@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model import ShortsAIModel
+from pattern_engine import ACTIONS, extract_patterns, feature_id, load_base_model
+
+EVENT_TYPES = ("user_like", "manual_skip", "completed", "like", "user_early_scroll_away")
+TOPICS = (
+    "cats dogs pets puppy kitten rescue",
+    "football soccer goal skills match highlights",
+    "cooking recipe pasta street food spicy",
+    "minecraft gaming speedrun build funny",
+    "makeup skincare routine glow tutorial",
+    "physics science experiment space rocket",
+    "guitar cover music piano beat drop",
+    "gym workout fitness motivation lift",
+)
+
+
+def synthetic_video(rng: random.Random, index: int) -> Dict[str, Any]:
+    topic = rng.choice(TOPICS).split()
+    words = rng.sample(topic, k=min(len(topic), 4)) + [f"word{rng.randint(0, 4000)}" for _ in range(rng.randint(3, 9))]
+    return {
+        "video_id": f"vid{index:07d}",
+        "channel_id": f"chan{rng.randint(0, 400)}",
+        "title": " ".join(words[:8]),
+        "description": " ".join(rng.sample(words, k=len(words))) + f" #{topic[0]} #shorts",
+        "captions": " ".join(rng.choice(topic) for _ in range(12)),
+        "tags": rng.sample(topic, k=2),
+        "duration_seconds": rng.choice((8, 15, 24, 35, 48, 59)),
+    }
+
+
+def synthetic_action_model(rng: random.Random, videos: List[Dict[str, Any]], feature_count: int, role: str) -> Dict[str, Any]:
+    keys: List[str] = []
+    seen = set()
+    for video in videos:
+        for key in extract_patterns(video):
+            if key not in seen:
+                seen.add(key)
+                keys.append(key)
+    index = 0
+    while len(keys) < feature_count:
+        keys.append(feature_id(f"padding:{role}:{index}"))
+        index += 1
+    per_action = max(1, feature_count // len(ACTIONS))
+    payload: Dict[str, Any] = {
+        "model_role": role,
+        "action_weights": {action: {key: rng.uniform(-1.5, 1.5) for key in rng.sample(keys, min(per_action, len(keys)))} for action in ACTIONS},
+        "action_counts": {"like": 4000, "skip": 5200},
+    }
+    if role == "base_model":
+        payload["model_version"] = "1.0.0"
+    return payload
+
+
+def summarize(samples: List[float], elapsed: float) -> Dict[str, float]:
+    ordered = sorted(samples)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    return {
+        "iterations": len(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "p50_ms": cuts[49],
+        "p95_ms": cuts[94],
+        "p99_ms": cuts[98],
+        "max_ms": ordered[-1],
+        "ops_per_sec": len(ordered) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def run_case(iterations: int, func: Callable[[int], Any], warmup: int = 3) -> Dict[str, float]:
+    for index in range(min(warmup, iterations)):
+        func(index)
+    samples: List[float] = []
+    started = time.perf_counter()
+    for index in range(iterations):
+        begin = time.perf_counter()
+        func(index)
+        samples.append((time.perf_counter() - begin) * 1000.0)
+    return summarize(samples, time.perf_counter() - started)
+
+
+def model_cases(args: argparse.Namespace, rng: random.Random, videos: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    results["extract_patterns"] = run_case(args.iterations, lambda index: extract_patterns(videos[index % len(videos)], "Neutral"))
+    results["load_base_model"] = run_case(args.load_iterations, lambda index: load_base_model("trained_model.json"), warmup=1)
+
+    model = ShortsAIModel(persist_interval=3600, snapshot_interval=3600)
+    try:
+        def predict(index: int) -> None:
+            video = videos[index % len(videos)]
+            model.predict_action(
+                video["video_id"], video["channel_id"], video["title"], video["description"],
+                video["captions"], video["tags"], video["duration_seconds"], "Neutral",
+            )
+
+        def process(index: int) -> None:
+            video = videos[index % len(videos)]
+            model.process_event(
+                video["video_id"], video["channel_id"], EVENT_TYPES[index % len(EVENT_TYPES)], rng.uniform(0, 100),
+                "Neutral", video["title"], video["description"], video["captions"], video["tags"], video["duration_seconds"],
+            )
+
+        results["predict_action"] = run_case(args.iterations, predict)
+        results["process_event"] = run_case(args.iterations, process)
+        results["predict_actions_batch"] = run_case(max(1, args.iterations // 10), lambda index: model.predict_actions(videos[:args.batch_size]))
+    finally:
+        model.close()
+    return results
+
+
+def http_cases(args: argparse.Namespace, rng: random.Random, videos: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError as exc:
+        print(f"[bench] skipping HTTP cases: {exc}")
+        return {}
+    import app as backend
+
+    results: Dict[str, Dict[str, float]] = {}
+    with TestClient(backend.app) as client:
+        def post(path: str, body: Dict[str, Any]) -> None:
+            response = client.post(path, json=body)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} returned {response.status_code}: {response.text}")
+
+        results["http_next"] = run_case(args.iterations, lambda index: post("/next", videos[index % len(videos)]))
+        results["http_event"] = run_case(
+            args.iterations,
+            lambda index: post("/event", dict(videos[index % len(videos)], event_type=EVENT_TYPES[index % len(EVENT_TYPES)], watched_percent=rng.uniform(0, 100))),
+        )
+        results["http_next_batch"] = run_case(max(1, args.iterations // 10), lambda index: post("/next/batch", {"videos": videos[:args.batch_size]}))
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions: List[str] = []
+    for case, current in results.items():
+        previous = baseline.get("results", {}).get(case)
+        if not previous:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            before = float(previous.get(metric, 0.0) or 0.0)
+            if before > 0 and current[metric] > before * (1.0 + threshold):
+                regressions.append(f"{case} {metric}: {before:.3f} -> {current[metric]:.3f} ms (+{(current[metric] / before - 1.0) * 100:.0f}%)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="End-to-end latency benchmarks for the model and HTTP layers.")
+    parser.add_argument("--base-features", type=int, default=12000, help="Total action features in the synthetic base model (1k-50k).")
+    parser.add_argument("--user-features", type=int, default=6000, help="Total action features in the synthetic user model.")
+    parser.add_argument("--iterations", type=int, default=300, help="Timed calls per hot-path case.")
+    parser.add_argument("--load-iterations", type=int, default=10, help="Timed calls for load_base_model.")
+    parser.add_argument("--batch-size", type=int, default=20, help="Videos per batch prediction.")
+    parser.add_argument("--skip-http", action="store_true", help="Only run the in-process model cases.")
+    parser.add_argument("--output", default=None, help="Write results to this JSON file.")
+    parser.add_argument("--baseline", default=None, help="Compare against a previous results JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown in p50/p95 that counts as a regression.")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    videos = [synthetic_video(rng, index) for index in range(max(args.iterations, 200))]
+    previous = Path.cwd()
+    output = Path(args.output).resolve() if args.output else None
+    baseline_path = Path(args.baseline).resolve() if args.baseline else None
+
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            Path("trained_model.json").write_text(json.dumps(synthetic_action_model(rng, videos, args.base_features, "base_model")), encoding="utf-8")
+            Path("Model.json").write_text(json.dumps(synthetic_action_model(rng, videos[::3], args.user_features, "user_preference_delta")), encoding="utf-8")
+            results = model_cases(args, rng, videos)
+            if not args.skip_http:
+                results.update(http_cases(args, rng, videos))
+        finally:
+            os.chdir(previous)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "base_features": args.base_features,
+            "user_features": args.user_features,
+            "iterations": args.iterations,
+            "batch_size": args.batch_size,
+        },
+        "results": results,
+    }
+    print(f"{'case':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>12}")
+    for case, row in results.items():
+        print(f"{case:<24}{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}{row['p99_ms']:>10.3f}{row['ops_per_sec']:>12.1f}")
+    if output is not None:
+        output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"[bench] wrote {output}")
+
+    baseline: Optional[Dict[str, Any]] = None
+    if baseline_path is not None:
+        try:
+            baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            print(f"[bench] could not read baseline {baseline_path}: {exc}")
+            return 1
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"[bench] REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"[bench] no regressions beyond {args.threshold * 100:.0f}% against {baseline_path.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,10 +3,15 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from metrics import stage_timer
+
 PROMPT_EVERY = 100
 EXPORT_FILENAME = "Model.json"
 STATE_FILENAME = "contribution_state.json"
 
+LOG_SAVE_TIMER = stage_timer("log_video", "save_state")
+LOG_TOTAL_TIMER = stage_timer("log_video", "total")
+
 
 @dataclass
 class LogResult:
@@ -75,14 +80,16 @@ class DataLogger:
         return milestone not in self.session_prompted_milestones
 
     def log_video(self, payload: Dict[str, Any]) -> LogResult:
-        self.state["watch_count"] = self.watch_count + 1
-        self._save_state()
-        completed_chunk = None
-        if self._should_prompt():
-            milestone = self._current_milestone()
-            self.session_prompted_milestones.add(milestone)
-            completed_chunk = EXPORT_FILENAME
-        return LogResult(EXPORT_FILENAME, self.watch_count, completed_chunk)
+        with LOG_TOTAL_TIMER.time():
+            self.state["watch_count"] = self.watch_count + 1
+            with LOG_SAVE_TIMER.time():
+                self._save_state()
+            completed_chunk = None
+            if self._should_prompt():
+                milestone = self._current_milestone()
+                self.session_prompted_milestones.add(milestone)
+                completed_chunk = EXPORT_FILENAME
+            return LogResult(EXPORT_FILENAME, self.watch_count, completed_chunk)
 
     def chunk_status(self) -> Dict[str, Any]:
         show_popup = self._should_prompt()
@@ -1,9 +1,25 @@
 import json
 import re
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 DEFAULT_DIM = 535
+VOCAB_SIZE = 500
+CATEGORIES = [
+    "Film", "Autos", "Music", "Pets", "Sports", "Travel", "Gaming", "People",
+    "Comedy", "Entertainment", "News", "Howto", "Education", "Science", "Nonprofits",
+    "Tech", "Lifestyle", "Food", "Fashion", "Other"
+]
+TIME_LABELS = ["morning", "afternoon", "evening", "night"]
+CATEGORY_OFFSET = VOCAB_SIZE
+DURATION_OFFSET = CATEGORY_OFFSET + len(CATEGORIES)
+DAY_OFFSET = DURATION_OFFSET + 4
+TIME_OFFSET = DAY_OFFSET + 7
 
 
 def load_vocab(path: str = "vocab.json") -> List[str]:
@@ -25,48 +41,52 @@ def _tokenize(text: str) -> List[str]:
     return re.findall(r"[a-z0-9]+", (text or "").lower())
 
 
-def extract_features(video: Dict, vocab: List[str]) -> List[float]:
+def _video_words(video: Dict) -> set:
     text = " ".join([
         str(video.get("title", "")),
         str(video.get("description", "")),
         str(video.get("subtitles_snippet", "") or ""),
     ])
-    words = set(_tokenize(text))
+    return set(_tokenize(text))
+
+
+def _duration_bucket(video: Dict) -> int:
+    d = int(video.get("duration_seconds", 0) or 0)
+    if d <= 15:
+        return 0
+    if d <= 30:
+        return 1
+    if d <= 45:
+        return 2
+    return 3
+
+
+def _day_bucket(video: Dict) -> int:
+    return max(0, min(6, int(video.get("day_of_week", 0) or 0)))
 
-    vocab = vocab[:500]
-    if len(vocab) < 500:
-        vocab = vocab + [f"__pad_{i}" for i in range(500 - len(vocab))]
+
+def extract_features(video: Dict, vocab: List[str]) -> List[float]:
+    words = _video_words(video)
+
+    vocab = vocab[:VOCAB_SIZE]
+    if len(vocab) < VOCAB_SIZE:
+        vocab = vocab + [f"__pad_{i}" for i in range(VOCAB_SIZE - len(vocab))]
 
     word_vec = [1.0 if token in words else 0.0 for token in vocab]
 
-    categories = [
-        "Film", "Autos", "Music", "Pets", "Sports", "Travel", "Gaming", "People",
-        "Comedy", "Entertainment", "News", "Howto", "Education", "Science", "Nonprofits",
-        "Tech", "Lifestyle", "Food", "Fashion", "Other"
-    ]
     cat = str(video.get("category") or "Other")
-    cat_vec = [1.0 if cat == c else 0.0 for c in categories]
+    cat_vec = [1.0 if cat == c else 0.0 for c in CATEGORIES]
     if sum(cat_vec) == 0:
         cat_vec[-1] = 1.0
 
-    d = int(video.get("duration_seconds", 0) or 0)
     duration_vec = [0.0, 0.0, 0.0, 0.0]
-    if d <= 15:
-        duration_vec[0] = 1.0
-    elif d <= 30:
-        duration_vec[1] = 1.0
-    elif d <= 45:
-        duration_vec[2] = 1.0
-    else:
-        duration_vec[3] = 1.0
-
-    day = int(video.get("day_of_week", 0) or 0)
-    day = max(0, min(6, day))
+    duration_vec[_duration_bucket(video)] = 1.0
+
+    day = _day_bucket(video)
     day_vec = [1.0 if i == day else 0.0 for i in range(7)]
 
     tb = str(video.get("time_of_day_bucket", "night"))
-    time_labels = ["morning", "afternoon", "evening", "night"]
-    time_vec = [1.0 if tb == label else 0.0 for label in time_labels]
+    time_vec = [1.0 if tb == label else 0.0 for label in TIME_LABELS]
     if sum(time_vec) == 0:
         time_vec[-1] = 1.0
 
@@ -79,3 +99,52 @@ def extract_features(video: Dict, vocab: List[str]) -> List[float]:
         features += [0.0] * (DEFAULT_DIM - len(features))
 
     return features[:DEFAULT_DIM]
+
+
+class FeatureIndex:
+    def __init__(self, vocab: List[str]):
+        self.vocab = [str(token) for token in vocab[:VOCAB_SIZE]]
+        self.columns: Dict[str, List[int]] = {}
+        for column, token in enumerate(self.vocab):
+            self.columns.setdefault(token, []).append(column)
+        self.category_columns = {name: CATEGORY_OFFSET + i for i, name in enumerate(CATEGORIES)}
+        self.time_columns = {label: TIME_OFFSET + i for i, label in enumerate(TIME_LABELS)}
+
+    def token_hits(self, video: Dict) -> List[int]:
+        columns = self.columns
+        hits: List[int] = []
+        for word in _video_words(video):
+            matched = columns.get(word)
+            if matched is not None:
+                hits.extend(matched)
+        return hits
+
+    def transform(self, videos: Iterable[Dict], dtype=None):
+        if np is None:
+            raise ImportError("numpy is required for batch feature extraction")
+        hit_rows: List[int] = []
+        hit_columns: List[int] = []
+        one_hot: List[int] = []
+        other_column = self.category_columns["Other"]
+        night_column = self.time_columns["night"]
+        rows = 0
+        for video in videos:
+            hits = self.token_hits(video)
+            hit_rows.extend([rows] * len(hits))
+            hit_columns.extend(hits)
+            one_hot.append(self.category_columns.get(str(video.get("category") or "Other"), other_column))
+            one_hot.append(DURATION_OFFSET + _duration_bucket(video))
+            one_hot.append(DAY_OFFSET + _day_bucket(video))
+            one_hot.append(self.time_columns.get(str(video.get("time_of_day_bucket", "night")), night_column))
+            rows += 1
+        matrix = np.zeros((rows, DEFAULT_DIM), dtype=dtype or np.float32)
+        if hit_rows:
+            matrix[np.asarray(hit_rows, dtype=np.intp), np.asarray(hit_columns, dtype=np.intp)] = 1.0
+        if rows:
+            matrix[np.repeat(np.arange(rows, dtype=np.intp), 4), np.asarray(one_hot, dtype=np.intp)] = 1.0
+        return matrix
+
+
+def extract_feature_matrix(videos: Iterable[Dict], vocab: Union[List[str], FeatureIndex], dtype=None):
+    index = vocab if isinstance(vocab, FeatureIndex) else FeatureIndex(vocab)
+    return index.transform(videos, dtype)
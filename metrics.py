@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    value = float(value)
+    if value == float("inf"):
+        return "+Inf"
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(pairs: Sequence[Tuple[str, Any]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class CounterValue:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Span:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram: "HistogramValue"):
+        self.histogram = histogram
+        self.started = 0.0
+
+    def __enter__(self) -> "Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+class HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self) -> Span:
+        return Span(self)
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class MetricFamily(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _new_child(self) -> Any:
+        ...
+
+    def labels(self, *values: Any, **named: Any) -> Any:
+        if named:
+            values = tuple(named[name] for name in self.label_names)
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _samples(self) -> List[Tuple[Tuple[Tuple[str, str], ...], Any]]:
+        with self._lock:
+            children = list(self._children.items())
+        return [(tuple(zip(self.label_names, key)), child) for key, child in sorted(children)]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        for labels, child in self._samples():
+            lines.extend(self._render_child(labels, child))
+        return lines
+
+    @abstractmethod
+    def _render_child(self, labels: Tuple[Tuple[str, str], ...], child: Any) -> List[str]:
+        ...
+
+
+class Counter(MetricFamily):
+    kind = "counter"
+
+    def _new_child(self) -> CounterValue:
+        return CounterValue()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _render_child(self, labels: Tuple[Tuple[str, str], ...], child: CounterValue) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_number(child.value)}"]
+
+
+class Histogram(MetricFamily):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+
+    def _new_child(self) -> HistogramValue:
+        return HistogramValue(self.buckets)
+
+    def _render_child(self, labels: Tuple[Tuple[str, str], ...], child: HistogramValue) -> List[str]:
+        counts, total, count = child.snapshot()
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', _format_number(bound)),))} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_number(total)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, family: MetricFamily) -> Any:
+        with self._lock:
+            existing = self._families.get(family.name)
+            if existing is not None:
+                if type(existing) is not type(family) or existing.label_names != family.label_names:
+                    raise ValueError(f"metric {family.name} already registered with a different shape")
+                return existing
+            self._families[family.name] = family
+            return family
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            families = list(self._families.values())
+        lines: List[str] = []
+        for family in families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "shorts_ai_stage_duration_seconds",
+    "Time spent in each stage of a model operation.",
+    ("operation", "stage"),
+)
+OPERATIONS_TOTAL = REGISTRY.counter(
+    "shorts_ai_operations_total",
+    "Model operations handled, by operation and outcome.",
+    ("operation", "outcome"),
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "shorts_ai_http_request_duration_seconds",
+    "End-to-end HTTP request latency including serialization.",
+    ("method", "route", "status"),
+)
+
+
+def stage_timer(operation: str, stage: str) -> HistogramValue:
+    return STAGE_SECONDS.labels(operation, stage)
+
+
+def operation_counter(operation: str, outcome: str = "ok") -> CounterValue:
+    return OPERATIONS_TOTAL.labels(operation, outcome)
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app: Any, histogram: Optional[Histogram] = None):
+        self.app = app
+        self.histogram = histogram if histogram is not None else HTTP_REQUEST_SECONDS
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            if message.get("type") == "http.response.start":
+                status[0] = int(message.get("status", 500))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.histogram.labels(scope.get("method", "GET"), route, status[0]).observe(time.perf_counter() - started)
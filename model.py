@@ -1,26 +1,37 @@
 from __future__ import annotations
 
-import hashlib
+import functools
 import json
 import math
+import threading
 import time
 from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Deque, Dict, List, Optional, Union
+from typing import Any, Deque, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple, Union
 
 from pattern_engine import (
     ACTIONS,
+    BaseModelCache,
+    FusedActionScorer,
+    PatternCache,
+    ScorerOverlay,
+    ScorerView,
+    base_model_source_name,
     clamp,
     empty_action_bias,
     empty_action_weights,
-    extract_patterns,
     load_base_model,
     prune_action_weights,
     reward_from_event,
     sanitize_action_score_map,
     sanitize_action_weight_maps,
-    score_action_patterns,
+    sanitize_feature_weight_map,
 )
+from metrics import operation_counter, stage_timer
+from persistence import DEFAULT_FLUSH_INTERVAL, DEFAULT_SNAPSHOT_INTERVAL, EventJournal, WriteBehindPersister, atomic_write_text
+from session_cache import SessionLRU
 
 MOODS = [
     "Neutral",
@@ -34,7 +45,28 @@ MOODS = [
 ]
 
 SETTINGS_SCHEMA_VERSION = 8
+BASE_MODEL_SCALE = 0.94
+USER_MODEL_SCALE = 1.42
 DEFAULT_LOCAL_MODEL_PATH = "Model.json"
+RECENT_VIDEO_CAPACITY = 800
+VIDEO_SCORE_CAPACITY = 1200
+RECENT_VIDEO_WINDOW_SECONDS = 3600
+RECENT_VIDEO_TTL_SECONDS = 604800
+SNAPSHOT_PUBLISH_INTERVAL = 0.05
+SNAPSHOT_OVERLAY_MIN_CHANGES = 4096
+SNAPSHOT_OVERLAY_FRACTION = 8
+
+PREDICT_RELOAD_TIMER = stage_timer("predict", "reload")
+PREDICT_EXTRACT_TIMER = stage_timer("predict", "extract")
+PREDICT_SCORE_TIMER = stage_timer("predict", "score")
+PREDICT_MOOD_TIMER = stage_timer("predict", "mood")
+PREDICT_TOTAL_TIMER = stage_timer("predict", "total")
+EVENT_EXTRACT_TIMER = stage_timer("event", "extract")
+EVENT_LEARN_TIMER = stage_timer("event", "learn")
+EVENT_PERSIST_TIMER = stage_timer("event", "persist")
+EVENT_TOTAL_TIMER = stage_timer("event", "total")
+PREDICTION_COUNTERS = {action: operation_counter("predict", action) for action in ACTIONS}
+EVENT_COUNTERS = {action: operation_counter("event", action) for action in (*ACTIONS, "ignored")}
 
 
 def _softmax(scores: Dict[str, float]) -> Dict[str, float]:
@@ -55,6 +87,25 @@ def _safe_float(value: Any, default: float = 0.0) -> float:
         return default
 
 
+@dataclass(frozen=True)
+class PredictionSnapshot:
+    version: int
+    scorer: ScorerView
+    shared_bias: Dict[str, float]
+    trusted_channels: FrozenSet[str]
+    blocked_channels: FrozenSet[str]
+    current_mood: str
+    recent_events: Tuple[Dict[str, Any], ...]
+
+
+def _synchronized(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_section():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class ShortsAIModel:
     def __init__(
         self,
@@ -62,19 +113,49 @@ class ShortsAIModel:
         base_model_file: str = "trained_model.json",
         user_model_file: str = DEFAULT_LOCAL_MODEL_PATH,
         export_model_file: str = DEFAULT_LOCAL_MODEL_PATH,
+        base_model_cache: Optional[BaseModelCache] = None,
+        pattern_cache: Optional[PatternCache] = None,
+        persist_interval: float = DEFAULT_FLUSH_INTERVAL,
+        snapshot_interval: float = DEFAULT_SNAPSHOT_INTERVAL,
+        recent_video_capacity: int = RECENT_VIDEO_CAPACITY,
+        video_score_capacity: int = VIDEO_SCORE_CAPACITY,
+        journal_fsync: bool = False,
     ):
-        self.data_file = Path(data_file)
-        self.base_model_file = Path(base_model_file)
-        self.user_model_file = Path(user_model_file)
-        self.export_model_file = Path(export_model_file)
-        self.base_model = load_base_model(self.base_model_file)
+        self.data_file = Path(data_file).resolve()
+        self.base_model_file = Path(base_model_file).resolve()
+        self.user_model_file = Path(user_model_file).resolve()
+        self.export_model_file = Path(export_model_file).resolve()
+        # The journal position stays out of exported contributions, so a shared user/export
+        # file keeps its private snapshot beside it.
+        self.user_snapshot_file = self.user_model_file if self.user_model_file != self.export_model_file else self.user_model_file.with_suffix(".snapshot")
+        self.base_model_cache = base_model_cache if base_model_cache is not None else BaseModelCache()
+        self.base_model = load_base_model(self.base_model_file, cache=self.base_model_cache)
+        self.base_index = self.base_model_cache.action_index(self.base_model)
         self.buffer = deque(maxlen=40)  # type: Deque[Dict[str, Any]]
         self.learning_rate = 0.24
         self.last_mood_check = time.time()
-        self.session_video_action_scores: Dict[str, Dict[str, float]] = {}
-        self.session_recent_video_actions: Dict[str, Dict[str, Any]] = {}
+        self.session_video_action_scores = SessionLRU(video_score_capacity)
+        self.session_recent_video_actions = SessionLRU(recent_video_capacity, ttl_seconds=RECENT_VIDEO_TTL_SECONDS)
         self.user_preferences = self._default_preferences()
         self.user_model = self._default_user_model()
+        self.scorer = FusedActionScorer(self.base_index, base_scale=BASE_MODEL_SCALE, user_scale=USER_MODEL_SCALE)
+        self.pattern_cache = pattern_cache if pattern_cache is not None else PatternCache()
+        self._lock = threading.RLock()
+        self._io_lock = threading.Lock()
+        self._generation = 0
+        self._written_generation: Dict[str, int] = {}
+        self._state_version = 0
+        self._weights_generation = 0
+        self._pruned_generation = -1
+        self._prediction_snapshot: Optional[PredictionSnapshot] = None
+        self._scorer_overlay: Optional[ScorerOverlay] = None
+        self._write_depth = 0
+        self._defer_publish = False
+        self._last_publish = 0.0
+        self.persister = WriteBehindPersister(self._flush_dirty_state, interval=persist_interval)
+        self.journal = EventJournal(self.user_model_file.with_suffix(".journal"), fsync=journal_fsync)
+        self.compactor = WriteBehindPersister(self._flush_dirty_state, interval=snapshot_interval)
+        self._snapshot_journal_seq = 0
         self.load_data()
 
     def _default_preferences(self) -> Dict[str, Any]:
@@ -94,20 +175,10 @@ class ShortsAIModel:
 
     def _base_model_source_name(self) -> str:
         raw = str(self.base_model.get("source_path") or self.base_model_file)
-        return Path(raw).name or self.base_model_file.name
+        return base_model_source_name(raw) or self.base_model_file.name
 
     def _base_model_signature(self) -> str:
-        payload = {
-            "model_version": self.base_model.get("model_version"),
-            "source": self._base_model_source_name(),
-            "action_counts": self._sanitize_action_counts(self.base_model.get("action_counts")),
-            "action_weights": prune_action_weights(self.base_model.get("action_weights", {}), max_size=12000),
-        }
-        digest = hashlib.blake2s(
-            json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8"),
-            digest_size=12,
-        ).hexdigest()
-        return digest
+        return self.base_model_cache.signature(self.base_model, self._base_model_source_name())
 
     def _export_payload(self, watch_count: int = 0) -> Dict[str, Any]:
         counts = self._sanitize_action_counts(self.user_model.get("action_counts"))
@@ -117,15 +188,85 @@ class ShortsAIModel:
             "base_model_version": self.base_model.get("model_version"),
             "base_model_source": self._base_model_source_name(),
             "base_model_signature": self._base_model_signature(),
-            "action_weights": prune_action_weights(self.user_model.get("action_weights", {}), max_size=18000),
+            "action_weights": self._export_weights(18000),
             "action_counts": counts,
         }
         if total > 0:
             payload["watch_count"] = total
         return payload
 
+    def _export_weights(self, max_size: int) -> Dict[str, Dict[str, float]]:
+        weights = self._pruned_user_weights(max_size)
+        if weights is not self.user_model.get("action_weights"):
+            return weights
+        # Exports are serialized after the lock is released, so they cannot share the live maps.
+        return {action: dict(weights.get(action, {})) for action in ACTIONS}
+
     def _sync_export_model(self, watch_count: int = 0) -> None:
-        self.export_model_file.write_text(json.dumps(self._export_payload(watch_count), indent=2), encoding="utf-8")
+        with self._lock:
+            generation = self._next_generation()
+            payload = self._export_payload(watch_count)
+        self._write_snapshot(self._snapshot_kinds(self.export_model_file), generation, [(self.export_model_file, payload)])
+
+    def _next_generation(self) -> int:
+        self._generation += 1
+        return self._generation
+
+    def _snapshot_kinds(self, path: Path) -> Tuple[str, ...]:
+        kinds = tuple(kind for kind, target in (("user_model", self.user_snapshot_file), ("export_model", self.export_model_file)) if path == target)
+        return kinds or (str(path),)
+
+    def _write_snapshot(self, kinds: Tuple[str, ...], generation: int, writes: List[Tuple[Path, Dict[str, Any]]]) -> bool:
+        with self._io_lock:
+            if any(generation <= self._written_generation.get(kind, 0) for kind in kinds):
+                return False
+            for path, payload in writes:
+                atomic_write_text(path, json.dumps(payload, indent=2))
+            for kind in kinds:
+                self._written_generation[kind] = generation
+            return True
+
+    def _touch_state(self) -> None:
+        self._state_version += 1
+
+    @contextmanager
+    def _write_section(self) -> Iterator[None]:
+        with self._lock:
+            self._write_depth += 1
+            try:
+                yield
+            finally:
+                self._write_depth -= 1
+                if not self._write_depth and not self._defer_publish:
+                    self._publish_snapshot()
+
+    def _publish_snapshot(self) -> PredictionSnapshot:
+        snapshot = self._prediction_snapshot
+        if snapshot is not None and snapshot.version == self._state_version:
+            return snapshot
+        base_bias = sanitize_action_score_map(self.base_model.get("action_bias"), {"like": 0.12, "skip": -0.12})
+        user_bias = self._compute_action_bias(self.user_model.get("action_counts", {}))
+        snapshot = PredictionSnapshot(
+            version=self._state_version,
+            scorer=self._publish_scorer(),
+            shared_bias={action: base_bias[action] + user_bias[action] for action in ACTIONS},
+            trusted_channels=frozenset(self.user_preferences.get("trusted_channels", set())),
+            blocked_channels=frozenset(self.user_preferences.get("blocked_channels", set())),
+            current_mood=self.user_preferences.get("current_mood", "Neutral"),
+            recent_events=tuple(self.buffer),
+        )
+        self._prediction_snapshot = snapshot
+        self._last_publish = time.monotonic()
+        return snapshot
+
+    def _publish_scorer(self) -> ScorerView:
+        overlay = self._scorer_overlay
+        limit = max(SNAPSHOT_OVERLAY_MIN_CHANGES, len(self.scorer.user_index) // SNAPSHOT_OVERLAY_FRACTION)
+        if overlay is None or overlay.source is not self.scorer or overlay.changes + overlay.pending() > limit:
+            overlay = self._scorer_overlay = ScorerOverlay(self.scorer)
+        else:
+            overlay.publish(self._state_version)
+        return overlay.view(self._state_version)
 
     def _sanitize_action_counts(self, value: Any) -> Dict[str, int]:
         counts = _empty_action_counts()
@@ -173,7 +314,7 @@ class ShortsAIModel:
     def _load_user_model(self) -> bool:
         candidates = []
         seen = set()
-        for path in (self.user_model_file, self.export_model_file):
+        for path in (self.user_snapshot_file, self.user_model_file, self.export_model_file):
             key = str(path)
             if key in seen or not path.exists():
                 continue
@@ -189,6 +330,7 @@ class ShortsAIModel:
                 continue
 
             self.user_model = self._default_user_model()
+            self._snapshot_journal_seq = max(0, int(_safe_float(payload.get("journal_seq", 0), 0.0)))
             found = self._merge_model_fragment(
                 self.user_model["action_weights"],
                 self.user_model["action_counts"],
@@ -234,6 +376,7 @@ class ShortsAIModel:
                 found = True
         return found
 
+    @_synchronized
     def load_data(self) -> None:
         settings: Dict[str, Any] = {}
         if self.data_file.exists():
@@ -252,9 +395,15 @@ class ShortsAIModel:
         self.user_preferences["mood_last_changed"] = _safe_float(settings.get("mood_last_changed", time.time()), time.time())
 
         self.user_model = self._default_user_model()
+        self._weights_generation += 1
+        self._snapshot_journal_seq = 0
         loaded_user_model = self._load_user_model()
         if not loaded_user_model:
+            self._snapshot_journal_seq = 0
             self._legacy_model_from_settings(settings)
+        replayed = self._replay_journal(self._snapshot_journal_seq)
+        self.journal.seq = max(self.journal.seq, self._snapshot_journal_seq)
+        if not loaded_user_model or replayed:
             self.save_user_model()
 
         needs_settings_save = not self.data_file.exists()
@@ -265,33 +414,135 @@ class ShortsAIModel:
         if needs_settings_save:
             self.save_data()
         self._sync_export_model()
+        self._rebuild_scorer()
+
+    def _rebuild_scorer(self) -> None:
+        self.scorer = FusedActionScorer(
+            self.base_index,
+            self.user_model.get("action_weights", {}),
+            base_scale=BASE_MODEL_SCALE,
+            user_scale=USER_MODEL_SCALE,
+        )
+        self._touch_state()
 
     def save_data(self) -> None:
-        data = {
-            "schema_version": SETTINGS_SCHEMA_VERSION,
-            "trusted_channels": sorted(self.user_preferences.get("trusted_channels", set())),
-            "blocked_channels": sorted(self.user_preferences.get("blocked_channels", set())),
-            "current_mood": self.user_preferences.get("current_mood", "Neutral"),
-            "mood_last_changed": float(self.user_preferences.get("mood_last_changed", time.time())),
-        }
-        self.data_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        with self._lock:
+            generation = self._next_generation()
+            data = {
+                "schema_version": SETTINGS_SCHEMA_VERSION,
+                "trusted_channels": sorted(self.user_preferences.get("trusted_channels", set())),
+                "blocked_channels": sorted(self.user_preferences.get("blocked_channels", set())),
+                "current_mood": self.user_preferences.get("current_mood", "Neutral"),
+                "mood_last_changed": float(self.user_preferences.get("mood_last_changed", time.time())),
+            }
+        self._write_snapshot(("settings",), generation, [(self.data_file, data)])
+
+    def _pruned_user_weights(self, max_size: int) -> Dict[str, Dict[str, float]]:
+        weights = self.user_model.get("action_weights", {})
+        if self._pruned_generation == self._weights_generation and all(len(weights.get(action, {})) <= max_size for action in ACTIONS):
+            return weights
+        pruned = prune_action_weights(weights, max_size=max_size)
+        if all(len(pruned[action]) == len(weights.get(action, {})) for action in ACTIONS):
+            self._pruned_generation = self._weights_generation
+        return pruned
 
     def save_user_model(self) -> None:
-        payload = {
-            "action_weights": prune_action_weights(self.user_model.get("action_weights", {}), max_size=18000),
-            "action_counts": self._sanitize_action_counts(self.user_model.get("action_counts")),
-        }
-        self.user_model = payload
-        watch_count = sum(payload["action_counts"].values())
-        if self.user_model_file == self.export_model_file:
-            combined_payload = self._export_payload(watch_count)
-            self.user_model_file.write_text(json.dumps(combined_payload, indent=2), encoding="utf-8")
-        else:
-            self.user_model_file.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-            self._sync_export_model(watch_count)
+        with self._write_section():
+            generation = self._next_generation()
+            weights = self._pruned_user_weights(18000)
+            counts = self._sanitize_action_counts(self.user_model.get("action_counts"))
+            if self._pruned_generation == self._weights_generation:
+                self.user_model["action_counts"] = counts
+            else:
+                self.user_model = {"action_weights": weights, "action_counts": counts}
+                self._pruned_generation = self._weights_generation
+                self._rebuild_scorer()
+            watch_count = sum(counts.values())
+            snapshot_seq = self.journal.seq
+            export_payload = self._export_payload(watch_count)
+            user_payload = {
+                "action_weights": export_payload["action_weights"],
+                "action_counts": dict(counts),
+                "journal_seq": snapshot_seq,
+            }
+            writes = [(self.user_snapshot_file, user_payload), (self.export_model_file, export_payload)]
+        with self._io_lock:
+            if generation <= self._written_generation.get("user_model", 0):
+                return
+            for path, data in writes:
+                atomic_write_text(path, json.dumps(data, indent=2))
+            self._written_generation["user_model"] = generation
+            self._written_generation["export_model"] = generation
+            self._snapshot_journal_seq = snapshot_seq
+            self.journal.compact(snapshot_seq)
+
+    def _replay_journal(self, after_seq: int) -> int:
+        entries = self.journal.read(after_seq)
+        for entry in entries:
+            self._apply_learning(
+                sanitize_feature_weight_map(entry.get("patterns")),
+                str(entry.get("action") or ""),
+                _safe_float(entry.get("delta", 0.0), 0.0),
+            )
+        return len(entries)
+
+    def _apply_learning(self, patterns: Dict[str, float], action: str, delta: float) -> None:
+        if action not in ACTIONS:
+            return
+        self.user_model["action_counts"][action] += 1
+        if patterns:
+            self._weights_generation += 1
+            self._update_action_weights(self.user_model["action_weights"], patterns, action, delta, self.scorer)
+
+    def _flush_dirty_state(self, keys: Set[str]) -> None:
+        if "journal" in keys:
+            self.journal.sync()
+        if "user_model" in keys:
+            self.save_user_model()
+        if "settings" in keys:
+            self.save_data()
+
+    def flush(self) -> bool:
+        flushed_settings = self.persister.flush()
+        flushed_model = self.compactor.flush()
+        return flushed_settings or flushed_model
+
+    def close(self) -> None:
+        self.persister.close()
+        self.compactor.close()
+        self.journal.close()
 
     def reload_base_model(self) -> None:
-        self.base_model = load_base_model(self.base_model_file)
+        loaded = load_base_model(self.base_model_file, cache=self.base_model_cache)
+        if loaded is self.base_model:
+            return
+        base_index = self.base_model_cache.action_index(loaded)
+        with self._write_section():
+            self.base_model = loaded
+            self.base_index = base_index
+            self._rebuild_scorer()
+
+    def prediction_snapshot(self) -> PredictionSnapshot:
+        snapshot = self._prediction_snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            return self._publish_snapshot()
+
+    def get_base_model_cache_stats(self) -> Dict[str, int]:
+        return self.base_model_cache.stats()
+
+    def get_pattern_cache_stats(self) -> Dict[str, Any]:
+        return self.pattern_cache.stats()
+
+    def get_session_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            "recent_videos": self.session_recent_video_actions.stats(),
+            "video_scores": self.session_video_action_scores.stats(),
+        }
+
+    def user_feature_count(self) -> int:
+        return sum(len(weights) for weights in self.user_model.get("action_weights", {}).values())
 
     def _record_context(
         self,
@@ -341,6 +592,7 @@ class ShortsAIModel:
 
         return self.user_preferences.get("current_mood", "Neutral")
 
+    @_synchronized
     def set_mood(self, mood: str) -> None:
         if mood not in MOODS:
             return
@@ -349,35 +601,42 @@ class ShortsAIModel:
             return
         self.user_preferences["current_mood"] = mood
         self.user_preferences["mood_last_changed"] = time.time()
-        self.save_data()
+        self._touch_state()
+        self.persister.mark_dirty("settings")
 
     def _action_push(self, target_action: str, action: str) -> float:
         return 1.0 if action == target_action else -0.58
 
-    def _update_action_weights(self, weights: Dict[str, Dict[str, float]], patterns: Dict[str, float], target_action: str, delta: float) -> None:
+    def _update_action_weights(
+        self,
+        weights: Dict[str, Dict[str, float]],
+        patterns: Dict[str, float],
+        target_action: str,
+        delta: float,
+        index: Optional[FusedActionScorer] = None,
+    ) -> None:
         for action in ACTIONS:
             direction = self._action_push(target_action, action)
             target_weights = weights.setdefault(action, {})
             for key, value in patterns.items():
-                updated = target_weights.get(key, 0.0) + (delta * direction * value)
-                target_weights[key] = clamp(updated, -6.0, 6.0)
+                updated = clamp(target_weights.get(key, 0.0) + (delta * direction * value), -6.0, 6.0)
+                target_weights[key] = updated
+                if index is not None:
+                    index.set(action, key, updated)
 
-    def _update_video_action_scores(self, store: Dict[str, Dict[str, float]], video_id: str, target_action: str, delta: float) -> None:
-        current = sanitize_action_score_map(store.get(video_id))
+    def _update_video_action_scores(self, store: SessionLRU, video_id: str, target_action: str, delta: float) -> None:
+        current = sanitize_action_score_map(store.peek(video_id))
         for action in ACTIONS:
             current[action] = clamp(current[action] + (delta * self._action_push(target_action, action) * 4.0), -18.0, 18.0)
-        store[video_id] = current
+        store.set(video_id, current)
 
     def _remember_video(self, video_id: str, action: str) -> None:
-        self.session_recent_video_actions[video_id] = {"timestamp": time.time(), "action": action}
-        if len(self.session_recent_video_actions) > 800:
-            oldest = sorted(self.session_recent_video_actions.items(), key=lambda item: float(item[1].get("timestamp", 0.0) or 0.0))[:200]
-            for key, _ in oldest:
-                self.session_recent_video_actions.pop(key, None)
-        if len(self.session_video_action_scores) > 1200:
-            oldest_ids = list(self.session_video_action_scores.keys())[:300]
-            for key in oldest_ids:
-                self.session_video_action_scores.pop(key, None)
+        self.session_recent_video_actions.set(video_id, {"timestamp": time.time(), "action": action})
+
+    @_synchronized
+    def _forget_video(self, video_id: str) -> None:
+        if self.session_recent_video_actions.pop(video_id, None) is not None:
+            self._touch_state()
 
     def _event_learning_signal(self, event_type: str, watched_percent: float) -> Optional[Dict[str, Any]]:
         watch_ratio = watched_percent / 100.0 if watched_percent > 1 else watched_percent
@@ -401,6 +660,7 @@ class ShortsAIModel:
             return {"action": "like", "global_scale": scale, "video_scale": video_scale}
         return None
 
+    @_synchronized
     def process_event(
         self,
         video_id: str,
@@ -414,13 +674,15 @@ class ShortsAIModel:
         tags: Optional[List[str]] = None,
         duration_seconds: int = 0,
     ) -> Dict[str, Any]:
+        started = time.perf_counter()
         if mood and mood in MOODS and mood != self.user_preferences.get("current_mood"):
             self.set_mood(mood)
 
         reward = reward_from_event(event_type, watched_percent)
         context = self._record_context(title, description, captions, tags, duration_seconds, watched_percent)
-        patterns = extract_patterns(context, self.get_current_mood())
+        patterns = self.pattern_cache.extract(context, self.get_current_mood())
         signal = self._event_learning_signal(event_type, watched_percent)
+        extracted_at = time.perf_counter()
 
         self.buffer.append(
             {
@@ -433,33 +695,87 @@ class ShortsAIModel:
             }
         )
 
+        trusted = self.user_preferences["trusted_channels"]
+        blocked = self.user_preferences["blocked_channels"]
         if event_type == "trust_channel":
-            self.user_preferences["trusted_channels"].add(channel_id)
-            self.user_preferences["blocked_channels"].discard(channel_id)
+            trusted, blocked = trusted | {channel_id}, blocked - {channel_id}
         elif event_type == "untrust_channel":
-            self.user_preferences["trusted_channels"].discard(channel_id)
+            trusted = trusted - {channel_id}
         elif event_type == "block_channel":
-            self.user_preferences["blocked_channels"].add(channel_id)
-            self.user_preferences["trusted_channels"].discard(channel_id)
+            trusted, blocked = trusted - {channel_id}, blocked | {channel_id}
         elif event_type == "unblock_channel":
-            self.user_preferences["blocked_channels"].discard(channel_id)
+            blocked = blocked - {channel_id}
+        self.user_preferences["trusted_channels"] = trusted
+        self.user_preferences["blocked_channels"] = blocked
 
         if signal:
-            self.user_model["action_counts"][signal["action"]] += 1
-
-        if signal and patterns:
-            learning_multiplier = 0.78 + (0.22 * clamp((watched_percent / 100.0) if watched_percent > 1 else watched_percent, 0.0, 1.0))
-            pattern_delta = self.learning_rate * learning_multiplier * float(signal["global_scale"])
-            self._update_action_weights(self.user_model["action_weights"], patterns, signal["action"], pattern_delta)
-            self._update_video_action_scores(self.session_video_action_scores, video_id, signal["action"], float(signal["video_scale"]))
+            pattern_delta = 0.0
+            if patterns:
+                learning_multiplier = 0.78 + (0.22 * clamp((watched_percent / 100.0) if watched_percent > 1 else watched_percent, 0.0, 1.0))
+                pattern_delta = self.learning_rate * learning_multiplier * float(signal["global_scale"])
+                self._update_video_action_scores(self.session_video_action_scores, video_id, signal["action"], float(signal["video_scale"]))
+            self._apply_learning(patterns, signal["action"], pattern_delta)
+            learned_at = time.perf_counter()
+            self.journal.append(
+                {
+                    "ts": round(time.time(), 3),
+                    "video_id": video_id,
+                    "action": signal["action"],
+                    "delta": pattern_delta,
+                    "patterns": patterns,
+                }
+            )
+            self.compactor.mark_dirty("user_model")
+            self.persister.mark_dirty("journal")
+        else:
+            learned_at = time.perf_counter()
 
         if signal and (watched_percent > 10 or event_type == "undo_ai_scroll"):
             self._remember_video(video_id, signal["action"])
 
-        self.save_user_model()
-        self.save_data()
+        self._touch_state()
+        if event_type in {"trust_channel", "untrust_channel", "block_channel", "unblock_channel"}:
+            self.persister.mark_dirty("settings")
+        finished = time.perf_counter()
+        EVENT_EXTRACT_TIMER.observe(extracted_at - started)
+        EVENT_LEARN_TIMER.observe(learned_at - extracted_at)
+        EVENT_PERSIST_TIMER.observe(finished - learned_at)
+        EVENT_TOTAL_TIMER.observe(finished - started)
+        EVENT_COUNTERS[signal["action"] if signal else "ignored"].inc()
         return {"corrections_made": 0}
 
+    def process_events(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        results: List[Dict[str, Any]] = []
+        with self._lock:
+            self._defer_publish = True
+        try:
+            with self.journal.deferred_flush():
+                for index, event in enumerate(events):
+                    try:
+                        result = self.process_event(**event)
+                        results.append({"index": index, "status": "success", "corrections_made": result.get("corrections_made", 0)})
+                    except Exception as exc:  # noqa: BLE001
+                        results.append({"index": index, "status": "error", "detail": str(exc)})
+                    if time.monotonic() - self._last_publish >= SNAPSHOT_PUBLISH_INTERVAL:
+                        with self._lock:
+                            self._publish_snapshot()
+        finally:
+            with self._lock:
+                self._defer_publish = False
+                self._publish_snapshot()
+        applied_at = time.perf_counter()
+        self.flush()
+        finished = time.perf_counter()
+        return {
+            "results": results,
+            "applied": sum(1 for result in results if result["status"] == "success"),
+            "failed": sum(1 for result in results if result["status"] != "success"),
+            "apply_ms": round((applied_at - started) * 1000.0, 3),
+            "commit_ms": round((finished - applied_at) * 1000.0, 3),
+            "total_ms": round((finished - started) * 1000.0, 3),
+        }
+
     def predict_action(
         self,
         video_id: str,
@@ -471,62 +787,107 @@ class ShortsAIModel:
         duration_seconds: int = 0,
         mood: str = "Neutral",
     ) -> Dict[str, Any]:
+        video = {
+            "video_id": video_id,
+            "channel_id": channel_id,
+            "title": title,
+            "description": description,
+            "captions": captions,
+            "tags": tags,
+            "duration_seconds": duration_seconds,
+        }
+        return self.predict_actions([video], mood)[0]
+
+    def predict_actions(self, videos: List[Dict[str, Any]], mood: str = "Neutral") -> List[Dict[str, Any]]:
+        started = time.perf_counter()
         if mood and mood in MOODS and mood != self.user_preferences.get("current_mood"):
             self.set_mood(mood)
 
         self.reload_base_model()
-        context = self._record_context(title, description, captions, tags, duration_seconds, 0.0)
-        patterns = extract_patterns(context, self.get_current_mood())
-
-        base_scores, base_matches = score_action_patterns(patterns, self.base_model.get("action_weights", {}))
-        user_scores, user_matches = score_action_patterns(patterns, self.user_model.get("action_weights", {}))
-        base_bias = sanitize_action_score_map(self.base_model.get("action_bias"), {"like": 0.12, "skip": -0.12})
-        user_bias = self._compute_action_bias(self.user_model.get("action_counts", {}))
-        session_video_scores = sanitize_action_score_map(self.session_video_action_scores.get(video_id))
-
-        combined = empty_action_bias()
-        for action in ACTIONS:
-            combined[action] = (
-                base_bias[action]
-                + user_bias[action]
-                + (base_scores[action] * 0.94)
-                + (user_scores[action] * 1.42)
-                + (session_video_scores[action] * 0.18)
+        reloaded_at = time.perf_counter()
+        extract_seconds = 0.0
+        current_mood = self.get_current_mood()
+        snapshot = self.prediction_snapshot()
+        shared_bias = snapshot.shared_bias
+        trusted_channels = snapshot.trusted_channels
+        blocked_channels = snapshot.blocked_channels
+        now = time.time()
+        recent_hits = 0
+        score_hits = 0
+
+        decisions = []
+        for video in videos:
+            video_id = str(video.get("video_id") or "")
+            channel_id = str(video.get("channel_id") or "unknown")
+            context = self._record_context(
+                str(video.get("title") or ""),
+                str(video.get("description") or ""),
+                str(video.get("captions") or ""),
+                video.get("tags"),
+                int(video.get("duration_seconds") or 0),
+                0.0,
+            )
+            extract_started = time.perf_counter()
+            patterns = self.pattern_cache.extract(context, current_mood)
+            extract_seconds += time.perf_counter() - extract_started
+            model_scores, matched_patterns = snapshot.scorer.score(patterns)
+            session_video_scores = self.session_video_action_scores.peek(video_id)
+            if session_video_scores is not None:
+                score_hits += 1
+            session_video_scores = sanitize_action_score_map(session_video_scores)
+
+            combined = empty_action_bias()
+            for action in ACTIONS:
+                combined[action] = shared_bias[action] + model_scores[action] + (session_video_scores[action] * 0.18)
+
+            if matched_patterns == 0:
+                combined["like"] += 0.16
+            elif matched_patterns >= 8:
+                combined["skip"] += 0.03
+
+            recent = self.session_recent_video_actions.peek(video_id)
+            if isinstance(recent, dict):
+                recent_hits += 1
+                age_seconds = now - _safe_float(recent.get("timestamp", 0.0), 0.0)
+                if age_seconds < RECENT_VIDEO_WINDOW_SECONDS:
+                    combined["skip"] += 0.48
+                    combined["like"] -= 0.12
+                elif age_seconds > RECENT_VIDEO_TTL_SECONDS:
+                    self._forget_video(video_id)
+
+            if channel_id in trusted_channels:
+                combined["like"] += 0.75
+            if channel_id in blocked_channels:
+                combined["skip"] += 1.4
+
+            probabilities = _softmax(combined)
+            skip_ready = probabilities["skip"] >= max(0.53, probabilities["like"] + 0.015)
+            chosen_action = "skip" if skip_ready else "like"
+            confidence = probabilities[chosen_action]
+            decisions.append(
+                {
+                    "action": chosen_action,
+                    "confidence": round(clamp(confidence, 0.0, 0.99), 4),
+                    "matched_patterns": matched_patterns,
+                    "probabilities": {action: round(probabilities[action], 4) for action in ACTIONS},
+                    "components": {action: round(combined[action], 4) for action in ACTIONS},
+                }
             )
 
-        matched_patterns = base_matches + user_matches
-        if matched_patterns == 0:
-            combined["like"] += 0.16
-        elif matched_patterns >= 8:
-            combined["skip"] += 0.03
-
-        recent = self.session_recent_video_actions.get(video_id)
-        if isinstance(recent, dict):
-            age_seconds = time.time() - _safe_float(recent.get("timestamp", 0.0), 0.0)
-            if age_seconds < 3600:
-                combined["skip"] += 0.48
-                combined["like"] -= 0.12
-            elif age_seconds > 604800:
-                self.session_recent_video_actions.pop(video_id, None)
-
-        if channel_id in self.user_preferences.get("trusted_channels", set()):
-            combined["like"] += 0.75
-        if channel_id in self.user_preferences.get("blocked_channels", set()):
-            combined["skip"] += 1.4
-
-        probabilities = _softmax(combined)
-        skip_ready = probabilities["skip"] >= max(0.53, probabilities["like"] + 0.015)
-        chosen_action = "skip" if skip_ready else "like"
-        confidence = probabilities[chosen_action]
-
-        return {
-            "action": chosen_action,
-            "confidence": round(clamp(confidence, 0.0, 0.99), 4),
-            "matched_patterns": matched_patterns,
-            "probabilities": {action: round(probabilities[action], 4) for action in ACTIONS},
-            "components": {action: round(combined[action], 4) for action in ACTIONS},
-            "mood_suggestion": self.suggest_mood_change(),
-        }
+        self.session_recent_video_actions.record_lookups(recent_hits, len(videos) - recent_hits)
+        self.session_video_action_scores.record_lookups(score_hits, len(videos) - score_hits)
+        scored_at = time.perf_counter()
+        mood_suggestion = self.suggest_mood_change()
+        for decision in decisions:
+            decision["mood_suggestion"] = mood_suggestion
+            PREDICTION_COUNTERS[decision["action"]].inc()
+        finished = time.perf_counter()
+        PREDICT_RELOAD_TIMER.observe(reloaded_at - started)
+        PREDICT_EXTRACT_TIMER.observe(extract_seconds)
+        PREDICT_SCORE_TIMER.observe(scored_at - reloaded_at - extract_seconds)
+        PREDICT_MOOD_TIMER.observe(finished - scored_at)
+        PREDICT_TOTAL_TIMER.observe(finished - started)
+        return decisions
 
     def predict_score(
         self,
@@ -542,9 +903,13 @@ class ShortsAIModel:
         return self.predict_action(video_id, channel_id, title, description, captions, tags, duration_seconds, mood)
 
     def export_contribution_model(self, export_path: Union[str, Path], watch_count: int = 0) -> Dict[str, Any]:
-        export_file = Path(export_path)
-        payload = self._export_payload(watch_count)
-        export_file.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        export_file = Path(export_path).resolve()
+        if self.compactor.is_dirty():
+            self.save_user_model()
+        with self._lock:
+            generation = self._next_generation()
+            payload = self._export_payload(watch_count)
+        self._write_snapshot(self._snapshot_kinds(export_file), generation, [(export_file, payload)])
         if export_file != self.export_model_file:
             self._sync_export_model(int(payload.get("watch_count", 0) or 0))
         total = max(int(payload.get("watch_count", 0) or 0), 1)
@@ -560,18 +925,19 @@ class ShortsAIModel:
         return len(self.buffer)
 
     def suggest_mood_change(self) -> str:
+        snapshot = self.prediction_snapshot()
         current_time = time.time()
         if current_time - self.last_mood_check < 180:
-            return self.user_preferences.get("current_mood", "Neutral")
+            return snapshot.current_mood
 
         self.last_mood_check = current_time
-        recent_events = [event for event in self.buffer if current_time - event["timestamp"] <= 240]
+        recent_events = [event for event in snapshot.recent_events if current_time - event["timestamp"] <= 240]
         if len(recent_events) < 4:
-            return self.user_preferences.get("current_mood", "Neutral")
+            return snapshot.current_mood
 
         reward_total = sum(float(event.get("reward", 0.0) or 0.0) for event in recent_events)
         if reward_total <= -1.5:
             return "Relaxed"
-        if reward_total >= 1.5 and self.user_preferences.get("current_mood") == "Neutral":
+        if reward_total >= 1.5 and snapshot.current_mood == "Neutral":
             return "Curious"
-        return self.user_preferences.get("current_mood", "Neutral")
+        return snapshot.current_mood
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple, Union
+
+from persistence import atomic_write_bytes
+
+MAPPED_MODEL_SUFFIX = ".shbm"
+MAGIC = b"SHBM"
+FORMAT_VERSION = 2
+DIGEST_SIZE = 12
+CHECKSUM_SIZE = 16
+FANOUT_SIZE = 256
+FEATURE_PREFIX = "f_"
+FEATURE_KEY_RE = re.compile(r"f_[0-9a-f]{24}")
+SLOT_CACHE_SIZE = 1 << 16
+HEADER = struct.Struct(f"<4sHHII{CHECKSUM_SIZE}s")
+TABLE_FIELDS = ("action_weights", "action_counts")
+RUNTIME_FIELDS = ("source_path", "model_format", "mapped_index", "feature_count")
+# Windows will not replace a file while any process maps it, so writers there would fail
+# against a running backend; readers take a private copy instead of sharing the mapping.
+MAP_FILES = os.name != "nt"
+
+
+def _align(offset: int, boundary: int) -> int:
+    return (offset + boundary - 1) // boundary * boundary
+
+
+def _little_endian(view: memoryview, code: str) -> Union[memoryview, array]:
+    if sys.byteorder == "little":
+        return view.cast(code)
+    converted = array(code, view.tobytes())
+    converted.byteswap()
+    return converted
+
+
+def _checksum(body: Union[bytes, memoryview]) -> bytes:
+    return hashlib.blake2b(body, digest_size=CHECKSUM_SIZE).digest()
+
+
+def _json_value(value: Any) -> bool:
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def feature_digest(key: Any) -> Optional[bytes]:
+    if not isinstance(key, str) or not FEATURE_KEY_RE.fullmatch(key):
+        return None
+    return bytes.fromhex(key[len(FEATURE_PREFIX):])
+
+
+def encode_mapped_model(model: Dict[str, Any], actions: Tuple[str, ...]) -> bytes:
+    from pattern_engine import sanitize_feature_weight_map
+
+    weights = model.get("action_weights") if isinstance(model.get("action_weights"), dict) else {}
+    tables = [sanitize_feature_weight_map(weights.get(action)) for action in actions]
+    ordered = sorted(set().union(*tables))
+    count = len(ordered)
+    digests = bytes.fromhex("".join(key[len(FEATURE_PREFIX):] for key in ordered))
+
+    raw_counts = model.get("action_counts") if isinstance(model.get("action_counts"), dict) else {}
+    counts = array("Q", (max(0, int(raw_counts.get(action, 0) or 0)) for action in actions))
+    metadata = {
+        key: value
+        for key, value in model.items()
+        if key not in TABLE_FIELDS and key not in RUNTIME_FIELDS and value is not None and _json_value(value)
+    }
+    metadata["actions"] = list(actions)
+    metadata_bytes = json.dumps(metadata, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+    fanout = array("I", [0] * FANOUT_SIZE)
+    for slot in range(0, len(digests), DIGEST_SIZE):
+        fanout[digests[slot]] += 1
+    running = 0
+    for bucket in range(FANOUT_SIZE):
+        running += fanout[bucket]
+        fanout[bucket] = running
+
+    mask = bytearray(count)
+    columns = []
+    for position, table in enumerate(tables):
+        bit = 1 << position
+        for slot, key in enumerate(ordered):
+            if key in table:
+                mask[slot] |= bit
+        columns.append(array("f", (table.get(key, 0.0) for key in ordered)))
+    if sys.byteorder != "little":
+        for table in (counts, fanout, *columns):
+            table.byteswap()
+
+    parts = [counts.tobytes(), metadata_bytes]
+    offset = HEADER.size + len(actions) * 8 + len(metadata_bytes)
+    padding = _align(offset, 8) - offset
+    parts.append(b"\0" * padding)
+    parts.extend([fanout.tobytes(), digests, bytes(mask)])
+    offset += padding + FANOUT_SIZE * 4 + count * (DIGEST_SIZE + 1)
+    parts.append(b"\0" * (_align(offset, 4) - offset))
+    parts.extend(column.tobytes() for column in columns)
+    body = b"".join(parts)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, len(actions), count, len(metadata_bytes), _checksum(body)) + body
+
+
+def write_mapped_model(path: Union[str, Path], model: Dict[str, Any], actions: Tuple[str, ...]) -> None:
+    atomic_write_bytes(path, encode_mapped_model(model, actions))
+
+
+class MappedModelFile:
+    def __init__(self, path: Union[str, Path], buffer: Union[bytes, mmap.mmap, None] = None):
+        self.path = Path(path)
+        if buffer is None:
+            with self.path.open("rb") as handle:
+                buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) if MAP_FILES else handle.read()
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            raise ValueError(f"{self.path.name}: truncated header")
+        magic, version, action_count, count, metadata_size, checksum = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path.name}: not a mapped model file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{self.path.name}: unsupported format version {version}")
+        if _checksum(view[HEADER.size:]) != checksum:
+            raise ValueError(f"{self.path.name}: checksum mismatch")
+
+        offset = HEADER.size + action_count * 8
+        metadata_end = offset + metadata_size
+        fanout_start = _align(metadata_end, 8)
+        fanout_end = fanout_start + FANOUT_SIZE * 4
+        digests_end = fanout_end + count * DIGEST_SIZE
+        mask_end = digests_end + count
+        weights_start = _align(mask_end, 4)
+        if len(view) != weights_start + action_count * count * 4:
+            raise ValueError(f"{self.path.name}: table sizes do not match header")
+
+        self.metadata: Dict[str, Any] = json.loads(bytes(view[offset:metadata_end]).decode("utf-8"))
+        self.actions: Tuple[str, ...] = tuple(str(action) for action in self.metadata.get("actions", []))
+        if len(self.actions) != action_count:
+            raise ValueError(f"{self.path.name}: action table does not match header")
+        self.version = version
+        self.feature_count = count
+        self.action_counts = dict(zip(self.actions, (int(value) for value in _little_endian(view[HEADER.size:offset], "Q"))))
+        self.fanout = _little_endian(view[fanout_start:fanout_end], "I")
+        self.digests = view[fanout_end:digests_end]
+        self.mask = view[digests_end:mask_end]
+        self.weights = {
+            action: _little_endian(view[weights_start + position * count * 4:weights_start + (position + 1) * count * 4], "f")
+            for position, action in enumerate(self.actions)
+        }
+        if self.fanout[FANOUT_SIZE - 1] != count:
+            raise ValueError(f"{self.path.name}: fanout table does not match feature count")
+
+    def __len__(self) -> int:
+        return self.feature_count
+
+    def find(self, digest: bytes) -> Optional[int]:
+        bucket = digest[0]
+        low = self.fanout[bucket - 1] if bucket else 0
+        high = self.fanout[bucket]
+        slot = bisect_left(_DigestTable(self.digests), digest, low, high)
+        if slot < high and self.digests[slot * DIGEST_SIZE:(slot + 1) * DIGEST_SIZE] == digest:
+            return slot
+        return None
+
+    def key(self, slot: int) -> str:
+        return FEATURE_PREFIX + self.digests[slot * DIGEST_SIZE:(slot + 1) * DIGEST_SIZE].hex()
+
+
+def decode_mapped_model(data: bytes, name: str = "<memory>") -> MappedModelFile:
+    return MappedModelFile(name, data)
+
+
+class _DigestTable:
+    def __init__(self, digests: memoryview):
+        self.digests = digests
+
+    def __len__(self) -> int:
+        return len(self.digests) // DIGEST_SIZE
+
+    def __getitem__(self, slot: int) -> bytes:
+        return bytes(self.digests[slot * DIGEST_SIZE:(slot + 1) * DIGEST_SIZE])
+
+
+class MappedSlots:
+    def __init__(self, mapped: MappedModelFile):
+        self.mapped = mapped
+        self.get = lru_cache(maxsize=SLOT_CACHE_SIZE)(self._find)
+
+    def _find(self, key: str) -> Optional[int]:
+        digest = feature_digest(key)
+        return self.mapped.find(digest) if digest is not None else None
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key) is not None if isinstance(key, str) else False
+
+    def __len__(self) -> int:
+        return len(self.mapped)
+
+
+class MappedActionWeights(Mapping):
+    def __init__(self, mapped: MappedModelFile, slots: MappedSlots, action: str):
+        self.mapped = mapped
+        self.slots = slots
+        self.bit = 1 << mapped.actions.index(action)
+        self.values = mapped.weights[action]
+        self._size: Optional[int] = None
+
+    def __getitem__(self, key: str) -> float:
+        slot = self.slots.get(key)
+        if slot is None or not self.mapped.mask[slot] & self.bit:
+            raise KeyError(key)
+        return float(self.values[slot])
+
+    def __iter__(self) -> Iterator[str]:
+        for slot, _ in self._present():
+            yield self.mapped.key(slot)
+
+    def __len__(self) -> int:
+        if self._size is None:
+            self._size = sum(1 for _ in self._present())
+        return self._size
+
+    def _present(self) -> Iterator[Tuple[int, float]]:
+        mask = self.mapped.mask
+        bit = self.bit
+        for slot, value in enumerate(self.values):
+            if mask[slot] & bit:
+                yield slot, value
+
+    def items(self) -> Iterator[Tuple[str, float]]:
+        for slot, value in self._present():
+            yield self.mapped.key(slot), float(value)
+
+
+class MappedActionIndex:
+    generation = 0
+
+    def __init__(self, mapped: MappedModelFile):
+        self.mapped = mapped
+        self.slots = MappedSlots(mapped)
+        self.action_weights = {action: MappedActionWeights(mapped, self.slots, action) for action in mapped.actions}
+
+    def __len__(self) -> int:
+        return len(self.mapped)
+
+    def copy(self) -> MappedActionIndex:
+        return self
+
+    def scaled_view(self, factor: float) -> Tuple[Dict[str, Union[memoryview, array]], float, memoryview]:
+        return self.mapped.weights, float(factor), self.mapped.mask
+
+    def gather(self, keys: Iterable[str]) -> Tuple[Dict[str, array], bytearray]:
+        mask = self.mapped.mask
+        bits = [(action, 1 << position, self.mapped.weights[action]) for position, action in enumerate(self.mapped.actions)]
+        weights = {action: array("d") for action in self.mapped.actions}
+        hits = bytearray()
+        for key in keys:
+            slot = self.slots.get(key)
+            present = mask[slot] if slot is not None else 0
+            for action, bit, column in bits:
+                weights[action].append(column[slot] if present & bit else 0.0)
+            hits.append(1 if present else 0)
+        return weights, hits
+
+    def score(self, patterns: Dict[str, float]) -> Tuple[Dict[str, float], int]:
+        mask = self.mapped.mask
+        bits = [(action, 1 << position, self.mapped.weights[action]) for position, action in enumerate(self.mapped.actions)]
+        scores = {action: 0.0 for action in self.mapped.actions}
+        matched = 0
+        for key, value in patterns.items():
+            slot = self.slots.get(key)
+            if slot is None or not mask[slot]:
+                continue
+            for action, bit, weights in bits:
+                if mask[slot] & bit:
+                    scores[action] += weights[slot] * value
+            matched += 1
+        return scores, matched
+
+
+def read_mapped_model(path: Union[str, Path]) -> Optional[MappedModelFile]:
+    try:
+        return MappedModelFile(path)
+    except (OSError, ValueError):
+        return None
+
+
+def mapped_model_to_json(mapped: MappedModelFile) -> Dict[str, Any]:
+    payload = {key: value for key, value in mapped.metadata.items() if key != "actions"}
+    payload["action_weights"] = {action: dict(weights.items()) for action, weights in MappedActionIndex(mapped).action_weights.items()}
+    payload["action_counts"] = dict(mapped.action_counts)
+    return payload
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Convert a model between the JSON schema and the shared memory-mapped format.")
+    parser.add_argument("source", nargs="?", default="trained_model.json", help=f"JSON model to pack, or a {MAPPED_MODEL_SUFFIX} model to export back to JSON.")
+    parser.add_argument("--output", default=None, help="Where to write the converted model. Defaults to the source name with the other suffix.")
+    args = parser.parse_args()
+
+    from pattern_engine import ACTIONS, build_base_model, persist_mapped_base_model, read_json_file
+
+    source = Path(args.source)
+    if source.suffix == MAPPED_MODEL_SUFFIX:
+        mapped = read_mapped_model(source)
+        if mapped is None:
+            print(f"[model-format] Could not read a mapped model from {source}")
+            return 1
+        output_path = Path(args.output) if args.output else source.with_suffix(".json")
+        atomic_write_bytes(output_path, json.dumps(mapped_model_to_json(mapped), indent=2).encode("utf-8"))
+        print(f"[model-format] wrote {output_path} with {len(mapped)} features")
+        return 0
+
+    payload = read_json_file(source)
+    if payload is None:
+        print(f"[model-format] Could not read a JSON model from {source}")
+        return 1
+    output_path = Path(args.output) if args.output else source.with_suffix(MAPPED_MODEL_SUFFIX)
+    if payload.get("model_role") == "user_preference_delta":
+        write_mapped_model(output_path, payload, ACTIONS)
+    else:
+        persist_mapped_base_model(output_path, build_base_model(source, source, payload))
+    mapped = MappedModelFile(output_path)
+    print(f"[model-format] wrote {output_path} with {len(mapped)} features ({output_path.stat().st_size} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from profiling import RuntimeProfiler
+
+DEFAULT_READER_THREADS = 4
+
+
+class ModelWorker:
+    def __init__(self, reader_threads: int = DEFAULT_READER_THREADS, profiler: Optional[RuntimeProfiler] = None):
+        self.profiler = profiler
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shorts-ai-writer")
+        self._readers = ThreadPoolExecutor(max_workers=max(1, int(reader_threads)), thread_name_prefix="shorts-ai-reader")
+
+    async def write(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, self._call(func, args, kwargs))
+
+    async def read(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._call(func, args, kwargs))
+
+    def _call(self, func: Callable[..., Any], args: Any, kwargs: Any) -> Callable[[], Any]:
+        call = partial(func, *args, **kwargs)
+        return self.profiler.wrap(call) if self.profiler is not None else call
+
+    def shutdown(self) -> None:
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
@@ -1,12 +1,21 @@
 ﻿from __future__ import annotations
 
+import functools
 import hashlib
+import heapq
 import json
 import math
 import re
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from model_format import MAPPED_MODEL_SUFFIX, MappedActionIndex, MappedModelFile, read_mapped_model, write_mapped_model
 
 TOKEN_RE = re.compile(r"[a-z0-9]{2,}")
 HASHTAG_RE = re.compile(r"#([a-z0-9_]{2,})")
@@ -19,6 +28,7 @@ STOPWORDS = {
     "what", "when", "where", "who", "why", "with", "you", "your",
 }
 DEFAULT_BASE_MODEL_PATH = "trained_model.json"
+BASE_MODEL_RESCAN_SECONDS = 1.0
 SEMVER_RE = re.compile(r"(?<!\d)(\d+)\.(\d+)\.(\d+)(?!\d)")
 MAX_TEXT_TOKENS = 96
 MAX_BIGRAMS = 64
@@ -27,6 +37,8 @@ MAX_TAG_TOKENS = 24
 ACTIONS = ("like", "skip")
 DEFAULT_ACTION_BIAS = {"like": 0.12, "skip": -0.12}
 FEATURE_ID_RE = re.compile(r"^f_[0-9a-f]{24}$")
+PRUNE_MIN_ABS = 0.015
+FEATURE_ID_CACHE_SIZE = 1 << 17
 
 
 def clamp(value: float, lower: float, upper: float) -> float:
@@ -80,22 +92,47 @@ def normalize_bucket(value: Any, allowed: Iterable[str], fallback: str) -> str:
     return fallback
 
 
+@functools.lru_cache(maxsize=FEATURE_ID_CACHE_SIZE)
+def _intern_feature_id(text: str) -> str:
+    digest = hashlib.blake2s(text.encode("utf-8"), digest_size=12).hexdigest()
+    return sys.intern(f"f_{digest}")
+
+
 def feature_id(key: Any) -> str:
     text = str(key or "").strip()
     if not text:
         return ""
+    # Keys that are already IDs skip the cache so they never evict raw tokens from it.
     if FEATURE_ID_RE.match(text):
-        return text
-    digest = hashlib.blake2s(text.encode("utf-8"), digest_size=12).hexdigest()
-    return f"f_{digest}"
+        return sys.intern(text)
+    return _intern_feature_id(text)
+
+
+def feature_ids(keys: Iterable[Any]) -> List[str]:
+    intern_id = _intern_feature_id
+    is_id = FEATURE_ID_RE.match
+    result: List[str] = []
+    for key in keys:
+        text = str(key or "").strip()
+        if not text:
+            result.append("")
+        elif is_id(text):
+            result.append(sys.intern(text))
+        else:
+            result.append(intern_id(text))
+    return result
+
+
+def feature_id_cache_stats() -> Dict[str, int]:
+    info = _intern_feature_id.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize or 0}
 
 
 def sanitize_feature_weight_map(value: Any) -> Dict[str, float]:
     if not isinstance(value, dict):
         return {}
     cleaned: Dict[str, float] = {}
-    for key, raw in value.items():
-        feature_key = feature_id(key)
+    for feature_key, raw in zip(feature_ids(value.keys()), value.values()):
         if not feature_key:
             continue
         try:
@@ -113,7 +150,24 @@ def _add_pattern(target: Dict[str, float], key: str, value: float) -> None:
 
 
 def extract_patterns(record: Dict[str, Any], mood: Optional[str] = None) -> Dict[str, float]:
+    return finish_patterns(extract_content_patterns(record), record, mood)
+
+
+def _accumulate_patterns(pending: List[Tuple[str, float]]) -> Dict[str, float]:
     patterns: Dict[str, float] = {}
+    for feature_key, (_, value) in zip(feature_ids(key for key, _ in pending), pending):
+        if not feature_key:
+            continue
+        patterns[feature_key] = patterns.get(feature_key, 0.0) + value
+    return patterns
+
+
+def extract_content_patterns(record: Dict[str, Any]) -> Dict[str, float]:
+    return _accumulate_patterns(content_pattern_items(record))
+
+
+def content_pattern_items(record: Dict[str, Any]) -> List[Tuple[str, float]]:
+    pending: List[Tuple[str, float]] = []
 
     title = normalize_space(record.get("title"))
     description = normalize_space(record.get("description"))
@@ -123,10 +177,8 @@ def extract_patterns(record: Dict[str, Any], mood: Optional[str] = None) -> Dict
     body_tokens = tokenize(" ".join(part for part in [title, description, captions] if part))
     text_tokens = unique_preserve_order(body_tokens, MAX_TEXT_TOKENS)
 
-    for token in text_tokens:
-        _add_pattern(patterns, f"tok:{token}", 1.0)
-    for token in title_tokens:
-        _add_pattern(patterns, f"title:{token}", 1.2)
+    pending.extend((f"tok:{token}", 1.0) for token in text_tokens)
+    pending.extend((f"title:{token}", 1.2) for token in title_tokens)
 
     bigrams: List[str] = []
     for index in range(len(body_tokens) - 1):
@@ -135,32 +187,44 @@ def extract_patterns(record: Dict[str, Any], mood: Optional[str] = None) -> Dict
         if left == right:
             continue
         bigrams.append(f"{left}_{right}")
-    for bigram in unique_preserve_order(bigrams, MAX_BIGRAMS):
-        _add_pattern(patterns, f"bi:{bigram}", 0.8)
+    pending.extend((f"bi:{bigram}", 0.8) for bigram in unique_preserve_order(bigrams, MAX_BIGRAMS))
 
     hashtags = unique_preserve_order(HASHTAG_RE.findall(f"{title} {description}".lower()), 12)
-    for hashtag in hashtags:
-        _add_pattern(patterns, f"hash:{hashtag}", 0.9)
+    pending.extend((f"hash:{hashtag}", 0.9) for hashtag in hashtags)
 
     tag_tokens: List[str] = []
     for raw_tag in list(record.get("tags") or [])[:20]:
         tag_tokens.extend(tokenize(raw_tag))
-    for token in unique_preserve_order(tag_tokens, MAX_TAG_TOKENS):
-        _add_pattern(patterns, f"tag:{token}", 0.85)
+    pending.extend((f"tag:{token}", 0.85) for token in unique_preserve_order(tag_tokens, MAX_TAG_TOKENS))
 
     category = normalize_space(record.get("category")).lower().replace(" ", "_")
     if category:
-        _add_pattern(patterns, f"ctx:category:{category}", 0.35)
+        pending.append((f"ctx:category:{category}", 0.35))
+    return pending
+
+
+def context_patterns(content_patterns: Dict[str, float], record: Dict[str, Any], mood: Optional[str] = None) -> Dict[str, float]:
+    patterns = dict(content_patterns)
+    for key, value in context_pattern_items(record, mood):
+        _add_pattern(patterns, key, value)
+    return patterns
+
 
+def context_pattern_items(record: Dict[str, Any], mood: Optional[str] = None) -> List[Tuple[str, float]]:
+    pending: List[Tuple[str, float]] = []
     if mood:
         normalized_mood = normalize_space(mood).lower().replace(" ", "_")
         if normalized_mood:
-            _add_pattern(patterns, f"ctx:mood:{normalized_mood}", 0.28)
+            pending.append((f"ctx:mood:{normalized_mood}", 0.28))
 
-    _add_pattern(patterns, f"ctx:duration:{duration_bucket(record.get('duration_seconds'))}", 0.22)
+    pending.append((f"ctx:duration:{duration_bucket(record.get('duration_seconds'))}", 0.22))
     bucket = normalize_bucket(record.get("time_of_day_bucket"), {"morning", "afternoon", "evening", "night"}, "night")
-    _add_pattern(patterns, f"ctx:time:{bucket}", 0.16)
+    pending.append((f"ctx:time:{bucket}", 0.16))
+    return pending
 
+
+def finish_patterns(content_patterns: Dict[str, float], record: Dict[str, Any], mood: Optional[str] = None) -> Dict[str, float]:
+    patterns = context_patterns(content_patterns, record, mood)
     if not patterns:
         return {}
 
@@ -170,6 +234,75 @@ def extract_patterns(record: Dict[str, Any], mood: Optional[str] = None) -> Dict
     return {key: value / norm for key, value in patterns.items()}
 
 
+class PatternCache:
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024):
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: OrderedDict[str, Tuple[Dict[str, float], int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def content_key(record: Dict[str, Any]) -> str:
+        parts = [
+            str(record.get("title") or ""),
+            str(record.get("description") or ""),
+            str(record.get("captions") or record.get("subtitles_snippet") or ""),
+            str(record.get("category") or ""),
+        ]
+        parts.extend(str(tag) for tag in list(record.get("tags") or [])[:20])
+        return hashlib.blake2s("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _entry_size(key: str, patterns: Dict[str, float]) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(patterns) + sum(sys.getsizeof(feature) + 24 for feature in patterns)
+
+    def content_patterns(self, record: Dict[str, Any]) -> Dict[str, float]:
+        key = self.content_key(record)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        patterns = extract_content_patterns(record)
+        size = self._entry_size(key, patterns)
+        with self._lock:
+            if size > self.max_bytes or key in self._entries:
+                return patterns
+            self._entries[key] = (patterns, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+        return patterns
+
+    def extract(self, record: Dict[str, Any], mood: Optional[str] = None) -> Dict[str, float]:
+        return finish_patterns(self.content_patterns(record), record, mood)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
 def empty_action_bias(fill: float = 0.0) -> Dict[str, float]:
     return {action: float(fill) for action in ACTIONS}
 
@@ -311,6 +444,277 @@ def score_action_patterns(patterns: Dict[str, float], action_weights: Dict[str,
     return scores, matched
 
 
+class ActionWeightIndex:
+    def __init__(self, action_weights: Optional[Dict[str, Dict[str, float]]] = None):
+        self.slots: Dict[str, int] = {}
+        self.weights: Dict[str, array] = {action: array("d") for action in ACTIONS}
+        self.present: Dict[str, bytearray] = {action: bytearray() for action in ACTIONS}
+        self._scaled: Dict[float, Dict[str, array]] = {}
+        self._any_present: Optional[bytearray] = None
+        self.generation = 0
+        for action in ACTIONS:
+            for key, value in (action_weights or {}).get(action, {}).items():
+                self.set(action, key, value)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def copy(self) -> ActionWeightIndex:
+        clone = ActionWeightIndex()
+        clone.slots = dict(self.slots)
+        clone.weights = {action: array("d", self.weights[action]) for action in ACTIONS}
+        clone.present = {action: bytearray(self.present[action]) for action in ACTIONS}
+        clone.generation = self.generation
+        return clone
+
+    def _slot(self, key: str) -> int:
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = len(self.slots)
+            self.slots[key] = slot
+            for action in ACTIONS:
+                self.weights[action].append(0.0)
+                self.present[action].append(0)
+        return slot
+
+    def set(self, action: str, key: str, value: float) -> int:
+        slot = self._slot(key)
+        self.weights[action][slot] = float(value)
+        self.present[action][slot] = 1
+        self._scaled.clear()
+        self._any_present = None
+        self.generation += 1
+        return slot
+
+    def discard(self, action: str, key: str) -> Optional[int]:
+        slot = self.slots.get(key)
+        if slot is None:
+            return None
+        self.weights[action][slot] = 0.0
+        self.present[action][slot] = 0
+        self._scaled.clear()
+        self._any_present = None
+        self.generation += 1
+        return slot
+
+    def any_present(self) -> bytearray:
+        if self._any_present is None:
+            merged = bytearray(len(self.slots))
+            for action in ACTIONS:
+                present = self.present[action]
+                for slot in range(len(merged)):
+                    if present[slot]:
+                        merged[slot] = 1
+            self._any_present = merged
+        return self._any_present
+
+    def scaled(self, factor: float) -> Dict[str, array]:
+        cached = self._scaled.get(factor)
+        if cached is None:
+            cached = {action: array("d", (weight * factor for weight in self.weights[action])) for action in ACTIONS}
+            self._scaled[factor] = cached
+        return cached
+
+    def scaled_view(self, factor: float) -> Tuple[Dict[str, array], float, bytearray]:
+        return self.scaled(factor), 1.0, self.any_present()
+
+    def gather(self, keys: Iterable[str]) -> Tuple[Dict[str, array], bytearray]:
+        slots = [self.slots.get(key) for key in keys]
+        any_present = self.any_present()
+        weights = {action: array("d", (self.weights[action][slot] if slot is not None else 0.0 for slot in slots)) for action in ACTIONS}
+        return weights, bytearray(any_present[slot] if slot is not None else 0 for slot in slots)
+
+    def score(self, patterns: Dict[str, float]) -> Tuple[Dict[str, float], int]:
+        slots = self.slots
+        gathered = [(slot, value) for slot, value in ((slots.get(key), value) for key, value in patterns.items()) if slot is not None]
+        scores = empty_action_bias()
+        hits = bytearray(len(gathered))
+        for action in ACTIONS:
+            weights = self.weights[action]
+            present = self.present[action]
+            total = scores[action]
+            for position, (slot, value) in enumerate(gathered):
+                if present[slot]:
+                    total += weights[slot] * value
+                    hits[position] = 1
+            scores[action] = total
+        return scores, sum(hits)
+
+
+class FusedActionScorer:
+    def __init__(
+        self,
+        base_index: ActionWeightIndex,
+        user_weights: Optional[Dict[str, Dict[str, float]]] = None,
+        base_scale: float = 1.0,
+        user_scale: float = 1.0,
+    ):
+        self.base_index = base_index
+        self.base_scale = float(base_scale)
+        self.user_scale = float(user_scale)
+        self.base_weights, self.base_factor, self.base_hits = base_index.scaled_view(self.base_scale)
+        self.user_index = ActionWeightIndex()
+        self.blended: Dict[str, array] = {action: array("d") for action in ACTIONS}
+        self.user_hits = bytearray()
+        self.overlay_base_hits = bytearray()
+        self.changed: Optional[Set[str]] = None
+        for action in ACTIONS:
+            for key, value in (user_weights or {}).get(action, {}).items():
+                self.set(action, key, value)
+
+    def copy(self) -> FusedActionScorer:
+        clone = FusedActionScorer.__new__(FusedActionScorer)
+        clone.base_index = self.base_index
+        clone.base_scale = self.base_scale
+        clone.user_scale = self.user_scale
+        clone.base_weights = self.base_weights
+        clone.base_factor = self.base_factor
+        clone.base_hits = self.base_hits
+        clone.user_index = self.user_index.copy()
+        clone.blended = {action: array("d", self.blended[action]) for action in ACTIONS}
+        clone.user_hits = bytearray(self.user_hits)
+        clone.overlay_base_hits = bytearray(self.overlay_base_hits)
+        clone.changed = None
+        return clone
+
+    def _sync(self, slot: int, key: str) -> None:
+        while len(self.user_hits) <= slot:
+            for action in ACTIONS:
+                self.blended[action].append(0.0)
+            self.user_hits.append(0)
+            self.overlay_base_hits.append(0)
+        base_slot = self.base_index.slots.get(key)
+        user_hit = 0
+        for action in ACTIONS:
+            base_value = self.base_weights[action][base_slot] * self.base_factor if base_slot is not None else 0.0
+            self.blended[action][slot] = base_value + (self.user_index.weights[action][slot] * self.user_scale)
+            if self.user_index.present[action][slot]:
+                user_hit = 1
+        self.user_hits[slot] = user_hit
+        self.overlay_base_hits[slot] = 1 if base_slot is not None and self.base_hits[base_slot] else 0
+        if self.changed is not None:
+            self.changed.add(key)
+
+    @property
+    def generation(self) -> int:
+        return self.user_index.generation
+
+    def set(self, action: str, key: str, value: float) -> None:
+        self._sync(self.user_index.set(action, key, value), key)
+
+    def discard(self, action: str, key: str) -> None:
+        slot = self.user_index.discard(action, key)
+        if slot is not None:
+            self._sync(slot, key)
+
+    def lookup(self, key: str) -> Tuple[Tuple[float, ...], int]:
+        slot = self.user_index.slots.get(key)
+        if slot is not None:
+            return tuple(self.blended[action][slot] for action in ACTIONS), self.user_hits[slot] + self.overlay_base_hits[slot]
+        slot = self.base_index.slots.get(key)
+        if slot is None:
+            return (0.0,) * len(ACTIONS), 0
+        return tuple(self.base_weights[action][slot] * self.base_factor for action in ACTIONS), 1 if self.base_hits[slot] else 0
+
+    def gather(self, keys: Iterable[str]) -> Tuple[Dict[str, array], bytearray]:
+        user_slots = self.user_index.slots
+        base_slots = self.base_index.slots
+        base_weights = self.base_weights
+        base_factor = self.base_factor
+        weights = {action: array("d") for action in ACTIONS}
+        hits = bytearray()
+        for key in keys:
+            slot = user_slots.get(key)
+            if slot is not None:
+                for action in ACTIONS:
+                    weights[action].append(self.blended[action][slot])
+                hits.append(self.user_hits[slot] + self.overlay_base_hits[slot])
+                continue
+            slot = base_slots.get(key)
+            for action in ACTIONS:
+                weights[action].append(base_weights[action][slot] * base_factor if slot is not None else 0.0)
+            hits.append(1 if slot is not None and self.base_hits[slot] else 0)
+        return weights, hits
+
+    def score(self, patterns: Dict[str, float]) -> Tuple[Dict[str, float], int]:
+        user_slots = self.user_index.slots
+        base_slots = self.base_index.slots
+        totals = [0.0] * len(ACTIONS)
+        blended = [self.blended[action] for action in ACTIONS]
+        base_weights = [self.base_weights[action] for action in ACTIONS]
+        base_factor = self.base_factor
+        base_hits = self.base_hits
+        matched = 0
+        for key, value in patterns.items():
+            slot = user_slots.get(key)
+            if slot is not None:
+                for position, weights in enumerate(blended):
+                    totals[position] += weights[slot] * value
+                matched += self.user_hits[slot] + self.overlay_base_hits[slot]
+                continue
+            slot = base_slots.get(key)
+            if slot is not None:
+                for position, weights in enumerate(base_weights):
+                    totals[position] += weights[slot] * base_factor * value
+                if base_hits[slot]:
+                    matched += 1
+        return dict(zip(ACTIONS, totals)), matched
+
+
+class ScorerOverlay:
+    def __init__(self, source: FusedActionScorer):
+        self.source = source
+        self.frozen = source.copy()
+        self.entries: Dict[str, Tuple[int, Tuple[Tuple[float, ...], int], Any]] = {}
+        self.changes = 0
+        source.changed = set()
+
+    def pending(self) -> int:
+        return len(self.source.changed or ())
+
+    def publish(self, version: int) -> None:
+        source = self.source
+        entries = self.entries
+        for key in source.changed:
+            entries[key] = (version, source.lookup(key), entries.get(key))
+        self.changes += len(source.changed)
+        source.changed.clear()
+
+    def view(self, version: int) -> ScorerView:
+        return ScorerView(self, version)
+
+
+class ScorerView:
+    __slots__ = ("overlay", "version")
+
+    def __init__(self, overlay: ScorerOverlay, version: int):
+        self.overlay = overlay
+        self.version = version
+
+    def score(self, patterns: Dict[str, float]) -> Tuple[Dict[str, float], int]:
+        entries = self.overlay.entries
+        frozen = self.overlay.frozen
+        if not entries or entries.keys().isdisjoint(patterns):
+            return frozen.score(patterns)
+        version = self.version
+        totals = [0.0] * len(ACTIONS)
+        matched = 0
+        remaining: Dict[str, float] = {}
+        for key, value in patterns.items():
+            entry = entries.get(key)
+            while entry is not None and entry[0] > version:
+                entry = entry[2]
+            if entry is None:
+                remaining[key] = value
+                continue
+            weights, hits = entry[1]
+            for position, weight in enumerate(weights):
+                totals[position] += weight * value
+            matched += hits
+        scores, frozen_matched = frozen.score(remaining)
+        return {action: scores[action] + total for action, total in zip(ACTIONS, totals)}, matched + frozen_matched
+
+
 def reward_from_event(event_type: str, watched_percent: float) -> float:
     event = normalize_space(event_type).lower()
     watch_ratio = watched_percent / 100.0 if watched_percent > 1 else watched_percent
@@ -352,15 +756,14 @@ def target_from_record(record: Dict[str, Any]) -> float:
     return 1.0 if action_from_record(record) == "like" else -1.0
 
 
-def prune_weights(weights: Dict[str, float], max_size: int = 16000, min_abs: float = 0.015) -> Dict[str, float]:
+def prune_weights(weights: Dict[str, float], max_size: int = 16000, min_abs: float = PRUNE_MIN_ABS) -> Dict[str, float]:
     filtered = {key: float(value) for key, value in weights.items() if abs(float(value)) >= min_abs}
     if len(filtered) <= max_size:
         return filtered
-    strongest = sorted(filtered.items(), key=lambda item: abs(item[1]), reverse=True)[:max_size]
-    return dict(strongest)
+    return dict(heapq.nlargest(max_size, filtered.items(), key=lambda item: abs(item[1])))
 
 
-def prune_action_weights(weights: Dict[str, Dict[str, float]], max_size: int = 12000, min_abs: float = 0.015) -> Dict[str, Dict[str, float]]:
+def prune_action_weights(weights: Dict[str, Dict[str, float]], max_size: int = 12000, min_abs: float = PRUNE_MIN_ABS) -> Dict[str, Dict[str, float]]:
     pruned = empty_action_weights()
     for action in ACTIONS:
         pruned[action] = prune_weights(weights.get(action, {}), max_size=max_size, min_abs=min_abs)
@@ -385,7 +788,16 @@ def read_json_file(path: Path) -> Optional[Dict[str, Any]]:
     return payload if isinstance(payload, dict) else None
 
 
-def looks_like_model_payload(payload: Optional[Dict[str, Any]]) -> bool:
+def read_model_file(path: Path) -> Union[Dict[str, Any], MappedModelFile, None]:
+    if path.suffix != MAPPED_MODEL_SUFFIX:
+        return read_json_file(path)
+    mapped = read_mapped_model(path)
+    return mapped if mapped is not None and mapped.actions == ACTIONS else None
+
+
+def looks_like_model_payload(payload: Union[Dict[str, Any], MappedModelFile, None]) -> bool:
+    if isinstance(payload, MappedModelFile):
+        return True
     if not isinstance(payload, dict):
         return False
     if isinstance(payload.get("action_weights"), dict):
@@ -393,32 +805,232 @@ def looks_like_model_payload(payload: Optional[Dict[str, Any]]) -> bool:
     return isinstance(payload.get("weights"), dict) and "bias" in payload
 
 
-def resolve_base_model_candidate(path: Union[str, Path]) -> Tuple[Path, Optional[Dict[str, Any]]]:
+def file_fingerprint(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def mapped_model_sibling(model_path: Path) -> Optional[Path]:
+    if model_path.suffix == MAPPED_MODEL_SUFFIX:
+        return None
+    mapped_path = model_path.with_suffix(MAPPED_MODEL_SUFFIX)
+    mapped_fingerprint = file_fingerprint(mapped_path)
+    if mapped_fingerprint is None:
+        return None
+    json_fingerprint = file_fingerprint(model_path)
+    if json_fingerprint is not None and json_fingerprint[0] > mapped_fingerprint[0]:
+        return None
+    return mapped_path
+
+
+def base_model_candidate_paths(model_path: Path) -> List[Path]:
+    candidates: List[Path] = []
+    directory = model_path.parent
+    for candidate in sorted([*directory.glob("*.json"), *directory.glob(f"*{MAPPED_MODEL_SUFFIX}")]):
+        if candidate.stem != model_path.stem and parse_semver(candidate.stem) is None:
+            continue
+        if candidate.suffix == MAPPED_MODEL_SUFFIX and mapped_model_sibling(candidate.with_suffix(".json")) is None:
+            continue
+        candidates.append(candidate)
+    return candidates
+
+
+def base_model_candidate_rank(candidate: Path, payload: Union[Dict[str, Any], MappedModelFile, None]) -> Optional[Tuple[int, Tuple[int, int, int], str, int]]:
+    if not looks_like_model_payload(payload):
+        return None
+    fields = payload.metadata if isinstance(payload, MappedModelFile) else payload
+    version = parse_semver(candidate.stem) or parse_semver(fields.get("model_version")) or (-1, -1, -1)
+    trained_at = normalize_space(fields.get("trained_at"))
+    return 1 if version != (-1, -1, -1) else 0, version, trained_at, 1 if isinstance(payload, MappedModelFile) else 0
+
+
+def resolve_base_model_candidate(path: Union[str, Path]) -> Tuple[Path, Union[Dict[str, Any], MappedModelFile, None]]:
     model_path = Path(path)
     if model_path.name != DEFAULT_BASE_MODEL_PATH:
-        payload = read_json_file(model_path) if model_path.exists() else None
+        mapped_path = mapped_model_sibling(model_path)
+        mapped = read_model_file(mapped_path) if mapped_path is not None else None
+        if mapped is not None:
+            return mapped_path, mapped
+        payload = read_model_file(model_path) if model_path.exists() else None
         return model_path, payload
 
-    candidates: List[Tuple[int, Tuple[int, int, int], str, Path, Dict[str, Any]]] = []
-    for candidate in sorted(model_path.parent.glob("*.json")):
-        payload = read_json_file(candidate)
-        if not looks_like_model_payload(payload):
-            continue
-        filename_version = parse_semver(candidate.stem)
-        if candidate.name != model_path.name and filename_version is None:
+    candidates: List[Tuple[Tuple[int, Tuple[int, int, int], str, int], Path, Union[Dict[str, Any], MappedModelFile]]] = []
+    for candidate in base_model_candidate_paths(model_path):
+        payload = read_model_file(candidate)
+        rank = base_model_candidate_rank(candidate, payload)
+        if rank is None:
             continue
-        version = filename_version or parse_semver(payload.get("model_version")) or (-1, -1, -1)
-        trained_at = normalize_space(payload.get("trained_at"))
-        candidates.append((1 if version != (-1, -1, -1) else 0, version, trained_at, candidate, payload))
+        candidates.append((rank, candidate, payload))
 
     if not candidates:
         return model_path, None
 
-    candidates.sort(key=lambda item: (item[0], item[1], item[2], item[3].name))
-    _, _, _, resolved_path, payload = candidates[-1]
+    candidates.sort(key=lambda item: (item[0], item[1].name))
+    _, resolved_path, payload = candidates[-1]
     return resolved_path, payload
 
 
+class BaseModelCache:
+    def __init__(self, rescan_seconds: float = BASE_MODEL_RESCAN_SECONDS, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rescan_seconds = float(rescan_seconds)
+        self.clock = clock
+        self._scans: Dict[Path, Tuple[float, Optional[int], Path, Optional[Tuple[int, int, int]]]] = {}
+        self._ranks: Dict[Path, Tuple[Tuple[int, int, int], Optional[Tuple[int, Tuple[int, int, int], str, int]]]] = {}
+        self._entries: Dict[Path, Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+        self._indexes: Dict[int, Tuple[Dict[str, Any], ActionWeightIndex]] = {}
+        self._signatures: Dict[Tuple[int, str], Tuple[Dict[str, Any], str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.file_reads = 0
+        self.signature_hits = 0
+        self.signature_misses = 0
+        self.rescans = 0
+
+    def _read(self, path: Path) -> Union[Dict[str, Any], MappedModelFile, None]:
+        self.file_reads += 1
+        return read_model_file(path)
+
+    def _resolve(self, model_path: Path) -> Tuple[Path, Optional[Tuple[int, int, int]], Union[Dict[str, Any], MappedModelFile, None]]:
+        fresh: Dict[Path, Union[Dict[str, Any], MappedModelFile, None]] = {}
+        if model_path.name != DEFAULT_BASE_MODEL_PATH:
+            resolved_path = mapped_model_sibling(model_path) or model_path
+            return resolved_path, file_fingerprint(resolved_path), None
+
+        now = self.clock()
+        directory_fingerprint = file_fingerprint(model_path.parent)
+        directory_mtime = directory_fingerprint[0] if directory_fingerprint is not None else None
+        scan = self._scans.get(model_path)
+        if scan is not None and scan[1] == directory_mtime and now - scan[0] < self.rescan_seconds:
+            _, _, resolved_path, fingerprint = scan
+            if fingerprint is None or file_fingerprint(resolved_path) == fingerprint:
+                return resolved_path, fingerprint, None
+
+        self.rescans += 1
+        ranked: List[Tuple[Tuple[int, Tuple[int, int, int], str, int], Path, Tuple[int, int, int]]] = []
+        seen = set()
+        for candidate in base_model_candidate_paths(model_path):
+            fingerprint = file_fingerprint(candidate)
+            if fingerprint is None:
+                continue
+            seen.add(candidate)
+            cached = self._ranks.get(candidate)
+            if cached is not None and cached[0] == fingerprint:
+                rank = cached[1]
+            else:
+                payload = self._read(candidate)
+                rank = base_model_candidate_rank(candidate, payload)
+                self._ranks[candidate] = (fingerprint, rank)
+                fresh[candidate] = payload
+            if rank is not None:
+                ranked.append((rank, candidate, fingerprint))
+        for stale in [path for path in self._ranks if path.parent == model_path.parent and path not in seen]:
+            self._ranks.pop(stale, None)
+
+        if not ranked:
+            self._scans[model_path] = (now, directory_mtime, model_path, None)
+            return model_path, None, None
+        ranked.sort(key=lambda item: (item[0], item[1].name))
+        _, resolved_path, fingerprint = ranked[-1]
+        self._scans[model_path] = (now, directory_mtime, resolved_path, fingerprint)
+        return resolved_path, fingerprint, fresh.get(resolved_path)
+
+    def load(self, path: Union[str, Path] = DEFAULT_BASE_MODEL_PATH) -> Dict[str, Any]:
+        with self._lock:
+            return self._load(Path(path))
+
+    def _load(self, requested_path: Path) -> Dict[str, Any]:
+        resolved_path, fingerprint, payload = self._resolve(requested_path)
+        key = (resolved_path, fingerprint)
+        cached = self._entries.get(requested_path)
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        if fingerprint is not None and payload is None:
+            payload = self._read(resolved_path)
+        if payload is None and resolved_path != requested_path and resolved_path.suffix == MAPPED_MODEL_SUFFIX:
+            resolved_path = requested_path
+            payload = self._read(requested_path) if requested_path.exists() else None
+        model = build_base_model(requested_path, resolved_path, payload)
+        if model.get("model_format") == "legacy-score" and resolved_path == requested_path:
+            key = (resolved_path, file_fingerprint(resolved_path))
+        self._entries[requested_path] = (key, model)
+        return model
+
+    def action_index(self, model: Dict[str, Any]) -> ActionWeightIndex:
+        with self._lock:
+            cached = self._indexes.get(id(model))
+            if cached is not None and cached[0] is model:
+                return cached[1]
+            mapped_index = model.get("mapped_index")
+            index = mapped_index if isinstance(mapped_index, MappedActionIndex) else ActionWeightIndex(model.get("action_weights", {}))
+            live = {id(entry[1]) for entry in self._entries.values()}
+            self._indexes = {key: value for key, value in self._indexes.items() if key in live}
+            self._indexes[id(model)] = (model, index)
+            return index
+
+    def signature(self, model: Dict[str, Any], source_name: str) -> str:
+        key = (id(model), source_name)
+        with self._lock:
+            cached = self._signatures.get(key)
+            if cached is not None and cached[0] is model:
+                self.signature_hits += 1
+                return cached[1]
+            self.signature_misses += 1
+        signature = base_model_signature(model, source_name)
+        with self._lock:
+            live = {id(entry[1]) for entry in self._entries.values()}
+            self._signatures = {entry_key: value for entry_key, value in self._signatures.items() if entry_key[0] in live}
+            self._signatures[key] = (model, signature)
+        return signature
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._scans.clear()
+            self._ranks.clear()
+            self._entries.clear()
+            self._indexes.clear()
+            self._signatures.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "file_reads": self.file_reads,
+                "tracked_files": len(self._ranks),
+                "rescans": self.rescans,
+                "signature_hits": self.signature_hits,
+                "signature_misses": self.signature_misses,
+            }
+
+
+def base_model_source_name(path: Union[str, Path]) -> str:
+    source = Path(path)
+    return source.with_suffix(".json").name if source.suffix == MAPPED_MODEL_SUFFIX else source.name
+
+
+def base_model_signature(model: Dict[str, Any], source_name: str) -> str:
+    stored = normalize_space(model.get("model_signature"))
+    if stored:
+        return stored
+    payload = {
+        "model_version": model.get("model_version"),
+        "source": source_name,
+        "action_counts": normalize_action_counts(model.get("action_counts")),
+        "action_weights": prune_action_weights(model.get("action_weights", {}), max_size=12000),
+    }
+    return hashlib.blake2s(
+        json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8"),
+        digest_size=12,
+    ).hexdigest()
+
+
 def empty_base_model() -> Dict[str, Any]:
     return {
         "action_bias": dict(DEFAULT_ACTION_BIAS),
@@ -447,16 +1059,33 @@ def persist_base_model(path: Union[str, Path], model: Dict[str, Any]) -> None:
     model_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
 
 
-def load_base_model(path: Union[str, Path] = DEFAULT_BASE_MODEL_PATH) -> Dict[str, Any]:
+def load_base_model(path: Union[str, Path] = DEFAULT_BASE_MODEL_PATH, cache: Optional[BaseModelCache] = None) -> Dict[str, Any]:
+    if cache is not None:
+        return cache.load(path)
     requested_path = Path(path)
-    default_model = empty_base_model()
     model_path, data = resolve_base_model_candidate(requested_path)
+    return build_base_model(requested_path, model_path, data)
+
 
+def build_base_model(requested_path: Path, model_path: Path, data: Union[Dict[str, Any], MappedModelFile, None]) -> Dict[str, Any]:
     if data is None:
-        model = dict(default_model)
+        model = empty_base_model()
         model["source_path"] = str(requested_path)
         return model
+    if isinstance(data, MappedModelFile):
+        return build_mapped_base_model(model_path, data)
+
+    model = normalize_base_payload(model_path, data)
+    if model_path == requested_path and model["model_format"] == "legacy-score":
+        try:
+            persist_base_model(model_path, model)
+        except Exception:
+            pass
+    return model
 
+
+def normalize_base_payload(model_path: Path, data: Dict[str, Any]) -> Dict[str, Any]:
+    default_model = empty_base_model()
     is_action_model = isinstance(data.get("action_weights"), dict)
     action_counts = normalize_action_counts(data.get("action_counts"), int(data.get("record_count", 0) or 0))
     if is_action_model:
@@ -483,9 +1112,41 @@ def load_base_model(path: Union[str, Path] = DEFAULT_BASE_MODEL_PATH) -> Dict[st
         "source_path": str(model_path),
         "model_format": "action" if is_action_model else "legacy-score",
     }
-    if model_path == requested_path and not is_action_model:
-        try:
-            persist_base_model(model_path, model)
-        except Exception:
-            pass
+    if normalize_space(data.get("model_signature")):
+        model["model_signature"] = normalize_space(data.get("model_signature"))
     return model
+
+
+def build_mapped_base_model(model_path: Path, mapped: MappedModelFile) -> Dict[str, Any]:
+    default_model = empty_base_model()
+    data = mapped.metadata
+    index = MappedActionIndex(mapped)
+    action_counts = normalize_action_counts(mapped.action_counts, int(data.get("record_count", 0) or 0))
+    parsed_version = parse_semver(data.get("model_version")) or parse_semver(model_path.stem)
+    return {
+        "action_bias": sanitize_action_score_map(data.get("action_bias"), action_bias_from_counts(action_counts, DEFAULT_ACTION_BIAS)),
+        "action_weights": dict(index.action_weights),
+        "action_counts": action_counts,
+        "record_count": int(data.get("record_count", sum(action_counts.values())) or sum(action_counts.values())),
+        "trained_at": data.get("trained_at") or default_model["trained_at"],
+        "epochs": int(data.get("epochs", 0) or 0),
+        "feature_count": len(mapped),
+        "trainer": str(data.get("trainer", "scratch") or "scratch"),
+        "device": str(data.get("device", "cpu") or "cpu"),
+        "notes": data.get("notes") or default_model["notes"],
+        "model_version": data.get("model_version") or ('.'.join(str(part) for part in parsed_version) if parsed_version else None),
+        "source_path": str(model_path),
+        "model_signature": normalize_space(data.get("model_signature")) or None,
+        "model_format": "mapped",
+        "mapped_index": index,
+    }
+
+
+def persist_mapped_base_model(path: Union[str, Path], model: Dict[str, Any]) -> None:
+    payload = dict(model)
+    # Packing rounds weights to float32, so record the signature of the JSON base this
+    # file stands in for; contributions trained against either one then match on merge.
+    payload["model_signature"] = base_model_signature(model, base_model_source_name(path))
+    payload["action_weights"] = prune_action_weights(model.get("action_weights", {}))
+    payload["action_counts"] = normalize_action_counts(model.get("action_counts"), int(model.get("record_count", 0) or 0))
+    write_mapped_model(path, payload, ACTIONS)
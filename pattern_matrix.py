@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+from pattern_engine import ACTIONS, PatternCache, content_pattern_items, context_pattern_items, context_patterns, feature_id
+
+
+class FeatureTable:
+    def __init__(self, keys: Iterable[str] = ()):
+        self.keys: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.raw_index: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.lookup(keys, grow=True)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.index
+
+    def lookup(self, keys: Iterable[str], grow: bool = True) -> List[int]:
+        index = self.index
+        if not grow:
+            return [index.get(key, -1) for key in keys]
+        if isinstance(keys, (dict, list, tuple)):
+            try:
+                return list(map(index.__getitem__, keys))
+            except KeyError:
+                pass
+        columns: List[int] = []
+        for key in keys:
+            column = index.get(key)
+            if column is None:
+                with self._lock:
+                    column = index.get(key)
+                    if column is None:
+                        column = len(self.keys)
+                        self.keys.append(key)
+                        index[key] = column
+            columns.append(column)
+        return columns
+
+    def lookup_raw(self, raw_keys: List[str], grow: bool = True) -> List[int]:
+        raw_index = self.raw_index
+        try:
+            return list(map(raw_index.__getitem__, raw_keys))
+        except KeyError:
+            pass
+        columns: List[int] = []
+        for raw_key in raw_keys:
+            column = raw_index.get(raw_key)
+            if column is None:
+                column = self.lookup((feature_id(raw_key),), grow)[0]
+                if column >= 0:
+                    raw_index[raw_key] = column
+            columns.append(column)
+        return columns
+
+
+class PatternMatrix:
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, table: FeatureTable, columns: Optional[int] = None):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.table = table
+        self.columns = len(table) if columns is None else int(columns)
+        self._row_ids: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self), self.columns
+
+    @property
+    def nnz(self) -> int:
+        return int(self.indptr[-1])
+
+    def row_ids(self) -> np.ndarray:
+        if self._row_ids is None:
+            self._row_ids = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.indptr))
+        return self._row_ids
+
+    def row(self, position: int) -> Dict[str, float]:
+        start, end = int(self.indptr[position]), int(self.indptr[position + 1])
+        keys = self.table.keys
+        return {keys[column]: float(value) for column, value in zip(self.indices[start:end].tolist(), self.data[start:end].tolist())}
+
+    def to_scipy(self) -> Any:
+        if sparse is None:
+            raise ImportError("scipy is required to export a scipy.sparse matrix")
+        return sparse.csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
+
+def extract_pattern_matrix(
+    records: Iterable[Dict[str, Any]],
+    mood: Optional[str] = None,
+    table: Optional[FeatureTable] = None,
+    grow: bool = True,
+    pattern_cache: Optional[PatternCache] = None,
+) -> PatternMatrix:
+    if np is None:
+        raise ImportError("numpy is required for batch pattern extraction")
+    table = table if table is not None else FeatureTable()
+    counts = array("q", [0])
+    indices = array("q")
+    values = array("d")
+    for record in records:
+        if pattern_cache is not None:
+            patterns = context_patterns(pattern_cache.content_patterns(record), record, mood)
+            indices.extend(table.lookup(patterns, grow))
+            values.extend(patterns.values())
+            counts.append(len(patterns))
+            continue
+        # Raw keys within a record are distinct, so they map straight to columns without
+        # building the hashed per-record dict that extract_patterns needs.
+        items = content_pattern_items(record)
+        items.extend(context_pattern_items(record, mood))
+        indices.extend(table.lookup_raw([key for key, _ in items], grow))
+        values.extend(value for _, value in items)
+        counts.append(len(items))
+
+    indptr = np.cumsum(np.frombuffer(counts, dtype=np.int64))
+    rows = len(indptr) - 1
+    columns = np.frombuffer(indices, dtype=np.int64)
+    raw = np.frombuffer(values, dtype=np.float64)
+    row_ids = np.repeat(np.arange(rows, dtype=np.int64), np.diff(indptr))
+    norms = np.sqrt(np.bincount(row_ids, weights=raw * raw, minlength=rows))
+    norms[norms <= 0.0] = 1.0
+    data = (raw / norms[row_ids]).astype(np.float32)
+
+    if not grow:
+        known = columns >= 0
+        if not known.all():
+            columns = columns[known]
+            data = data[known]
+            indptr = np.concatenate(([0], np.cumsum(np.bincount(row_ids[known], minlength=rows))))
+    return PatternMatrix(indptr.astype(np.int64), columns.astype(np.int32), data, table)
+
+
+class MatrixScorer:
+    # Columns are cached per scorer.generation, so updates are picked up on the next score();
+    # mutating the scorer during a score() call is not supported.
+    def __init__(self, scorer: Any, table: FeatureTable):
+        if np is None:
+            raise ImportError("numpy is required for batch pattern scoring")
+        self.scorer = scorer
+        self.table = table
+        self._cache: Tuple[int, np.ndarray, np.ndarray] = (scorer.generation, np.zeros((len(ACTIONS), 0), dtype=np.float64), np.zeros(0, dtype=np.int64))
+        self._lock = threading.Lock()
+
+    def _columns(self, columns: int) -> Tuple[np.ndarray, np.ndarray]:
+        generation = self.scorer.generation
+        cached_generation, weights, hits = self._cache
+        if cached_generation == generation and columns <= hits.size:
+            return weights, hits
+        with self._lock:
+            cached_generation, weights, hits = self._cache
+            if cached_generation != generation:
+                weights = np.zeros((len(ACTIONS), 0), dtype=np.float64)
+                hits = np.zeros(0, dtype=np.int64)
+            known = hits.size
+            if columns > known:
+                gathered, present = self.scorer.gather(self.table.keys[known:columns])
+                fresh = np.zeros((len(ACTIONS), columns - known), dtype=np.float64)
+                for position, action in enumerate(ACTIONS):
+                    if action in gathered:
+                        fresh[position] = np.frombuffer(gathered[action], dtype=np.float64)
+                weights = np.concatenate((weights, fresh), axis=1)
+                hits = np.concatenate((hits, np.frombuffer(bytes(present), dtype=np.uint8).astype(np.int64)))
+            self._cache = (generation, weights, hits)
+        return weights, hits
+
+    def score(self, matrix: PatternMatrix) -> Tuple[np.ndarray, np.ndarray]:
+        if matrix.table is not self.table:
+            raise ValueError("Pattern matrix was built against a different feature table")
+        weights, hits = self._columns(matrix.columns)
+        weights = weights[:, :matrix.columns]
+        hits = hits[:matrix.columns]
+        rows = len(matrix)
+        if sparse is not None:
+            features = matrix.to_scipy()
+            present = sparse.csr_matrix((np.ones(matrix.nnz, dtype=np.int64), matrix.indices, matrix.indptr), shape=matrix.shape)
+            return np.asarray(features @ weights.T, dtype=np.float64), np.asarray(present @ hits, dtype=np.int64)
+        row_ids = matrix.row_ids()
+        contributions = weights[:, matrix.indices] * matrix.data
+        scores = np.empty((rows, len(ACTIONS)), dtype=np.float64)
+        for position in range(len(ACTIONS)):
+            scores[:, position] = np.bincount(row_ids, weights=contributions[position], minlength=rows)
+        matched = np.bincount(row_ids, weights=hits[matrix.indices], minlength=rows).astype(np.int64)
+        return scores, matched
+
+    def score_dicts(self, matrix: PatternMatrix) -> List[Tuple[Dict[str, float], int]]:
+        scores, matched = self.score(matrix)
+        return [(dict(zip(ACTIONS, row)), count) for row, count in zip(scores.tolist(), matched.tolist())]
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Union
+
+DEFAULT_FLUSH_INTERVAL = 2.0
+DEFAULT_SNAPSHOT_INTERVAL = 30.0
+
+
+def atomic_write_bytes(path: Union[str, Path], data: bytes) -> None:
+    target = Path(path)
+    directory = target.parent if str(target.parent) else Path(".")
+    fd, temp_name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=str(directory))
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_name, target)
+    except BaseException:
+        try:
+            os.unlink(temp_name)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_text(path: Union[str, Path], text: str, encoding: str = "utf-8") -> None:
+    atomic_write_bytes(path, text.encode(encoding))
+
+
+class WriteBehindPersister:
+    def __init__(self, flush_callback: Callable[[Set[str]], None], interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.flush_callback = flush_callback
+        self.interval = max(0.0, float(interval))
+        self._dirty: Set[str] = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        self.flush_count = 0
+        self.coalesced_marks = 0
+        atexit.register(self.close)
+
+    def mark_dirty(self, *keys: str) -> None:
+        with self._lock:
+            if self._dirty:
+                self.coalesced_marks += 1
+            self._dirty.update(keys)
+            immediate = self.interval <= 0 or self._closed
+            if not immediate:
+                self._schedule_locked()
+        if immediate:
+            self.flush()
+
+    def _schedule_locked(self) -> None:
+        if self._timer is not None:
+            return
+        self._timer = threading.Timer(self.interval, self._timer_flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _timer_flush(self) -> None:
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception as exc:  # noqa: BLE001
+            print(f"[persist] background flush failed, will retry: {exc}")
+            with self._lock:
+                if not self._closed:
+                    self._schedule_locked()
+
+    def is_dirty(self) -> bool:
+        with self._lock:
+            return bool(self._dirty)
+
+    def flush(self) -> bool:
+        with self._flush_lock:
+            with self._lock:
+                keys = set(self._dirty)
+                self._dirty.clear()
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not keys:
+                return False
+            try:
+                self.flush_callback(keys)
+            except BaseException:
+                with self._lock:
+                    self._dirty.update(keys)
+                raise
+            self.flush_count += 1
+            return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        self.flush()
+        atexit.unregister(self.close)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "dirty": sorted(self._dirty),
+                "flushes": self.flush_count,
+                "coalesced_marks": self.coalesced_marks,
+                "interval_seconds": self.interval,
+            }
+
+
+class EventJournal:
+    def __init__(self, path: Union[str, Path], fsync: bool = False):
+        self.path = Path(path)
+        self.fsync = fsync
+        self.seq = 0
+        self.pending_entries = 0
+        self._handle = None
+        self._deferred = 0
+        self._lock = threading.Lock()
+
+    def read(self, after_seq: int = 0) -> List[Dict[str, Any]]:
+        entries: List[Dict[str, Any]] = []
+        if not self.path.exists():
+            return entries
+        with self.path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                    seq = int(entry.get("seq", 0))
+                except (ValueError, TypeError, AttributeError):
+                    continue
+                self.seq = max(self.seq, seq)
+                if seq > after_seq:
+                    entries.append(entry)
+        self.pending_entries = len(entries)
+        return entries
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        with self._lock:
+            self.seq += 1
+            record = dict(entry, seq=self.seq)
+            if self._handle is None:
+                self._handle = self.path.open("a", encoding="utf-8")
+            self._handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+            if not self._deferred:
+                self._flush_handle()
+            self.pending_entries += 1
+            return self.seq
+
+    @contextmanager
+    def deferred_flush(self) -> Iterator[None]:
+        with self._lock:
+            self._deferred += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._deferred -= 1
+                if not self._deferred and self._handle is not None:
+                    self._flush_handle()
+
+    def _flush_handle(self) -> None:
+        self._handle.flush()
+        if self.fsync:
+            os.fsync(self._handle.fileno())
+
+    def sync(self) -> None:
+        # Appends only reach the OS; this makes them survive power loss and OS crashes.
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+                os.fsync(self._handle.fileno())
+
+    def compact(self, through_seq: int) -> None:
+        with self._lock:
+            self._close_handle()
+            kept = self.read(through_seq)
+            if kept:
+                atomic_write_text(self.path, "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in kept))
+            elif self.path.exists():
+                self.path.unlink()
+            self.pending_entries = len(kept)
+
+    def _close_handle(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_handle()
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from data_logger import DataLogger
+from model import ShortsAIModel
+from pattern_engine import DEFAULT_BASE_MODEL_PATH, BaseModelCache, PatternCache
+
+DEFAULT_PROFILE_ID = "default"
+PROFILES_DIRNAME = "profiles"
+PROFILE_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+DEFAULT_MAX_PROFILES = 16
+DEFAULT_MAX_USER_FEATURES = 400000
+DEFAULT_MAX_IDLE_SECONDS = 1800.0
+
+
+@dataclass
+class Profile:
+    profile_id: str
+    model: ShortsAIModel
+    logger: DataLogger
+    last_used: float = field(default_factory=time.time)
+    refs: int = 0
+    closed: threading.Event = field(default_factory=threading.Event)
+
+
+class ProfileRegistry:
+    def __init__(
+        self,
+        root: Union[str, Path] = ".",
+        base_model_file: str = DEFAULT_BASE_MODEL_PATH,
+        max_profiles: int = DEFAULT_MAX_PROFILES,
+        max_user_features: int = DEFAULT_MAX_USER_FEATURES,
+        max_idle_seconds: float = DEFAULT_MAX_IDLE_SECONDS,
+    ):
+        self.root = Path(root).resolve()
+        self.base_model_file = self.root / base_model_file
+        self.max_profiles = max(1, int(max_profiles))
+        self.max_user_features = max(0, int(max_user_features))
+        self.max_idle_seconds = max(0.0, float(max_idle_seconds))
+        self.base_model_cache = BaseModelCache()
+        self.pattern_cache = PatternCache()
+        self._profiles: OrderedDict[str, Profile] = OrderedDict()
+        self._closing: Dict[str, Profile] = {}
+        self._loading: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def profile_dir(self, profile_id: str) -> Path:
+        if profile_id == DEFAULT_PROFILE_ID:
+            return self.root
+        return self.root / PROFILES_DIRNAME / profile_id
+
+    def _open(self, profile_id: str) -> Profile:
+        directory = self.profile_dir(profile_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        model = ShortsAIModel(
+            data_file=str(directory / "shorts_ai_data.json"),
+            base_model_file=str(self.base_model_file),
+            user_model_file=str(directory / "Model.json"),
+            export_model_file=str(directory / "Model.json"),
+            base_model_cache=self.base_model_cache,
+            pattern_cache=self.pattern_cache,
+        )
+        return Profile(profile_id, model, DataLogger(str(directory)))
+
+    def acquire(self, profile_id: Optional[str] = None) -> Profile:
+        profile_id = (profile_id or DEFAULT_PROFILE_ID).strip()
+        if not PROFILE_ID_RE.match(profile_id):
+            raise ValueError("Profile id must be 1-64 letters, digits, '-' or '_'")
+        while True:
+            with self._lock:
+                closing = self._closing.get(profile_id)
+                pending = closing.closed if closing is not None else self._loading.get(profile_id)
+                if pending is None:
+                    profile = self._profiles.get(profile_id)
+                    if profile is not None:
+                        evicted = self._checkout(profile)
+                        break
+                    loading = self._loading[profile_id] = threading.Event()
+            if pending is not None:
+                pending.wait()
+                continue
+            try:
+                profile = self._open(profile_id)
+            except BaseException:
+                with self._lock:
+                    del self._loading[profile_id]
+                loading.set()
+                raise
+            with self._lock:
+                del self._loading[profile_id]
+                self._profiles[profile_id] = profile
+                self.loads += 1
+                evicted = self._checkout(profile)
+            loading.set()
+            break
+        self._close_all(evicted)
+        return profile
+
+    def _checkout(self, profile: Profile) -> List[Profile]:
+        self._profiles.move_to_end(profile.profile_id)
+        profile.refs += 1
+        profile.last_used = time.time()
+        return self._select_evictions()
+
+    def release(self, profile: Profile) -> None:
+        with self._lock:
+            profile.refs -= 1
+            profile.last_used = time.time()
+            evicted = self._select_evictions()
+        self._close_all(evicted)
+
+    @contextmanager
+    def use(self, profile_id: Optional[str] = None) -> Iterator[Profile]:
+        profile = self.acquire(profile_id)
+        try:
+            yield profile
+        finally:
+            self.release(profile)
+
+    def _user_features(self) -> int:
+        return sum(profile.model.user_feature_count() for profile in self._profiles.values())
+
+    def _retire(self, profile: Profile) -> Profile:
+        del self._profiles[profile.profile_id]
+        self._closing[profile.profile_id] = profile
+        return profile
+
+    def _select_evictions(self) -> List[Profile]:
+        evicted: List[Profile] = []
+        features = self._user_features() if self.max_user_features else 0
+        for profile in list(self._profiles.values()):
+            over_count = len(self._profiles) > self.max_profiles
+            over_memory = self.max_user_features and features > self.max_user_features
+            if not (over_count or over_memory):
+                break
+            if not profile.refs:
+                if self.max_user_features:
+                    features -= profile.model.user_feature_count()
+                evicted.append(self._retire(profile))
+        self.evictions += len(evicted)
+        return evicted
+
+    def _close_all(self, profiles: List[Profile]) -> None:
+        for profile in profiles:
+            try:
+                profile.model.close()
+            finally:
+                with self._lock:
+                    self._closing.pop(profile.profile_id, None)
+                profile.closed.set()
+
+    def evict_idle(self, max_idle_seconds: Optional[float] = None) -> int:
+        max_idle_seconds = self.max_idle_seconds if max_idle_seconds is None else max(0.0, float(max_idle_seconds))
+        cutoff = time.time() - max_idle_seconds
+        with self._lock:
+            evicted = [self._retire(profile) for profile in list(self._profiles.values()) if not profile.refs and profile.last_used < cutoff]
+            self.evictions += len(evicted)
+        self._close_all(evicted)
+        return len(evicted)
+
+    def close(self) -> None:
+        with self._lock:
+            profiles = [self._retire(profile) for profile in list(self._profiles.values())]
+        self._close_all(profiles)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded_profiles": list(self._profiles.keys()),
+                "user_features": self._user_features(),
+                "max_profiles": self.max_profiles,
+                "max_user_features": self.max_user_features,
+                "in_use": {profile_id: profile.refs for profile_id, profile in self._profiles.items() if profile.refs},
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
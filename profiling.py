@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import contextvars
+import cProfile
+import functools
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+PROFILE_ENV = "SHORTS_AI_PROFILE"
+PROFILE_DIR_ENV = "SHORTS_AI_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = "profiling"
+DEFAULT_PROFILE_SECONDS = 30.0
+MAX_PROFILE_SECONDS = 3600.0
+DEFAULT_SAMPLE_INTERVAL = 0.001
+PROFILE_MODES = ("sample", "cprofile")
+
+current_request: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("current_request", default=None)
+
+
+def endpoint_slug(tag: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", tag).strip("_") or "unknown"
+
+
+def frame_label(code: Any) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def parse_profile_spec(spec: Optional[str]) -> Optional[Dict[str, Any]]:
+    text = str(spec or "").strip().lower()
+    if not text or text in {"0", "off", "false", "no"}:
+        return None
+    options: Dict[str, Any] = {}
+    if text in {"1", "on", "true", "yes"}:
+        return options
+    for part in text.split(","):
+        name, _, value = part.partition("=")
+        name, value = name.strip(), value.strip()
+        if name == "seconds":
+            options["seconds"] = float(value)
+        elif name == "requests":
+            options["requests"] = int(value)
+        elif name == "mode":
+            options["mode"] = value
+        elif name == "interval":
+            options["interval"] = float(value)
+        else:
+            raise ValueError(f"Unknown {PROFILE_ENV} option: {name}")
+    return options
+
+
+class RuntimeProfiler:
+    def __init__(self, output_dir: Union[str, Path] = DEFAULT_PROFILE_DIR, clock: Callable[[], float] = time.monotonic):
+        self.output_dir = Path(output_dir)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._active_threads: Dict[int, str] = {}
+        self._samples: Dict[str, Counter] = defaultdict(Counter)
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._calls: Counter = Counter()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.active = False
+        self.mode = PROFILE_MODES[0]
+        self.interval = DEFAULT_SAMPLE_INTERVAL
+        self.started_at = 0.0
+        self.deadline: Optional[float] = None
+        self.request_limit: Optional[int] = None
+        self.requests_seen = 0
+        self.sample_count = 0
+        self.session_count = 0
+        self.last_outputs: List[str] = []
+        self._switch_interval: Optional[float] = None
+        self._limit_reached = False
+
+    def start(
+        self,
+        seconds: Optional[float] = None,
+        requests: Optional[int] = None,
+        mode: str = PROFILE_MODES[0],
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ) -> Dict[str, Any]:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of: {list(PROFILE_MODES)}")
+        if requests is not None and int(requests) < 1:
+            raise ValueError("requests must be at least 1")
+        if seconds is not None and not 0 < float(seconds) <= MAX_PROFILE_SECONDS:
+            raise ValueError(f"seconds must be between 0 and {int(MAX_PROFILE_SECONDS)}")
+        if requests is None and seconds is None:
+            seconds = DEFAULT_PROFILE_SECONDS
+        with self._lock:
+            if self.active:
+                raise RuntimeError("A profiling session is already running")
+            self._samples.clear()
+            self._stats.clear()
+            self._calls.clear()
+            self.mode = mode
+            self.interval = max(0.0001, float(interval))
+            self.started_at = time.time()
+            self.deadline = self.clock() + float(seconds) if seconds is not None else None
+            self.request_limit = int(requests) if requests is not None else None
+            self.requests_seen = 0
+            self.sample_count = 0
+            self.session_count += 1
+            self._limit_reached = False
+            self.active = True
+            if mode == "sample":
+                self._switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(min(self._switch_interval, self.interval))
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._background, args=(self._stop_event,), name="shorts-ai-profiler", daemon=True)
+            self._thread.start()
+        print(f"[profile] started {mode} profiling (seconds={seconds}, requests={requests})")
+        return self.status()
+
+    def stop(self) -> Dict[str, Any]:
+        with self._lock:
+            if not self.active:
+                return self.status()
+            self.active = False
+            if self._switch_interval is not None:
+                sys.setswitchinterval(self._switch_interval)
+                self._switch_interval = None
+            self._stop_event.set()
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        with self._lock:
+            self.last_outputs = self._write_outputs()
+        print(f"[profile] wrote {len(self.last_outputs)} profile file(s) to {self.output_dir}")
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        remaining = max(0.0, self.deadline - self.clock()) if self.active and self.deadline is not None else None
+        return {
+            "active": self.active,
+            "mode": self.mode,
+            "seconds_remaining": round(remaining, 3) if remaining is not None else None,
+            "request_limit": self.request_limit,
+            "requests_seen": self.requests_seen,
+            "samples": self.sample_count,
+            "calls": dict(self._calls),
+            "output_dir": str(self.output_dir),
+            "last_outputs": list(self.last_outputs),
+        }
+
+    def wrap(self, func: Callable[[], Any]) -> Callable[[], Any]:
+        if not self.active:
+            return func
+        request = current_request.get()
+        if request is None:
+            return functools.partial(self.run, "background", func)
+        request["profiled"] = True
+        return functools.partial(self.run, request["endpoint"], func)
+
+    def run(self, tag: str, func: Callable[[], Any]) -> Any:
+        if not self.active:
+            return func()
+        if self.mode == "cprofile":
+            return self._run_cprofile(tag, func)
+        ident = threading.get_ident()
+        with self._lock:
+            self._active_threads[ident] = tag
+            self._calls[tag] += 1
+        try:
+            return func()
+        finally:
+            with self._lock:
+                self._active_threads.pop(ident, None)
+
+    def _run_cprofile(self, tag: str, func: Callable[[], Any]) -> Any:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return func()
+        try:
+            return func()
+        finally:
+            profile.disable()
+            with self._lock:
+                if tag in self._stats:
+                    self._stats[tag].add(profile)
+                else:
+                    self._stats[tag] = pstats.Stats(profile)
+                self._calls[tag] += 1
+
+    def request_finished(self, profiled: bool = True) -> None:
+        if not self.active or not profiled:
+            return
+        with self._lock:
+            self.requests_seen += 1
+            if self.request_limit is not None and self.requests_seen >= self.request_limit:
+                self._limit_reached = True
+                self._stop_event.set()
+
+    def _background(self, stop_event: threading.Event) -> None:
+        boundary = RuntimeProfiler.run.__code__
+        while not stop_event.wait(self.interval if self.mode == "sample" else 0.05):
+            if self.deadline is not None and self.clock() >= self.deadline:
+                self.stop()
+                return
+            if self.mode != "sample":
+                continue
+            with self._lock:
+                active = dict(self._active_threads)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for ident, tag in active.items():
+                frame = frames.get(ident)
+                stack: List[str] = []
+                while frame is not None and frame.f_code is not boundary:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    stack.reverse()
+                    with self._lock:
+                        self._samples[tag][";".join(stack)] += 1
+                        self.sample_count += 1
+        if self._limit_reached and self._stop_event is stop_event:
+            self.stop()
+
+    def _write_outputs(self) -> List[str]:
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at))}-{int(self.started_at * 1_000_000) % 1_000_000:06d}-{self.session_count}"
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        written: List[str] = []
+        for tag, stacks in sorted(self._samples.items()):
+            target = self.output_dir / f"{stamp}-{endpoint_slug(tag)}.collapsed"
+            target.write_text("".join(f"{stack} {count}\n" for stack, count in stacks.most_common()), encoding="utf-8")
+            written.append(str(target))
+        for tag, stats in sorted(self._stats.items()):
+            target = self.output_dir / f"{stamp}-{endpoint_slug(tag)}.pstats"
+            stats.dump_stats(str(target))
+            written.append(str(target))
+        return written
+
+
+def profiler_from_env(environ: Optional[Dict[str, str]] = None) -> RuntimeProfiler:
+    environ = os.environ if environ is None else environ
+    return RuntimeProfiler(environ.get(PROFILE_DIR_ENV) or DEFAULT_PROFILE_DIR)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: Any, profiler: RuntimeProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+        request = {"endpoint": f"{scope.get('method', 'GET')} {scope.get('path', '')}", "profiled": False}
+        token = current_request.set(request)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request.reset(token)
+            self.profiler.request_finished(request["profiled"])
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+class SessionLRU:
+    def __init__(self, capacity: int, ttl_seconds: Optional[float] = None, clock: Callable[[], float] = time.time):
+        self.capacity = max(1, int(capacity))
+        self.ttl_seconds = float(ttl_seconds) if ttl_seconds else None
+        self.clock = clock
+        self._values: "OrderedDict[str, Any]" = OrderedDict()
+        self._stamps: Dict[str, float] = {}
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def _expired(self, key: str, now: float) -> bool:
+        return self.ttl_seconds is not None and now - self._stamps.get(key, now) > self.ttl_seconds
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._values and self._expired(key, self.clock()):
+            self.pop(key)
+            self.expirations += 1
+        hit = key in self._values
+        self.record_lookups(int(hit), int(not hit))
+        return self._values[key] if hit else default
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        return self._values.get(key, default)
+
+    def age(self, key: str) -> Optional[float]:
+        stamp = self._stamps.get(key)
+        return None if stamp is None else self.clock() - stamp
+
+    def set(self, key: str, value: Any) -> None:
+        now = self.clock()
+        if key in self._values:
+            self._values.move_to_end(key)
+        self._values[key] = value
+        self._stamps[key] = now
+        while len(self._values) > self.capacity:
+            oldest, _ = self._values.popitem(last=False)
+            self._stamps.pop(oldest, None)
+            self.evictions += 1
+        self.expire(now)
+
+    def touch(self, key: str) -> bool:
+        if key not in self._values:
+            return False
+        self._values.move_to_end(key)
+        self._stamps[key] = self.clock()
+        return True
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        self._stamps.pop(key, None)
+        return self._values.pop(key, default)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        if self.ttl_seconds is None:
+            return 0
+        now = self.clock() if now is None else now
+        expired = 0
+        while self._values:
+            oldest = next(iter(self._values))
+            if not self._expired(oldest, now):
+                break
+            self.pop(oldest)
+            expired += 1
+        self.expirations += expired
+        return expired
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._stamps.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self._values)
+
+    def record_lookups(self, hits: int, misses: int) -> None:
+        with self._stats_lock:
+            self.hits += hits
+            self.misses += misses
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._values),
+                "capacity": self.capacity,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
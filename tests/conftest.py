@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def open_model(workdir):
+    from model import ShortsAIModel
+
+    def factory(directory: Path = workdir) -> ShortsAIModel:
+        return ShortsAIModel(
+            data_file=str(directory / "settings.json"),
+            user_model_file=str(directory / "user.json"),
+            export_model_file=str(directory / "Model.json"),
+            persist_interval=3600,
+            snapshot_interval=3600,
+        )
+
+    return factory
+
+
+@pytest.fixture
+def client(workdir, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import app
+    from model_worker import ModelWorker
+    from profiles import ProfileRegistry
+
+    monkeypatch.setattr(app, "profiles", ProfileRegistry(workdir))
+    monkeypatch.setattr(app, "worker", ModelWorker(profiler=app.profiler))
+    with TestClient(app.app) as test_client:
+        yield test_client
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pattern_engine
+from pattern_engine import DEFAULT_BASE_MODEL_PATH, BaseModelCache, feature_id
+
+CATS = feature_id("cats")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def write_model(path, weight, mtime_ns=None):
+    path.write_text(json.dumps({"action_weights": {"like": {CATS: weight}, "skip": {}}}), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def restore_mtime(path, stat):
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def test_candidates_are_rescanned_at_most_once_per_interval(tmp_path, monkeypatch):
+    scans = []
+    candidate_paths = pattern_engine.base_model_candidate_paths
+    monkeypatch.setattr(pattern_engine, "base_model_candidate_paths", lambda path: scans.append(path) or candidate_paths(path))
+    clock = FakeClock()
+    cache = BaseModelCache(rescan_seconds=1.0, clock=clock)
+    requested = tmp_path / DEFAULT_BASE_MODEL_PATH
+    write_model(requested, 0.5)
+
+    first = cache.load(requested)
+    assert first["action_weights"]["like"][CATS] == 0.5
+    for _ in range(5):
+        assert cache.load(requested) is first
+    assert len(scans) == 1
+    assert cache.stats()["rescans"] == 1
+
+    directory = tmp_path.stat()
+    write_model(tmp_path / "1.2.0.json", 2.0)
+    restore_mtime(tmp_path, directory)
+    assert cache.load(requested) is first
+    clock.now += 1.0
+    assert cache.load(requested)["action_weights"]["like"][CATS] == 2.0
+    assert len(scans) == 2
+
+
+def test_directory_and_resolved_file_changes_skip_the_interval(tmp_path):
+    cache = BaseModelCache(rescan_seconds=3600.0, clock=FakeClock())
+    requested = tmp_path / DEFAULT_BASE_MODEL_PATH
+    assert cache.load(requested)["action_weights"]["like"] == {}
+
+    write_model(requested, 0.5)
+    assert cache.load(requested)["action_weights"]["like"][CATS] == 0.5
+
+    versioned = tmp_path / "1.0.0.json"
+    write_model(versioned, 1.0)
+    assert cache.load(requested)["action_weights"]["like"][CATS] == 1.0
+
+    directory = tmp_path.stat()
+    write_model(versioned, 3.0, versioned.stat().st_mtime_ns + 1_000_000)
+    restore_mtime(tmp_path, directory)
+    assert cache.load(requested)["action_weights"]["like"][CATS] == 3.0
+
+
+
+def test_signature_is_cached_per_loaded_model_and_follows_file_changes(tmp_path):
+    cache = BaseModelCache()
+    path = tmp_path / "custom_base.json"
+    write_model(path, 0.5)
+
+    def signature():
+        model = cache.load(path)
+        return model, cache.signature(model, path.name)
+
+    model, first = signature()
+    assert first == pattern_engine.base_model_signature(model, path.name)
+    assert signature() == (model, first)
+    assert (cache.stats()["signature_misses"], cache.stats()["signature_hits"]) == (1, 1)
+
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    touched, same = signature()
+    assert touched is not model and same == first
+    assert cache.stats()["signature_misses"] == 2
+
+    write_model(path, 0.25, path.stat().st_mtime_ns)
+    assert path.stat().st_size != stat.st_size
+    resized, changed = signature()
+    assert changed == pattern_engine.base_model_signature(resized, path.name) != first
+    assert cache.stats()["signature_misses"] == 3
+
+    stat = path.stat()
+    replacement = tmp_path / "replacement.json"
+    write_model(replacement, 0.75, stat.st_mtime_ns)
+    assert replacement.stat().st_size == stat.st_size
+    os.replace(replacement, path)
+    assert path.stat().st_ino != stat.st_ino
+    replaced, fresh = signature()
+    assert fresh == pattern_engine.base_model_signature(replaced, path.name) != changed
+    assert cache.stats()["signature_misses"] == 4
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from model import ShortsAIModel
+
+TRAINING = [
+    {"video_id": "t1", "channel_id": "c1", "title": "cats playing piano", "event_type": "user_like", "watched_percent": 0.9},
+    {"video_id": "t2", "channel_id": "c2", "title": "chess opening traps", "event_type": "manual_skip", "watched_percent": 0.1},
+    {"video_id": "t3", "channel_id": "c3", "title": "dogs at the beach", "event_type": "completed", "watched_percent": 1.0},
+]
+VIDEOS = [
+    {"video_id": "v1", "channel_id": "c1", "title": "cats and a piano", "tags": ["cats"], "duration_seconds": 30},
+    {"video_id": "v2", "channel_id": "c2", "title": "chess traps", "description": "blitz"},
+    {"video_id": "t3", "channel_id": "c3", "title": "dogs at the beach"},
+    {"video_id": "v4", "channel_id": "new", "title": "something else entirely"},
+]
+
+
+def test_predict_actions_matches_predict_action(workdir, open_model):
+    model = open_model()
+    model.process_events(TRAINING)
+    batch = model.predict_actions(VIDEOS, "Focused")
+    assert len(batch) == len(VIDEOS)
+    for video, decision in zip(VIDEOS, batch):
+        assert decision == model.predict_action(mood="Focused", **video)
+    assert model.predict_actions([], "Focused") == []
+
+
+def test_next_batch_matches_next(client):
+    assert client.post("/events/batch", json={"events": TRAINING}).json()["status"] == "success"
+    response = client.post("/next/batch", json={"videos": VIDEOS, "mood": "Curious"})
+    assert response.status_code == 200
+    predictions = response.json()["predictions"]
+    assert [prediction["video_id"] for prediction in predictions] == [video["video_id"] for video in VIDEOS]
+    for video, prediction in zip(VIDEOS, predictions):
+        single = client.post("/next", json={**video, "mood": "Curious"}).json()
+        assert prediction == {"video_id": video["video_id"], **single}
+
+
+def test_next_batch_request_mood_overrides_video_moods(client):
+    videos = [{**video, "mood": "Mad"} for video in VIDEOS]
+    predictions = client.post("/next/batch", json={"videos": videos, "mood": "Relaxed"}).json()["predictions"]
+    assert client.get("/mood").json()["current_mood"] == "Relaxed"
+    for video, prediction in zip(VIDEOS, predictions):
+        assert prediction == {"video_id": video["video_id"], **client.post("/next", json={**video, "mood": "Relaxed"}).json()}
+
+    client.post("/next/batch", json={"videos": videos})
+    assert client.get("/mood").json()["current_mood"] == "Mad"
+
+
+class CountingHandle:
+    def __init__(self, handle):
+        self.handle = handle
+        self.flushes = 0
+        self.syncs = 0
+
+    def write(self, text):
+        return self.handle.write(text)
+
+    def flush(self):
+        self.flushes += 1
+        self.handle.flush()
+
+    def fileno(self):
+        self.syncs += 1
+        return self.handle.fileno()
+
+    def close(self):
+        self.handle.close()
+
+
+def test_process_events_reports_partial_failure_and_flushes_once(workdir, open_model):
+    model = open_model()
+    model.process_event(**TRAINING[0])
+    handle = model.journal._handle = CountingHandle(model.journal._handle)
+    events = [TRAINING[1], {"video_id": "broken", "not_a_field": 1}, {"video_id": "v9", "channel_id": "c9", "event_type": "trust_channel", "watched_percent": 0.0}, TRAINING[2]]
+
+    summary = model.process_events(events)
+    assert [result["status"] for result in summary["results"]] == ["success", "error", "success", "success"]
+    assert [result["index"] for result in summary["results"]] == [0, 1, 2, 3]
+    assert "not_a_field" in summary["results"][1]["detail"]
+    assert (summary["applied"], summary["failed"]) == (3, 1)
+    # One flush when the batch ends, then one flush and fsync from the write-behind commit.
+    assert (handle.flushes, handle.syncs) == (2, 1)
+    assert model.compactor.flush_count == 1
+    assert model.persister.flush_count == 1
+    assert model.journal.pending_entries == 0
+    assert "c9" in model.user_preferences["trusted_channels"]
+
+
+def test_events_batch_returns_per_index_results(client, monkeypatch):
+    process_event = ShortsAIModel.process_event
+
+    def failing(self, **event):
+        if event["video_id"] == "bad":
+            raise ValueError("rejected")
+        return process_event(self, **event)
+
+    monkeypatch.setattr(ShortsAIModel, "process_event", failing)
+    events = [TRAINING[0], {**TRAINING[1], "video_id": "bad"}, TRAINING[2]]
+    body = client.post("/events/batch", json={"events": events}).json()
+    assert body["status"] == "partial"
+    assert (body["applied"], body["failed"]) == (2, 1)
+    assert body["results"] == [
+        {"index": 0, "status": "success", "corrections_made": 0, "video_id": "t1"},
+        {"index": 1, "status": "error", "detail": "rejected", "video_id": "bad"},
+        {"index": 2, "status": "success", "corrections_made": 0, "video_id": "t3"},
+    ]
+    assert client.post("/events/batch", json={"events": [TRAINING[0]]}).json()["status"] == "success"
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.suite import compare, summarize
+
+
+def test_summarize_reports_percentiles():
+    summary = summarize([float(value) for value in range(1, 101)], 2.0)
+    assert summary["iterations"] == 100
+    assert summary["mean_ms"] == 50.5
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p95_ms"] == pytest.approx(95.05)
+    assert summary["max_ms"] == 100.0
+    assert summary["ops_per_sec"] == 50.0
+
+    single = summarize([4.0], 0.0)
+    assert single["p50_ms"] == single["p99_ms"] == 4.0
+    assert single["ops_per_sec"] == 0.0
+
+
+def test_compare_flags_regressions_past_threshold():
+    baseline = {"results": {"predict": {"p50_ms": 1.0, "p95_ms": 2.0}, "event": {"p50_ms": 0.0, "p95_ms": 1.0}}}
+    results = {
+        "predict": {"p50_ms": 1.1, "p95_ms": 3.0},
+        "event": {"p50_ms": 5.0, "p95_ms": 1.2},
+        "new_case": {"p50_ms": 9.0, "p95_ms": 9.0},
+    }
+    assert compare(results, baseline, 0.2) == ["predict p95_ms: 2.000 -> 3.000 ms (+50%)"]
+    assert compare(results, baseline, 0.05) == ["predict p50_ms: 1.000 -> 1.100 ms (+10%)", "predict p95_ms: 2.000 -> 3.000 ms (+50%)", "event p95_ms: 1.000 -> 1.200 ms (+20%)"]
+    assert compare(results, {}, 0.2) == []
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import random
+import shutil
+import threading
+
+from pattern_engine import ACTIONS
+
+WRITERS = 4
+READERS = 4
+EVENTS_PER_WRITER = 400
+PREDICTIONS_PER_READER = 600
+EVENT_TYPES = ("user_like", "like", "user_dislike", "manual_skip", "completed", "undo_auto_like")
+
+
+def video(rng: random.Random, index: int) -> dict:
+    return {
+        "video_id": f"v{index % 300}",
+        "channel_id": f"chan{index % 12}",
+        "title": f"{rng.choice(['cats', 'dogs', 'cooking', 'chess'])} {rng.choice(['fails', 'tips', 'compilation'])} {index % 40}",
+        "description": rng.choice(["funny moments", "quick recipe", "opening trap"]),
+        "tags": [f"tag{index % 9}", rng.choice(["shorts", "viral"])],
+        "duration_seconds": rng.choice([15, 30, 59]),
+    }
+
+
+def test_interleaved_predictions_and_events_match_serial_journal_replay(workdir, open_model):
+    live_dir = workdir / "live"
+    live_dir.mkdir()
+    model = open_model(live_dir)
+    errors = []
+    start = threading.Barrier(WRITERS + READERS)
+
+    def writer(seed: int) -> None:
+        rng = random.Random(seed)
+        start.wait()
+        try:
+            for step in range(EVENTS_PER_WRITER):
+                item = video(rng, seed * EVENTS_PER_WRITER + step)
+                model.process_event(
+                    item["video_id"],
+                    item["channel_id"],
+                    rng.choice(EVENT_TYPES),
+                    rng.uniform(0, 100),
+                    "Neutral",
+                    item["title"],
+                    item["description"],
+                    tags=item["tags"],
+                    duration_seconds=item["duration_seconds"],
+                )
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    def reader(seed: int) -> None:
+        rng = random.Random(1000 + seed)
+        last_version = -1
+        start.wait()
+        try:
+            for step in range(PREDICTIONS_PER_READER):
+                decision = model.predict_action(**video(rng, step))
+                assert decision["action"] in ACTIONS
+                version = model.prediction_snapshot().version
+                assert version >= last_version
+                last_version = version
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    threads = [threading.Thread(target=writer, args=(seed,)) for seed in range(WRITERS)]
+    threads += [threading.Thread(target=reader, args=(seed,)) for seed in range(READERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+
+    entries = model.journal.read(0)
+    assert [entry["seq"] for entry in entries] == list(range(1, len(entries) + 1))
+    assert sum(model.user_model["action_counts"].values()) == len(entries)
+
+    replay_dir = workdir / "replay"
+    replay_dir.mkdir()
+    shutil.copy(live_dir / "user.journal", replay_dir / "user.journal")
+    replayed = open_model(replay_dir)
+    # Replaying on open ends with a snapshot, which prunes weak weights; prune the live model the same way.
+    model.save_user_model()
+
+    assert replayed.user_model["action_counts"] == model.user_model["action_counts"]
+    for action in ACTIONS:
+        expected = replayed.user_model["action_weights"][action]
+        actual = model.user_model["action_weights"][action]
+        assert actual.keys() == expected.keys()
+        for key, value in expected.items():
+            assert abs(actual[key] - value) < 1e-9, (action, key)
+    assert model.prediction_snapshot().version == model._state_version
+    model.close()
+    replayed.close()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import pattern_engine
+from pattern_engine import FEATURE_ID_CACHE_SIZE, feature_id, feature_id_cache_stats, feature_ids
+
+
+def test_batch_ids_match_single_ids():
+    keys = ["tok:cats", " tok:cats ", "", None, 0, 42, "f_0123456789abcdef01234567", "F_0123456789ABCDEF01234567", "title:ünïcode", "bi:cats_dogs"]
+    assert feature_ids(keys) == [feature_id(key) for key in keys]
+    assert feature_ids(iter(keys)) == feature_ids(keys)
+    assert feature_ids([]) == []
+    assert feature_id("tok:cats") is feature_ids(["tok:cats"])[0]
+
+
+def test_intern_cache_stays_within_its_bound():
+    pattern_engine._intern_feature_id.cache_clear()
+    try:
+        first = feature_id("tok:first")
+        feature_ids(f"tok:word{index}" for index in range(FEATURE_ID_CACHE_SIZE + 500))
+        stats = feature_id_cache_stats()
+        assert stats["max_size"] == FEATURE_ID_CACHE_SIZE
+        assert stats["size"] == FEATURE_ID_CACHE_SIZE
+        misses = stats["misses"]
+        assert feature_id("tok:first") == first
+        assert feature_id_cache_stats()["misses"] == misses + 1
+    finally:
+        pattern_engine._intern_feature_id.cache_clear()
+
+
+def test_existing_ids_bypass_the_intern_cache():
+    pattern_engine._intern_feature_id.cache_clear()
+    try:
+        key = "f_0123456789abcdef01234567"
+        assert feature_id(key) == key
+        assert feature_ids([key, key]) == [key, key]
+        assert feature_id_cache_stats()["size"] == 0
+        assert feature_ids(["tok:cats", key])[1] is feature_id(key)
+        assert feature_id_cache_stats()["size"] == 1
+    finally:
+        pattern_engine._intern_feature_id.cache_clear()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from features import CATEGORIES, DEFAULT_DIM, TIME_LABELS, FeatureIndex, extract_feature_matrix, extract_features
+
+np = pytest.importorskip("numpy")
+
+WORDS = [f"word{number}" for number in range(800)]
+
+
+def random_video(rng: random.Random) -> dict:
+    video = {
+        "title": " ".join(rng.choices(WORDS, k=rng.randint(0, 8))).upper(),
+        "description": " ".join(rng.choices(WORDS, k=rng.randint(0, 20))),
+        "subtitles_snippet": rng.choice([None, "", " ".join(rng.choices(WORDS, k=5))]),
+        "category": rng.choice(CATEGORIES + ["Unknown", None]),
+        "duration_seconds": rng.choice([0, 15, 16, 30, 45, 46, 600, None]),
+        "day_of_week": rng.choice([-3, 0, 3, 6, 9, None]),
+        "time_of_day_bucket": rng.choice(TIME_LABELS + ["dawn"]),
+        "watch_percentage": rng.random(),
+    }
+    for key in rng.sample(list(video), rng.randint(0, 3)):
+        del video[key]
+    return video
+
+
+@pytest.mark.parametrize("vocab_size", [500, 120, 650])
+def test_feature_matrix_matches_extract_features(vocab_size):
+    rng = random.Random(vocab_size)
+    vocab = rng.sample(WORDS, vocab_size)
+    vocab[10] = vocab[3]
+    videos = [random_video(rng) for _ in range(500)]
+    matrix = extract_feature_matrix(videos, vocab, dtype=np.float64)
+    expected = np.array([extract_features(video, vocab) for video in videos])
+    assert matrix.shape == (500, DEFAULT_DIM)
+    assert np.array_equal(matrix, expected)
+    assert np.array_equal(FeatureIndex(vocab).transform(iter(videos)), expected.astype(np.float32))
+
+
+def test_feature_matrix_of_empty_batch():
+    matrix = extract_feature_matrix([], WORDS[:500])
+    assert matrix.shape == (0, DEFAULT_DIM)
+    assert matrix.dtype == np.float32
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from pattern_engine import ACTIONS, ActionWeightIndex, FusedActionScorer, feature_id, score_action_patterns
+
+BASE_SCALE, USER_SCALE = 0.94, 1.42
+
+
+def reference(patterns, base_weights, user_weights):
+    base_scores, base_matches = score_action_patterns(patterns, base_weights)
+    user_scores, user_matches = score_action_patterns(patterns, user_weights)
+    scores = {action: base_scores[action] * BASE_SCALE + user_scores[action] * USER_SCALE for action in ACTIONS}
+    return scores, base_matches + user_matches
+
+
+def assert_matches(actual, expected):
+    assert actual[1] == expected[1]
+    for action in ACTIONS:
+        assert actual[0][action] == pytest.approx(expected[0][action], abs=1e-9)
+
+
+def random_weights(rng, keys, density):
+    return {action: {key: rng.uniform(-2.0, 2.0) for key in keys if rng.random() < density} for action in ACTIONS}
+
+
+def test_fused_scorer_matches_per_model_scoring():
+    rng = random.Random(4)
+    keys = [feature_id(f"feature {number}") for number in range(300)]
+    base_weights = random_weights(rng, keys[:200], 0.4)
+    user_weights = random_weights(rng, keys[100:250], 0.3)
+    scorer = FusedActionScorer(ActionWeightIndex(base_weights), user_weights, BASE_SCALE, USER_SCALE)
+
+    for _ in range(20):
+        patterns = {key: rng.uniform(0.05, 1.0) for key in rng.sample(keys, 60)}
+        assert_matches(scorer.score(patterns), reference(patterns, base_weights, user_weights))
+
+        weights, hits = scorer.gather(patterns)
+        gathered = {action: sum(weight * value for weight, value in zip(weights[action], patterns.values())) for action in ACTIONS}
+        assert_matches((gathered, sum(hits)), reference(patterns, base_weights, user_weights))
+
+        for key in rng.sample(keys, 10):
+            action = rng.choice(ACTIONS)
+            if rng.random() < 0.3:
+                user_weights[action].pop(key, None)
+                scorer.discard(action, key)
+            else:
+                user_weights[action][key] = rng.uniform(-2.0, 2.0)
+                scorer.set(action, key, user_weights[action][key])
+
+
+def test_fused_scorer_edge_cases():
+    cats, dogs, missing = feature_id("cats"), feature_id("dogs"), feature_id("missing")
+    base_weights = {"like": {cats: 0.5}, "skip": {}}
+    user_weights = {"like": {}, "skip": {dogs: -1.0}}
+    scorer = FusedActionScorer(ActionWeightIndex(base_weights), user_weights, BASE_SCALE, USER_SCALE)
+    patterns = {cats: 0.6, dogs: 0.3, missing: 1.0}
+    assert_matches(scorer.score(patterns), reference(patterns, base_weights, user_weights))
+    assert scorer.score({missing: 1.0}) == ({action: 0.0 for action in ACTIONS}, 0)
+    assert scorer.score({}) == ({action: 0.0 for action in ACTIONS}, 0)
+
+    scorer.set("like", cats, 0.25)
+    user_weights["like"][cats] = 0.25
+    assert_matches(scorer.score(patterns), reference(patterns, base_weights, user_weights))
+    scorer.discard("like", cats)
+    scorer.discard("skip", dogs)
+    assert_matches(scorer.score(patterns), reference(patterns, base_weights, {"like": {}, "skip": {}}))
+    assert scorer.lookup(dogs) == ((0.0,) * len(ACTIONS), 0)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import atexit
+import json
+
+import persistence
+
+from model import ShortsAIModel
+from pattern_engine import ACTIONS
+
+
+def like(model: ShortsAIModel, index: int) -> None:
+    model.process_event(f"v{index}", "chan", "user_like", 80, "Neutral", f"cats dogs video {index}", tags=["pets"])
+
+
+def crash(model: ShortsAIModel) -> None:
+    model.journal.close()
+    for persister in (model.persister, model.compactor):
+        persister._closed = True
+        atexit.unregister(persister.close)
+
+
+def test_restart_then_crash_recovers_every_event(workdir, open_model):
+    model = open_model()
+    for index in range(3):
+        like(model, index)
+    model.flush()
+    model.close()
+    assert not (workdir / "user.journal").exists()
+
+    model = open_model()
+    for index in range(3, 8):
+        like(model, index)
+    crash(model)
+
+    recovered = open_model()
+    assert recovered.user_model["action_counts"]["like"] == 8
+
+    reference_dir = workdir / "reference"
+    reference_dir.mkdir()
+    reference = open_model(reference_dir)
+    for index in range(8):
+        like(reference, index)
+    for action in ACTIONS:
+        expected = reference.user_model["action_weights"][action]
+        actual = recovered.user_model["action_weights"][action]
+        assert actual.keys() == expected.keys()
+        for key, value in expected.items():
+            assert abs(actual[key] - value) < 1e-9
+    recovered.close()
+    reference.close()
+
+
+def test_journal_seq_continues_after_compaction(workdir, open_model):
+    model = open_model()
+    like(model, 0)
+    model.flush()
+    snapshot_seq = model.journal.seq
+    model.close()
+
+    reopened = open_model()
+    assert reopened.journal.seq >= snapshot_seq
+    like(reopened, 1)
+    assert reopened.journal.seq == snapshot_seq + 1
+    reopened.close()
+
+
+def test_relative_paths_are_pinned_at_construction(workdir, monkeypatch):
+    model = ShortsAIModel(data_file="settings.json", user_model_file="user.json", export_model_file="Model.json", persist_interval=3600, snapshot_interval=3600)
+    like(model, 0)
+    elsewhere = workdir / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    model.flush()
+    model.close()
+    assert (workdir / "user.json").exists()
+    assert (workdir / "settings.json").exists()
+    assert not any(elsewhere.iterdir())
+
+
+def test_shared_model_file_keeps_journal_position_private(workdir):
+    model = ShortsAIModel(data_file=str(workdir / "settings.json"), user_model_file=str(workdir / "Model.json"), export_model_file=str(workdir / "Model.json"), persist_interval=3600, snapshot_interval=3600)
+    for index in range(2):
+        like(model, index)
+    model.flush()
+    like(model, 2)
+    crash(model)
+
+    assert "journal_seq" not in json.loads((workdir / "Model.json").read_text(encoding="utf-8"))
+    assert json.loads((workdir / "Model.json").with_suffix(".snapshot").read_text(encoding="utf-8"))["journal_seq"] == 2
+
+    reopened = ShortsAIModel(data_file=str(workdir / "settings.json"), user_model_file=str(workdir / "Model.json"), export_model_file=str(workdir / "Model.json"), persist_interval=3600, snapshot_interval=3600)
+    assert reopened.user_model["action_counts"]["like"] == 3
+    assert reopened.journal.seq == 3
+    reopened.close()
+
+
+def test_appends_fsync_only_on_the_write_behind_commit_unless_opted_in(workdir, open_model, monkeypatch):
+    syncs = []
+    fsync = persistence.os.fsync
+    monkeypatch.setattr(persistence.os, "fsync", lambda fd: syncs.append(fd) or fsync(fd))
+    model = open_model()
+    syncs.clear()
+    for index in range(3):
+        like(model, index)
+    assert syncs == []
+    model.persister.flush()
+    assert len(syncs) == 1
+    model.close()
+
+    syncs.clear()
+    journal = persistence.EventJournal(workdir / "durable.journal", fsync=True)
+    journal.append({"action": "like"})
+    journal.append({"action": "skip"})
+    assert len(syncs) == 2
+    journal.close()
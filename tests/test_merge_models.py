@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import random
+
+import pytest
+
+import MergeModels
+from MergeModels import adjust_component, apply_preference_delta, base_identity, load_preference_components, stream_preference_delta
+from model import ShortsAIModel
+from pattern_engine import feature_id
+
+BASE = {
+    "model_role": "base_model",
+    "model_version": "1.4.0",
+    "action_weights": {"like": {feature_id("cats"): 0.5}, "skip": {feature_id("chess"): 0.75}},
+    "action_counts": {"like": 50, "skip": 70},
+}
+
+
+def test_base_identity_matches_the_signature_exported_models_record(workdir):
+    (workdir / "trained_model.json").write_text(json.dumps(BASE), encoding="utf-8")
+    model = ShortsAIModel(data_file=str(workdir / "settings.json"), persist_interval=3600, snapshot_interval=3600)
+    exported = model._export_payload()
+    model.close()
+
+    identity = base_identity(BASE, workdir / "trained_model.json")
+    assert identity == ("1.4.0", "trained_model.json", exported["base_model_signature"])
+
+    component = {"weight": 1.0, "base_model_signature": exported["base_model_signature"], "base_model_version": "0.1.0", "base_model_source": "other.json"}
+    assert adjust_component(component, identity, True)["weight"] == pytest.approx(1.12)
+    assert adjust_component({**component, "base_model_signature": "stale"}, identity, True)["weight"] == pytest.approx(0.78)
+    assert adjust_component({**component, "weight": 0.0}, identity, True)["weight"] == 0.0
+    assert adjust_component({**component, "weight": None}, identity, True)["weight"] == pytest.approx(1.12)
+    assert adjust_component({key: value for key, value in component.items() if key != "weight"}, identity, True)["weight"] == pytest.approx(1.12)
+
+
+def test_base_identity_leaves_legacy_base_files_untouched(workdir):
+    legacy = {"model_version": "0.9.0", "weights": {feature_id("cats"): 0.4}, "bias": 0.1}
+    path = workdir / "legacy_base.json"
+    path.write_text(json.dumps(legacy), encoding="utf-8")
+    before = path.read_bytes()
+
+    version, source, signature = base_identity(legacy, path)
+    assert (version, source) == ("0.9.0", "legacy_base.json") and signature
+    assert path.read_bytes() == before
+
+    assert base_identity(legacy, None)[1] == ""
+    assert sorted(p.name for p in workdir.iterdir()) == ["legacy_base.json"]
+
+
+def test_parallel_stream_matches_serial_merge(tmp_path, monkeypatch):
+    rng = random.Random(5)
+    vocabulary = [feature_id(f"merge:{index}") for index in range(60)]
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for index in range(11):
+        payload = {
+            "base_model_version": "1.4.0" if index % 3 else "0.2.0",
+            "action_weights": {action: {key: rng.uniform(-1.5, 1.5) for key in rng.sample(vocabulary, 20)} for action in ("like", "skip")},
+            "action_counts": {"like": rng.randint(0, 300), "skip": rng.randint(0, 300)},
+        }
+        (data_dir / f"user_{index:02d}.json").write_text(json.dumps(payload), encoding="utf-8")
+    (data_dir / "notes.json").write_text(json.dumps({"hello": "world"}), encoding="utf-8")
+    (data_dir / "old_base.json").write_text(json.dumps(BASE), encoding="utf-8")
+    paths = sorted(data_dir.rglob("*.json"))
+    base_path = tmp_path / "trained_model.json"
+
+    expected = apply_preference_delta(BASE, base_path, load_preference_components(data_dir), 0.8)
+    monkeypatch.setattr(MergeModels, "MERGE_CHUNK_FILES", 2)
+    progress = []
+    merged = stream_preference_delta(BASE, base_path, paths, 0.8, workers=2, max_pending=2, progress=lambda done, total: progress.append((done, total)))
+
+    assert progress[-1] == (len(paths), len(paths))
+    assert merged["merged_preference_models"] == expected["merged_preference_models"] == 11
+    assert merged["action_counts"] == expected["action_counts"]
+    for action, weights in expected["action_weights"].items():
+        assert merged["action_weights"][action].keys() == weights.keys()
+        for key, value in weights.items():
+            assert merged["action_weights"][action][key] == pytest.approx(value, abs=1e-12)
+    assert stream_preference_delta(BASE, base_path, paths, 0.8) == expected
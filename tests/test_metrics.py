@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from metrics import MetricFamily, MetricsRegistry
+
+VIDEO = {"video_id": "v1", "channel_id": "c1", "title": "cats and dogs", "description": "funny pets"}
+
+
+def sample(text: str, name: str, **labels: str) -> float:
+    rendered = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{re.escape(name)}{{{re.escape(rendered)}}} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_metric_family_is_abstract():
+    with pytest.raises(TypeError):
+        MetricFamily("base", "not instantiable")
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs run.", ("outcome",))
+    histogram = registry.histogram("job_seconds", "Job time.", buckets=(0.1, 1.0))
+    counter.labels("ok").inc()
+    counter.labels(outcome="error").inc(2)
+    histogram.labels().observe(0.05)
+    histogram.labels().observe(0.5)
+    histogram.labels().observe(3)
+    assert registry.render() == "\n".join(
+        [
+            "# HELP jobs_total Jobs run.",
+            "# TYPE jobs_total counter",
+            'jobs_total{outcome="error"} 2',
+            'jobs_total{outcome="ok"} 1',
+            "# HELP job_seconds Job time.",
+            "# TYPE job_seconds histogram",
+            'job_seconds_bucket{le="0.1"} 1',
+            'job_seconds_bucket{le="1"} 2',
+            'job_seconds_bucket{le="+Inf"} 3',
+            "job_seconds_sum 3.55",
+            "job_seconds_count 3",
+        ]
+    ) + "\n"
+    assert registry.counter("jobs_total", "Jobs run.", ("outcome",)) is counter
+    with pytest.raises(ValueError):
+        registry.histogram("jobs_total", "Jobs run.", ("outcome",))
+
+
+def test_metrics_endpoint_labels_requests_by_route_template(client):
+    before = client.get("/metrics").text
+    assert client.post("/next", json=VIDEO).status_code == 200
+    assert client.get("/channel_status", params={"channel_id": "c1"}).status_code == 200
+    assert client.get("/no/such/path").status_code == 404
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    after = response.text
+
+    name = "shorts_ai_http_request_duration_seconds_count"
+    for labels in ({"method": "POST", "route": "/next", "status": "200"}, {"method": "GET", "route": "/channel_status", "status": "200"}, {"method": "GET", "route": "unmatched", "status": "404"}):
+        assert sample(after, name, **labels) == sample(before, name, **labels) + 1
+    assert "c1" not in after
+    assert sample(after, "shorts_ai_stage_duration_seconds_count", operation="predict", stage="score") >= 1
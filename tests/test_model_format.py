@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+import model_format
+from MergeModels import base_identity
+from model import ShortsAIModel
+from model_format import (
+    FORMAT_VERSION,
+    HEADER,
+    MappedActionIndex,
+    decode_mapped_model,
+    encode_mapped_model,
+    mapped_model_to_json,
+    read_mapped_model,
+    write_mapped_model,
+)
+from pattern_engine import ACTIONS, ActionWeightIndex, FusedActionScorer, build_base_model, feature_id, persist_mapped_base_model
+from train import load_model_json
+
+CATS, DOGS, PETS, CHESS, NEW, MISSING = (feature_id(key) for key in ("cats", "dogs", "pets", "chess", "new", "missing"))
+BASE_WEIGHTS = {
+    "like": {CATS: 0.5, DOGS: -1.25, PETS: 2.0},
+    "skip": {DOGS: 0.75, CHESS: 1.5},
+}
+USER_WEIGHTS = {"like": {CATS: 0.25, NEW: -0.5}, "skip": {CHESS: -2.0}}
+PATTERNS = {CATS: 0.6, DOGS: 0.3, CHESS: 0.8, NEW: 0.1, PETS: 0.4, MISSING: 1.0}
+
+
+def mapped_index() -> MappedActionIndex:
+    model = {"model_role": "base_model", "action_weights": BASE_WEIGHTS}
+    return MappedActionIndex(decode_mapped_model(encode_mapped_model(model, ACTIONS)))
+
+
+def test_mapped_base_scores_match_in_memory_base():
+    memory = FusedActionScorer(ActionWeightIndex(BASE_WEIGHTS), USER_WEIGHTS, 0.94, 1.42)
+    mapped = FusedActionScorer(mapped_index(), USER_WEIGHTS, 0.94, 1.42)
+    assert mapped.score(PATTERNS) == memory.score(PATTERNS)
+    assert mapped.gather(PATTERNS) == memory.gather(PATTERNS)
+
+    for scorer in (memory, mapped):
+        scorer.set("like", PETS, 1.0)
+        scorer.discard("skip", CHESS)
+    assert mapped.score(PATTERNS) == memory.score(PATTERNS)
+    assert mapped.copy().score(PATTERNS) == memory.score(PATTERNS)
+
+
+def test_mapped_base_is_read_in_place():
+    index = mapped_index()
+    scorer = FusedActionScorer(index, USER_WEIGHTS, 0.94, 1.42)
+    assert scorer.base_hits is index.mapped.mask
+    for action in ACTIONS:
+        assert scorer.base_weights[action] is index.mapped.weights[action]
+    assert scorer.base_factor == 0.94
+
+
+def test_round_trip_keeps_weights_counts_and_metadata():
+    model = {
+        "model_role": "base_model",
+        "base_model_signature": "abc123",
+        "action_weights": BASE_WEIGHTS,
+        "action_counts": {"like": 7, "skip": -2},
+        "source_path": "/tmp/trained_model.json",
+        "unserializable": object(),
+    }
+    payload = mapped_model_to_json(decode_mapped_model(encode_mapped_model(model, ACTIONS)))
+    assert payload == {
+        "model_role": "base_model",
+        "base_model_signature": "abc123",
+        "action_weights": BASE_WEIGHTS,
+        "action_counts": {"like": 7, "skip": 0},
+    }
+    empty = decode_mapped_model(encode_mapped_model({}, ACTIONS))
+    assert len(empty) == 0
+    assert mapped_model_to_json(empty)["action_weights"] == {action: {} for action in ACTIONS}
+
+
+def test_raw_keys_are_hashed_not_dropped():
+    model = {"action_weights": {"like": {"cats": 0.5, CATS: 0.25, "": 9.0, "dogs": "bad"}, "skip": {" chess ": 1.5}}}
+    payload = mapped_model_to_json(decode_mapped_model(encode_mapped_model(model, ACTIONS)))
+    assert payload["action_weights"] == {"like": {CATS: 0.25}, "skip": {CHESS: 1.5}}
+
+
+def test_corrupt_or_foreign_files_are_rejected(tmp_path):
+    path = tmp_path / "model.shbm"
+    write_mapped_model(path, {"action_weights": BASE_WEIGHTS}, ACTIONS)
+    data = path.read_bytes()
+    assert read_mapped_model(path) is not None
+
+    corrupt = bytearray(data)
+    corrupt[-1] ^= 0xFF
+    with pytest.raises(ValueError, match="checksum mismatch"):
+        decode_mapped_model(bytes(corrupt))
+
+    magic, _, *rest = HEADER.unpack_from(data)
+    future = HEADER.pack(magic, FORMAT_VERSION + 1, *rest) + data[HEADER.size:]
+    with pytest.raises(ValueError, match=f"unsupported format version {FORMAT_VERSION + 1}"):
+        decode_mapped_model(future)
+
+    with pytest.raises(ValueError, match="not a mapped model file"):
+        decode_mapped_model(b"JSON" + data[4:])
+    with pytest.raises(ValueError, match="truncated header"):
+        decode_mapped_model(data[:HEADER.size - 1])
+
+    path.write_bytes(bytes(corrupt))
+    assert read_mapped_model(path) is None
+
+
+def exported_base_fields(workdir):
+    model = ShortsAIModel(data_file=str(workdir / "settings.json"), persist_interval=3600, snapshot_interval=3600)
+    payload = model._export_payload()
+    model.close()
+    return payload["base_model_source"], payload["base_model_signature"]
+
+
+def test_mapped_base_keeps_the_json_base_signature(workdir):
+    json_path = workdir / "trained_model.json"
+    base = {"model_version": "1.2.0", "action_weights": {"like": {CATS: 0.1, DOGS: -1.3}, "skip": {CHESS: 0.7}}, "action_counts": {"like": 4, "skip": 6}}
+    json_path.write_text(json.dumps(base), encoding="utf-8")
+    from_json = exported_base_fields(workdir)
+    assert from_json[0] == "trained_model.json"
+
+    mapped_path = workdir / "trained_model.shbm"
+    persist_mapped_base_model(mapped_path, build_base_model(json_path, json_path, base))
+    stamp = json_path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(mapped_path, ns=(stamp, stamp))
+    assert exported_base_fields(workdir) == from_json
+
+    identity = base_identity(load_model_json(mapped_path), mapped_path)
+    assert identity == base_identity(base, json_path) == ("1.2.0", "trained_model.json", from_json[1])
+
+
+def test_unmapped_reads_leave_the_file_replaceable(tmp_path, monkeypatch):
+    path = tmp_path / "model.shbm"
+    write_mapped_model(path, {"action_weights": BASE_WEIGHTS}, ACTIONS)
+    monkeypatch.setattr(model_format, "MAP_FILES", False)
+    mapped = read_mapped_model(path)
+    assert isinstance(mapped._buffer, bytes)
+
+    write_mapped_model(path, {"action_weights": USER_WEIGHTS}, ACTIONS)
+    assert mapped_model_to_json(mapped)["action_weights"] == BASE_WEIGHTS
+    assert mapped_model_to_json(read_mapped_model(path))["action_weights"] == USER_WEIGHTS
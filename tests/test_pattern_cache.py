@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from pattern_engine import PatternCache, extract_patterns
+
+RECORD = {
+    "video_id": "v1",
+    "title": "Cats vs dogs #pets",
+    "description": "who wins",
+    "captions": "meow woof",
+    "tags": ["pets", "funny animals"],
+    "category": "Pets & Animals",
+    "duration_seconds": 25,
+}
+
+
+def test_cached_extraction_matches_a_fresh_extraction():
+    cache = PatternCache()
+    for mood in (None, "Happy", "Focused"):
+        assert cache.extract(RECORD, mood) == extract_patterns(RECORD, mood)
+        assert cache.extract(RECORD, mood) == extract_patterns(RECORD, mood)
+    assert (cache.stats()["misses"], cache.stats()["hits"]) == (1, 5)
+
+
+def test_content_key_tracks_content_but_not_context():
+    key = PatternCache.content_key(RECORD)
+    for change in ({"title": "Cats vs birds #pets"}, {"tags": ["pets", "cute animals"]}, {"description": "who loses"}, {"category": "Comedy"}):
+        assert PatternCache.content_key({**RECORD, **change}) != key
+    assert PatternCache.content_key({**RECORD, "duration_seconds": 240, "video_id": "v2"}) == key
+
+    cache = PatternCache()
+    short = cache.extract(RECORD, "Happy")
+    long = cache.extract({**RECORD, "duration_seconds": 240}, "Happy")
+    assert long == extract_patterns({**RECORD, "duration_seconds": 240}, "Happy")
+    assert long != short
+    retitled = {**RECORD, "title": "Cats vs birds #pets"}
+    assert cache.extract(retitled, "Happy") == extract_patterns(retitled, "Happy")
+    assert cache.stats()["misses"] == 2
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import pattern_matrix
+from pattern_engine import ActionWeightIndex, FusedActionScorer, PatternCache, extract_patterns
+from pattern_matrix import FeatureTable, MatrixScorer, extract_pattern_matrix
+
+RECORDS = [
+    {"video_id": "v1", "channel_id": "c1", "title": "cats and dogs", "description": "funny pets", "tags": ["pets"], "duration_seconds": 20},
+    {"video_id": "v2", "channel_id": "c2", "title": "chess openings", "description": "quick trap", "tags": ["chess"], "duration_seconds": 45},
+]
+
+
+def per_record(scorer, mood="Neutral"):
+    return [scorer.score(extract_patterns(record, mood)) for record in RECORDS]
+
+
+def assert_matches(matrix_scorer, matrix, scorer):
+    for (scores, matched), (expected, expected_matched) in zip(matrix_scorer.score_dicts(matrix), per_record(scorer)):
+        assert matched == expected_matched
+        for action, value in expected.items():
+            assert scores[action] == pytest.approx(value, abs=1e-6)
+
+
+def test_matrix_rows_match_extract_patterns():
+    records = RECORDS + [{"video_id": "v3", "title": "cats cats #pets", "tags": ["pets", "cats"], "category": "Pets", "time_of_day_bucket": "morning"}]
+    table = FeatureTable()
+    raw = extract_pattern_matrix(records, "Happy", table)
+    cached = extract_pattern_matrix(records, "Happy", table, pattern_cache=PatternCache())
+    for position, record in enumerate(records):
+        expected = extract_patterns(record, "Happy")
+        for matrix in (raw, cached):
+            row = matrix.row(position)
+            assert row.keys() == expected.keys()
+            for key, value in expected.items():
+                assert row[key] == pytest.approx(value, abs=1e-6)
+
+    frozen = extract_pattern_matrix(records + [{"title": "unseen words only"}], "Happy", table, grow=False)
+    assert frozen.row(0) == raw.row(0)
+    assert len(table) == raw.columns
+
+
+def test_matrix_scorer_follows_scorer_updates():
+    patterns = extract_patterns(RECORDS[0], "Neutral")
+    key = next(iter(patterns))
+    scorer = FusedActionScorer(ActionWeightIndex({"like": {key: 0.2}}), {}, 0.94, 1.42)
+    table = FeatureTable()
+    matrix = extract_pattern_matrix(RECORDS, "Neutral", table)
+    matrix_scorer = MatrixScorer(scorer, table)
+    assert_matches(matrix_scorer, matrix, scorer)
+
+    generation = scorer.generation
+    scorer.set("like", key, 3.0)
+    scorer.set("skip", next(iter(extract_patterns(RECORDS[1], "Neutral"))), -1.5)
+    assert scorer.generation > generation
+    assert_matches(matrix_scorer, matrix, scorer)
+
+    scorer.discard("like", key)
+    assert_matches(matrix_scorer, matrix, scorer)
+
+
+def test_copied_scorer_keeps_its_own_generation():
+    scorer = FusedActionScorer(ActionWeightIndex(), {"like": {"f_000000000000000000000001": 1.0}})
+    frozen = scorer.copy()
+    scorer.set("like", "f_000000000000000000000002", 1.0)
+    assert frozen.generation == scorer.generation - 1
+
+
+def weighted_scorer():
+    weights = {"like": {}, "skip": {}}
+    user_weights = {"like": {}, "skip": {}}
+    for position, record in enumerate(RECORDS):
+        for offset, key in enumerate(extract_patterns(record, "Neutral")):
+            weights["like" if offset % 2 else "skip"][key] = (offset - 3) * 0.25 + position
+            if offset % 3 == 0:
+                user_weights["like"][key] = 0.5 - offset * 0.1
+    return FusedActionScorer(ActionWeightIndex(weights), user_weights, 0.94, 1.42)
+
+
+def test_bincount_fallback_matches_per_record_scores(monkeypatch):
+    monkeypatch.setattr(pattern_matrix, "sparse", None)
+    scorer = weighted_scorer()
+    table = FeatureTable()
+    matrix = extract_pattern_matrix(RECORDS, "Neutral", table)
+    assert_matches(MatrixScorer(scorer, table), matrix, scorer)
+
+
+def test_scipy_and_bincount_paths_agree(monkeypatch):
+    pytest.importorskip("scipy")
+    scorer = weighted_scorer()
+    table = FeatureTable()
+    records = RECORDS + [{"video_id": "v3", "channel_id": "c3", "title": "", "description": ""}] + RECORDS
+    matrix = extract_pattern_matrix(records, "Neutral", table)
+    matrix_scorer = MatrixScorer(scorer, table)
+    scipy_scores, scipy_matched = matrix_scorer.score(matrix)
+    monkeypatch.setattr(pattern_matrix, "sparse", None)
+    bincount_scores, bincount_matched = matrix_scorer.score(matrix)
+    assert np.allclose(scipy_scores, bincount_scores, rtol=0.0, atol=1e-12)
+    assert np.array_equal(scipy_matched, bincount_matched)
+    assert scipy_matched.dtype == bincount_matched.dtype == np.int64
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import threading
+
+from persistence import WriteBehindPersister
+
+
+class Recorder:
+    def __init__(self, failures: int = 0):
+        self.calls = []
+        self.failures = failures
+        self.done = threading.Event()
+
+    def __call__(self, keys):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        self.calls.append(set(keys))
+        self.done.set()
+
+
+def test_marks_within_the_interval_coalesce_into_one_flush():
+    recorder = Recorder()
+    persister = WriteBehindPersister(recorder, interval=0.05)
+    try:
+        persister.mark_dirty("user_model")
+        persister.mark_dirty("settings")
+        persister.mark_dirty("user_model")
+        assert recorder.calls == []
+        assert recorder.done.wait(2.0)
+        assert recorder.calls == [{"user_model", "settings"}]
+        assert persister.stats()["coalesced_marks"] == 2
+        assert not persister.is_dirty()
+    finally:
+        persister.close()
+
+
+def test_close_flushes_pending_keys_and_later_marks_write_through():
+    recorder = Recorder()
+    persister = WriteBehindPersister(recorder, interval=3600)
+    persister.mark_dirty("settings")
+    assert recorder.calls == []
+    persister.close()
+    assert recorder.calls == [{"settings"}]
+
+    persister.mark_dirty("user_model")
+    assert recorder.calls == [{"settings"}, {"user_model"}]
+    assert persister.flush_count == 2
+
+
+def test_failed_background_flush_keeps_keys_and_retries():
+    recorder = Recorder(failures=2)
+    persister = WriteBehindPersister(recorder, interval=0.02)
+    try:
+        persister.mark_dirty("user_model")
+        assert recorder.done.wait(2.0)
+        assert recorder.calls == [{"user_model"}]
+        assert recorder.failures == 0
+        persister.mark_dirty("settings")
+        assert persister.flush()
+        assert recorder.calls[-1] == {"settings"}
+    finally:
+        persister.close()
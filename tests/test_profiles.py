@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from profiles import ProfileRegistry
+
+
+def test_in_use_profile_is_closed_only_after_release(workdir):
+    registry = ProfileRegistry(workdir, max_profiles=1)
+    first = registry.acquire("first")
+    second = registry.acquire("second")
+    assert set(registry.stats()["loaded_profiles"]) == {"first", "second"}
+    assert not first.closed.is_set()
+
+    registry.release(first)
+    assert first.closed.is_set()
+    assert registry.stats()["loaded_profiles"] == ["second"]
+    assert registry.evictions == 1
+
+    registry.release(second)
+    reopened = registry.acquire("first")
+    assert reopened is not first
+    assert registry.loads == 3
+    registry.release(reopened)
+    registry.close()
+
+
+def test_reopen_waits_for_pending_close(workdir):
+    registry = ProfileRegistry(workdir)
+    with registry.use("alpha") as profile:
+        profile.model.process_event("v1", "chan", "user_like", 80, "Neutral", "cats dogs video")
+    closing_started = threading.Event()
+    original_close = profile.model.close
+
+    def slow_close() -> None:
+        closing_started.set()
+        time.sleep(0.2)
+        original_close()
+
+    profile.model.close = slow_close
+    time.sleep(0.01)
+    closer = threading.Thread(target=registry.evict_idle, args=(0,))
+    closer.start()
+    closing_started.wait()
+    with registry.use("alpha") as reopened:
+        assert profile.closed.is_set()
+        assert reopened.model.user_model["action_counts"]["like"] == 1
+    closer.join()
+    registry.close()
+
+
+def test_evict_idle_skips_profiles_in_use(workdir):
+    registry = ProfileRegistry(workdir, max_idle_seconds=0)
+    busy = registry.acquire("busy")
+    with registry.use("idle"):
+        pass
+    time.sleep(0.01)
+    assert registry.evict_idle() == 1
+    assert registry.stats()["loaded_profiles"] == ["busy"]
+    assert not busy.closed.is_set()
+    registry.release(busy)
+    registry.close()
+
+
+def test_user_features_count_live_weights(workdir):
+    registry = ProfileRegistry(workdir)
+    with registry.use() as profile:
+        model = profile.model
+        model.process_event("v1", "chan", "user_like", 80, "Neutral", "cats dogs video", tags=["pets"])
+        live = sum(len(weights) for weights in model.user_model["action_weights"].values())
+        assert live and model.user_feature_count() == live
+        for action, weights in model.user_model["action_weights"].items():
+            for key in list(weights):
+                del weights[key]
+                model.scorer.discard(action, key)
+        assert model.user_feature_count() == 0
+        assert len(model.scorer.user_index) > 0
+    registry.close()
+
+
+def test_cold_load_does_not_block_other_profiles(workdir):
+    registry = ProfileRegistry(workdir)
+    with registry.use("warm"):
+        pass
+    opening = threading.Event()
+    proceed = threading.Event()
+    original_open = registry._open
+
+    def slow_open(profile_id):
+        if profile_id == "cold":
+            opening.set()
+            proceed.wait(5)
+        return original_open(profile_id)
+
+    registry._open = slow_open
+    loaded = []
+    loaders = [threading.Thread(target=lambda: loaded.append(registry.acquire("cold"))) for _ in range(3)]
+    for loader in loaders:
+        loader.start()
+    opening.wait(5)
+    started = time.perf_counter()
+    with registry.use("warm"):
+        pass
+    assert time.perf_counter() - started < 1.0
+    proceed.set()
+    for loader in loaders:
+        loader.join()
+    assert len({id(profile) for profile in loaded}) == 1
+    assert loaded[0].refs == 3
+    assert registry.loads == 2
+    for profile in loaded:
+        registry.release(profile)
+    registry.close()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+from profiling import RuntimeProfiler
+
+
+def wait_until_stopped(profiler: RuntimeProfiler, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while profiler.active and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not profiler.active
+
+
+def test_request_limit_stops_on_the_sampler_thread(tmp_path, monkeypatch):
+    profiler = RuntimeProfiler(tmp_path)
+    writers = []
+    write_outputs = profiler._write_outputs
+
+    def recording_write_outputs():
+        writers.append(threading.current_thread().name)
+        return write_outputs()
+
+    monkeypatch.setattr(profiler, "_write_outputs", recording_write_outputs)
+    profiler.start(requests=2, mode="cprofile")
+    profiler.run("POST /next", lambda: sum(range(1000)))
+    profiler.request_finished()
+    assert profiler.active
+    profiler.request_finished()
+    wait_until_stopped(profiler)
+    assert writers == ["shorts-ai-profiler"]
+    assert profiler.status()["requests_seen"] == 2
+    assert [path.endswith("-POST_next.pstats") for path in profiler.last_outputs] == [True]
+
+
+def test_back_to_back_sessions_write_distinct_files(tmp_path):
+    profiler = RuntimeProfiler(tmp_path)
+    outputs = []
+    for _ in range(3):
+        profiler.start(seconds=60, mode="cprofile")
+        profiler.run("GET /mood", lambda: sum(range(1000)))
+        outputs.extend(profiler.stop()["last_outputs"])
+    assert len(set(outputs)) == 3
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(Path(output).name for output in outputs)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import random
+
+from model import ShortsAIModel
+from pattern_engine import ACTIONS, PRUNE_MIN_ABS, prune_weights
+
+
+def full_sort_prune(weights, max_size, min_abs=PRUNE_MIN_ABS):
+    filtered = {key: float(value) for key, value in weights.items() if abs(float(value)) >= min_abs}
+    if len(filtered) <= max_size:
+        return filtered
+    return dict(sorted(filtered.items(), key=lambda item: abs(item[1]), reverse=True)[:max_size])
+
+
+def test_prune_weights_matches_a_full_sort_including_ties():
+    rng = random.Random(3)
+    weights = {f"k{index}": rng.choice([0.5, -0.5, 1.25, -2.0, 0.01, rng.uniform(-3.0, 3.0)]) for index in range(500)}
+    for max_size in (0, 1, 7, 120, 499, 500, 1000):
+        pruned = prune_weights(weights, max_size=max_size)
+        expected = full_sort_prune(weights, max_size)
+        assert pruned == expected
+        assert list(pruned) == list(expected)
+
+
+def test_learning_keeps_small_weights_and_clean_exports_reuse_live_maps(workdir):
+    model = ShortsAIModel(data_file=str(workdir / "settings.json"), persist_interval=3600, snapshot_interval=3600)
+    try:
+        key = "f_000000000000000000000001"
+        model._apply_learning({key: 1.0}, "like", 0.01)
+        assert model.user_model["action_weights"]["like"][key] == 0.01
+        model._apply_learning({key: 1.0}, "like", 0.01)
+        assert model.user_model["action_weights"]["like"][key] == 0.02
+
+        model.save_user_model()
+        live = model.user_model["action_weights"]
+        assert model._pruned_user_weights(18000) is live
+        exported = model._export_payload()["action_weights"]
+        assert exported == {action: dict(live.get(action, {})) for action in ACTIONS}
+        assert all(exported[action] is not live.get(action) for action in ACTIONS)
+
+        model._apply_learning({key: 1.0}, "skip", 0.01)
+        assert model._pruned_user_weights(18000) is not live
+    finally:
+        model.close()
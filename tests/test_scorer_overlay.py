@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import pytest
+
+from pattern_engine import ActionWeightIndex, FusedActionScorer, ScorerOverlay, feature_id
+
+CATS, DOGS, CHESS, NEW = (feature_id(key) for key in ("cats", "dogs", "chess", "new"))
+PATTERNS = {CATS: 0.6, DOGS: 0.3, CHESS: 0.8, NEW: 0.1}
+
+
+def assert_same(actual, expected):
+    assert actual[1] == expected[1]
+    for action, value in expected[0].items():
+        assert actual[0][action] == pytest.approx(value, abs=1e-12)
+
+
+def test_views_keep_their_version_while_the_source_changes():
+    scorer = FusedActionScorer(ActionWeightIndex({"like": {CATS: 0.5}, "skip": {DOGS: 1.0}}), {"like": {CHESS: 0.25}}, 0.94, 1.42)
+    overlay = ScorerOverlay(scorer)
+    first = overlay.view(1)
+    expected_first = scorer.copy().score(PATTERNS)
+
+    scorer.set("like", CATS, 2.0)
+    scorer.set("skip", NEW, -1.0)
+    overlay.publish(2)
+    second = overlay.view(2)
+    expected_second = scorer.copy().score(PATTERNS)
+
+    scorer.discard("like", CHESS)
+    scorer.set("like", CATS, -3.0)
+    overlay.publish(3)
+    third = overlay.view(3)
+
+    assert_same(first.score(PATTERNS), expected_first)
+    assert_same(second.score(PATTERNS), expected_second)
+    assert_same(third.score(PATTERNS), scorer.score(PATTERNS))
+    assert overlay.changes == 4
+    assert overlay.pending() == 0
+
+
+def test_copies_do_not_track_changes():
+    scorer = FusedActionScorer(ActionWeightIndex())
+    ScorerOverlay(scorer)
+    scorer.set("like", CATS, 1.0)
+    clone = scorer.copy()
+    clone.set("like", DOGS, 1.0)
+    assert scorer.changed == {CATS}
+    assert clone.changed is None
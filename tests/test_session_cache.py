@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from session_cache import SessionLRU
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = SessionLRU(10, ttl_seconds=60, clock=clock)
+    cache.set("a", 1)
+    clock.advance(30)
+    cache.set("b", 2)
+    assert cache.age("a") == 30
+    clock.advance(30)
+    assert cache.get("a") == 1
+
+    clock.advance(1)
+    assert cache.get("a") is None
+    assert "a" not in cache
+    assert cache.get("b") == 2
+    assert cache.touch("b")
+    clock.advance(59)
+    assert cache.expire() == 0
+    clock.advance(2)
+    assert cache.expire() == 1
+    assert len(cache) == 0
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"], stats["evictions"]) == (2, 1, 2, 0)
+
+
+def test_set_expires_stale_entries_oldest_first():
+    clock = FakeClock()
+    cache = SessionLRU(10, ttl_seconds=5, clock=clock)
+    for key in "abc":
+        cache.set(key, key)
+        clock.advance(2)
+    cache.set("d", "d")
+    assert list(cache) == ["b", "c", "d"]
+    assert cache.stats()["expirations"] == 1
+
+
+def test_capacity_evicts_least_recently_set_one_at_a_time():
+    clock = FakeClock()
+    cache = SessionLRU(3, clock=clock)
+    for key in "abc":
+        cache.set(key, key)
+        clock.advance(1)
+    cache.touch("a")
+    cache.set("d", "d")
+    assert list(cache) == ["c", "a", "d"]
+    assert cache.evictions == 1
+    cache.set("c", "C")
+    cache.set("e", "e")
+    assert list(cache) == ["d", "c", "e"]
+    assert cache.evictions == 2
+    assert cache.peek("c") == "C"
+
+    clock.advance(10 ** 6)
+    assert cache.get("d") == "d"
+    assert cache.stats()["expirations"] == 0
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from pattern_engine import feature_id
+from train import ContributionCache, PreferenceAccumulator, aggregate_components, component_weight, normalize_snapshot
+
+CATS, DOGS, CHESS = feature_id("cats"), feature_id("dogs"), feature_id("chess")
+
+
+def test_component_weight_is_log_scaled_and_clamped():
+    assert component_weight(0) == 0.1
+    assert component_weight(-5) == 0.1
+    assert component_weight(1) == pytest.approx(0.13070, abs=1e-5)
+    assert component_weight(14) == pytest.approx(0.51063, abs=1e-5)
+    assert component_weight(200) == pytest.approx(1.0)
+    assert component_weight(10 ** 9) == 2.0
+
+
+def test_normalize_snapshot_cleans_weights_and_counts():
+    payload = {
+        "base_model_signature": "abc123",
+        "action_weights": {
+            "like": {"cats": 0.5, "tiny": 0.01},
+            "skip": {"chess": -1.25},
+            "watch": {"dogs": 2.0},
+        },
+        "action_counts": {"like": 3, "skip": 1},
+        "watch_count": 10,
+    }
+    snapshot = normalize_snapshot(payload)
+    assert snapshot["model_role"] == "user_preference_delta"
+    assert snapshot["base_model_signature"] == "abc123"
+    assert snapshot["action_weights"] == {"like": {CATS: 0.5, DOGS: 0.7}, "skip": {CHESS: -1.25}}
+    assert snapshot["action_counts"] == {"like": 3, "skip": 1}
+    assert snapshot["watch_count"] == 10
+    assert snapshot["weight"] == pytest.approx(0.45215, abs=1e-5)
+
+
+def test_normalize_snapshot_roles_and_rejections():
+    merged = normalize_snapshot({"model_role": " Merged_Model ", "action_weights": {"like": {"cats": 1.0}}, "watch_count": 9})
+    assert merged["model_role"] == "base_model"
+    assert merged["action_counts"] == {"like": 4, "skip": 5}
+    assert normalize_snapshot({"action_weights": {"like": {"cats": 0.001}}}) is None
+    assert normalize_snapshot({"model_role": "base_model"}) is None
+    assert normalize_snapshot(["not", "a", "model"]) is None
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_aggregate_components_weighted_mean(vectorized):
+    components = [
+        {"weight": 1.0, "action_weights": {"like": {CATS: 1.0, DOGS: 2.0}}, "action_counts": {"like": 3}},
+        {"weight": 3.0, "action_weights": {"like": {CATS: -1.0}, "skip": {CHESS: 0.5}}, "action_counts": {"skip": 2}},
+        {"weight": -1.0, "action_weights": {"like": {CATS: 100.0}}, "action_counts": {"like": 50}},
+        {"weight": 0.0, "action_weights": {"like": {DOGS: 100.0}}, "action_counts": {"like": 50}},
+    ]
+    accumulator = PreferenceAccumulator(vectorized)
+    for component in components:
+        accumulator.add(component)
+    assert accumulator.components == 2
+    assert accumulator.total_weight == 4.0
+    assert accumulator.result() == {
+        "action_weights": {"like": {CATS: -0.5, DOGS: 0.5}, "skip": {CHESS: 0.375}},
+        "action_counts": {"like": 3, "skip": 2},
+    }
+    assert aggregate_components(components) == accumulator.result()
+    assert aggregate_components([]) is None
+
+
+def test_array_and_dict_accumulators_agree_through_partials():
+    pytest.importorskip("numpy")
+    rng = random.Random(9)
+    vocabulary = [feature_id(f"merge:{index}") for index in range(400)]
+    components = [
+        {
+            "weight": rng.uniform(0.1, 2.0),
+            "action_weights": {action: {key: rng.uniform(-2.0, 2.0) for key in rng.sample(vocabulary, 60)} for action in ("like", "skip")},
+            "action_counts": {"like": rng.randint(0, 9), "skip": rng.randint(0, 9)},
+        }
+        for _ in range(25)
+    ]
+    results = []
+    for vectorized in (False, True):
+        accumulator = PreferenceAccumulator(vectorized)
+        assert accumulator.vectorized is vectorized
+        for component in components:
+            accumulator.add(component)
+        results.append(accumulator.result())
+
+        merged = PreferenceAccumulator(vectorized)
+        for start in range(0, len(components), 7):
+            chunk = PreferenceAccumulator(vectorized)
+            for component in components[start:start + 7]:
+                chunk.add(component)
+            merged.merge(chunk.partial())
+        assert merged.seen == merged.components == len(components)
+        for action, weights in accumulator.result()["action_weights"].items():
+            assert merged.result()["action_weights"][action] == pytest.approx(weights, abs=1e-12)
+    assert results[0] == results[1]
+
+
+def test_contribution_cache_invalidates_on_change(tmp_path):
+    root = tmp_path / "cache"
+    source = tmp_path / "Model.json"
+    source.write_text('{"a": 1}', encoding="utf-8")
+
+    cache = ContributionCache(root)
+    first = cache.digest(source)
+    assert cache.digest(source) == first
+    assert cache.hashed == 1
+    assert not cache.has(first)
+    cache.store(first, {"weight": 1.0})
+    assert cache.has(first)
+    assert cache.load(first) == {"component": {"weight": 1.0}}
+    assert cache.save([source]) == 0
+
+    reopened = ContributionCache(root)
+    assert reopened.digest(source) == first
+    assert reopened.hashed == 0
+
+    source.write_text('{"a": 22}', encoding="utf-8")
+    second = reopened.digest(source)
+    assert second != first
+    assert reopened.hashed == 1
+    assert not reopened.has(second)
+    assert (reopened.hits, reopened.misses) == (0, 1)
+
+    assert reopened.save([]) == 1
+    assert not reopened.files
+    assert reopened.load(first) is None
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import marshal
+import math
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from model_format import MAPPED_MODEL_SUFFIX, mapped_model_to_json, read_mapped_model
+from pattern_engine import (
+    ACTIONS,
+    clamp,
+    file_fingerprint,
+    looks_like_model_payload,
+    normalize_action_counts,
+    normalize_space,
+    parse_semver,
+    prune_action_weights,
+    read_json_file,
+    sanitize_action_weight_maps,
+)
+from persistence import atomic_write_bytes, atomic_write_text
+
+__all__ = [
+    "ACTIONS",
+    "ContributionCache",
+    "PreferenceAccumulator",
+    "aggregate_components",
+    "component_weight",
+    "load_model_json",
+    "normalize_action_counts",
+    "normalize_snapshot",
+    "parse_semver",
+    "prune_action_weights",
+    "resolve_local_path",
+    "sanitize_action_weight_maps",
+]
+
+SNAPSHOT_MAX_FEATURES = 18000
+REFERENCE_WATCH_COUNT = 200
+MIN_COMPONENT_WEIGHT = 0.1
+MAX_COMPONENT_WEIGHT = 2.0
+BASE_ROLES = {"base_model", "merged_model"}
+CONTRIBUTION_CACHE_VERSION = 1
+CONTRIBUTION_PARTIAL_TAG = f"v{CONTRIBUTION_CACHE_VERSION}-py{sys.version_info[0]}{sys.version_info[1]}"
+
+
+def resolve_local_path(value: Union[str, Path]) -> Path:
+    path = Path(value).expanduser()
+    return path if path.is_absolute() else (Path.cwd() / path).resolve()
+
+
+def load_model_json(path: Optional[Union[str, Path]]) -> Optional[Dict[str, Any]]:
+    if path is None:
+        return None
+    model_path = Path(path)
+    if model_path.suffix == MAPPED_MODEL_SUFFIX:
+        mapped = read_mapped_model(model_path)
+        return mapped_model_to_json(mapped) if mapped is not None else None
+    return read_json_file(model_path)
+
+
+def component_weight(watch_count: int) -> float:
+    if watch_count <= 0:
+        return MIN_COMPONENT_WEIGHT
+    scaled = math.log1p(watch_count) / math.log1p(REFERENCE_WATCH_COUNT)
+    return clamp(scaled, MIN_COMPONENT_WEIGHT, MAX_COMPONENT_WEIGHT)
+
+
+def snapshot_role(payload: Dict[str, Any]) -> str:
+    role = normalize_space(payload.get("model_role")).lower()
+    if role:
+        return role
+    if any(key in payload for key in ("base_model_signature", "base_model_version", "base_model_source", "journal_seq")):
+        return "user_preference_delta"
+    return "base_model" if payload.get("model_version") else "user_preference_delta"
+
+
+def normalize_snapshot(payload: Any, path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    if not looks_like_model_payload(payload):
+        return None
+    role = snapshot_role(payload)
+    raw_weights = payload.get("action_weights") if isinstance(payload.get("action_weights"), dict) else payload.get("weights")
+    action_weights = prune_action_weights(sanitize_action_weight_maps(raw_weights), max_size=SNAPSHOT_MAX_FEATURES)
+    if not any(action_weights.values()):
+        return None
+    action_counts = normalize_action_counts(payload.get("action_counts"), int(payload.get("watch_count", 0) or 0))
+    watch_count = max(int(payload.get("watch_count", 0) or 0), sum(action_counts.values()))
+    return {
+        "model_role": "base_model" if role in BASE_ROLES else role,
+        "model_version": normalize_space(payload.get("model_version")) or None,
+        "base_model_version": normalize_space(payload.get("base_model_version")) or None,
+        "base_model_source": normalize_space(payload.get("base_model_source")) or None,
+        "base_model_signature": normalize_space(payload.get("base_model_signature")) or None,
+        "action_weights": action_weights,
+        "action_counts": action_counts,
+        "watch_count": watch_count,
+        "weight": component_weight(watch_count),
+        "source_path": str(path) if path is not None else None,
+    }
+
+
+class PreferenceAccumulator:
+    def __init__(self, vectorized: Optional[bool] = None) -> None:
+        self.vectorized = np is not None if vectorized is None else bool(vectorized) and np is not None
+        self.weighted_sums: Dict[str, Dict[str, float]] = {action: {} for action in ACTIONS}
+        self.columns: Dict[str, Dict[str, int]] = {action: {} for action in ACTIONS}
+        self.column_sums: Dict[str, Any] = {action: np.zeros(0, dtype=np.float64) for action in ACTIONS} if self.vectorized else {}
+        self.action_counts: Dict[str, int] = {action: 0 for action in ACTIONS}
+        self.total_weight = 0.0
+        self.components = 0
+        self.seen = 0
+
+    def add(self, component: Dict[str, Any]) -> None:
+        self.seen += 1
+        weight = float(component.get("weight", 1.0))
+        if weight <= 0.0:
+            return
+        raw_weights = component.get("action_weights") if isinstance(component.get("action_weights"), dict) else {}
+        raw_counts = component.get("action_counts") if isinstance(component.get("action_counts"), dict) else {}
+        for action in ACTIONS:
+            self._add_weights(action, raw_weights.get(action) or {}, weight)
+            self.action_counts[action] += int(raw_counts.get(action, 0) or 0)
+        self.total_weight += weight
+        self.components += 1
+
+    def _add_weights(self, action: str, table: Dict[str, Any], weight: float) -> None:
+        if not self.vectorized:
+            sums = self.weighted_sums[action]
+            for feature, value in table.items():
+                sums[feature] = sums.get(feature, 0.0) + (float(value) * weight)
+            return
+        if not table:
+            return
+        columns = self.columns[action]
+        if not table.keys() <= columns.keys():
+            fresh = [feature for feature in table if feature not in columns]
+            columns.update(zip(fresh, range(len(columns), len(columns) + len(fresh))))
+            sums = self.column_sums[action]
+            if len(columns) > sums.size:
+                grown = np.zeros(max(len(columns), sums.size * 2), dtype=np.float64)
+                grown[:sums.size] = sums
+                self.column_sums[action] = grown
+        index = np.fromiter(map(columns.__getitem__, table), dtype=np.int64, count=len(table))
+        values = np.fromiter(table.values(), dtype=np.float64, count=len(table))
+        self.column_sums[action][index] += values * weight
+
+    def _weighted_sums(self, action: str) -> Dict[str, float]:
+        if not self.vectorized:
+            return self.weighted_sums[action]
+        columns = self.columns[action]
+        return dict(zip(columns, self.column_sums[action][:len(columns)].tolist()))
+
+    def partial(self) -> Dict[str, Any]:
+        return {
+            "weighted_sums": {action: self._weighted_sums(action) for action in ACTIONS},
+            "action_counts": self.action_counts,
+            "total_weight": self.total_weight,
+            "components": self.components,
+            "seen": self.seen,
+        }
+
+    def merge(self, partial: Dict[str, Any]) -> None:
+        for action in ACTIONS:
+            self._add_weights(action, partial["weighted_sums"].get(action, {}), 1.0)
+            self.action_counts[action] += partial["action_counts"].get(action, 0)
+        self.total_weight += partial["total_weight"]
+        self.components += partial["components"]
+        self.seen += partial["seen"]
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        if not self.components or self.total_weight <= 0.0:
+            return None
+        scale = 1.0 / self.total_weight
+        return {
+            "action_weights": {action: {feature: value * scale for feature, value in self._weighted_sums(action).items()} for action in ACTIONS},
+            "action_counts": dict(self.action_counts),
+        }
+
+
+def aggregate_components(components: Iterable[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    accumulator = PreferenceAccumulator()
+    for component in components:
+        accumulator.add(component)
+    return accumulator.result()
+
+
+class ContributionCache:
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.index_path = self.root / "index.json"
+        self.files: Dict[str, Tuple[int, int, str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.hashed = 0
+        index = read_json_file(self.index_path)
+        if index and index.get("version") == CONTRIBUTION_CACHE_VERSION and isinstance(index.get("files"), dict):
+            for name, entry in index["files"].items():
+                if isinstance(entry, list) and len(entry) == 3:
+                    self.files[name] = (int(entry[0]), int(entry[1]), str(entry[2]))
+
+    def contains(self, path: Path) -> bool:
+        return path == self.root or self.root in path.parents
+
+    def digest(self, path: Path) -> Optional[str]:
+        fingerprint = file_fingerprint(path)
+        if fingerprint is None:
+            return None
+        known = self.files.get(str(path))
+        if known is not None and known[:2] == fingerprint[:2]:
+            return known[2]
+        try:
+            digest = hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+        except OSError:
+            return None
+        self.hashed += 1
+        self.files[str(path)] = (fingerprint[0], fingerprint[1], digest)
+        return digest
+
+    def _partial_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.{CONTRIBUTION_PARTIAL_TAG}"
+
+    def has(self, digest: str) -> bool:
+        if self._partial_path(digest).exists():
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def store(self, digest: str, component: Optional[Dict[str, Any]]) -> None:
+        target = self._partial_path(digest)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(target, marshal.dumps({"component": component}))
+
+    def load(self, digest: str) -> Optional[Dict[str, Any]]:
+        try:
+            entry = marshal.loads(self._partial_path(digest).read_bytes())
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+        return entry if isinstance(entry, dict) and "component" in entry else None
+
+    def save(self, live_paths: Iterable[Path]) -> int:
+        live = {str(path) for path in live_paths}
+        self.files = {name: entry for name, entry in self.files.items() if name in live}
+        referenced: Set[str] = {self._partial_path(entry[2]).name for entry in self.files.values()}
+        removed = 0
+        for partial in self.root.glob("??/*"):
+            if partial.name not in referenced:
+                partial.unlink()
+                removed += 1
+        self.root.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(
+            self.index_path,
+            json.dumps({"version": CONTRIBUTION_CACHE_VERSION, "files": {name: list(entry) for name, entry in sorted(self.files.items())}}),
+        )
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "hashed": self.hashed, "tracked_files": len(self.files)}